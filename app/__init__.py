@@ -13,6 +13,7 @@ def create_app(config_class=Config):
     _setup_language_config(app, config_class)
     _setup_babel(app)
     _setup_logging(app)
+    _setup_services(app)
     _register_blueprints(app)
     
     return app
@@ -73,6 +74,105 @@ def _setup_logging(app):
         app.logger.info('LLOT startup')
 
 
+def _shared_admission_slots(app):
+    """Slots that make the admission limit hold across all gunicorn workers."""
+    from app.services.admission import SharedSlots
+    directory = app.config['OLLAMA_ADMISSION_DIR']
+    if not directory or app.config.get('TESTING'):
+        return None
+    if not SharedSlots.available():
+        app.logger.warning("File locks unavailable: admission limits apply per worker process")
+        return None
+    try:
+        return SharedSlots(directory, app.config['OLLAMA_MAX_IN_FLIGHT'])
+    except OSError as e:
+        app.logger.warning(f"Admission lock directory {directory} unusable ({e}): limits apply per worker process")
+        return None
+
+
+def _setup_services(app):
+    """Create per-application service state (caches, registries)."""
+    from app.services.admission import AdmissionController
+    from app.services.backend_pool import BackendPool, parse_hosts
+    from app.services.translation_cache import TranslationCache
+    pool = BackendPool(
+        parse_hosts(app.config['OLLAMA_HOST']),
+        session_options={
+            'pool_size': app.config['OLLAMA_POOL_SIZE'],
+            'max_retries': app.config['OLLAMA_MAX_RETRIES'],
+            'backoff': app.config['OLLAMA_RETRY_BACKOFF'],
+        },
+        max_failures=app.config['OLLAMA_BACKEND_MAX_FAILURES'],
+        eject_base=app.config['OLLAMA_BACKEND_EJECT_BASE'],
+        eject_max=app.config['OLLAMA_BACKEND_EJECT_MAX'],
+        probe_interval=app.config['OLLAMA_BACKEND_PROBE_INTERVAL']
+    )
+    app.extensions['llot_backend_pool'] = pool
+    if app.config['OLLAMA_HEDGE'] and len(pool.backends) > 1:
+        from app.services.hedging import HedgingPolicy
+        app.extensions['llot_hedging'] = HedgingPolicy(
+            delay=app.config['OLLAMA_HEDGE_DELAY'],
+            max_rate=app.config['OLLAMA_HEDGE_MAX_RATE'],
+            min_delay=app.config['OLLAMA_HEDGE_MIN_DELAY'],
+            request_classes=app.config['OLLAMA_HEDGE_CLASSES']
+        )
+    # Health probes only matter when there is another backend to route to
+    if len(pool.backends) > 1 and pool.probe_interval > 0 and not app.config.get('TESTING'):
+        pool.start()
+    app.extensions['llot_admission'] = AdmissionController(
+        max_in_flight=app.config['OLLAMA_MAX_IN_FLIGHT'],
+        max_queue=app.config['OLLAMA_MAX_QUEUE'],
+        queue_timeout=app.config['OLLAMA_QUEUE_TIMEOUT'],
+        shared=_shared_admission_slots(app)
+    )
+    app.extensions['llot_translation_cache'] = TranslationCache(
+        max_entries=app.config['TRANSLATION_CACHE_SIZE'],
+        ttl=app.config['TRANSLATION_CACHE_TTL'],
+        db_path=app.config['TRANSLATION_CACHE_DB'],
+        db_max_rows=app.config['TRANSLATION_CACHE_DB_MAX_ROWS']
+    )
+    
+    from app.services.model_router import ModelRouter
+    app.extensions['llot_model_router'] = ModelRouter(
+        app.config['SMALL_MODEL'],
+        max_small_tokens=app.config['ROUTER_MAX_SMALL_TOKENS'],
+        max_small_segments=app.config['ROUTER_MAX_SMALL_SEGMENTS'],
+        large_pairs=app.config['ROUTER_LARGE_PAIRS']
+    )
+    from app.services.thinking import ThinkingControl, parse_thinking_budgets
+    app.extensions['llot_thinking'] = ThinkingControl(parse_thinking_budgets(app.config['THINK_BUDGETS']))
+    from app.services.json_output import JsonOutputStats
+    app.extensions['llot_json_output'] = JsonOutputStats()
+    from app.services.output_budget import OutputBudget
+    app.extensions['llot_output_budget'] = OutputBudget()
+    # Load detection profiles now rather than on the first auto-detected request
+    from app.services.language_detector import LanguageDetector
+    app.extensions['llot_language_detector'] = LanguageDetector(
+        app.config['TRANSLATION_LANGUAGES'],
+        max_chars=app.config['LANGUAGE_DETECT_MAX_CHARS']
+    )
+    
+    from app.services.model_catalog import ModelCatalog
+    catalog = ModelCatalog(app, refresh_interval=app.config['MODEL_CATALOG_REFRESH'])
+    app.extensions['llot_model_catalog'] = catalog
+    if app.config['MODEL_CATALOG_REFRESH'] > 0 and not app.config.get('TESTING'):
+        catalog.start()
+    
+    from app.services.runtime_options import RuntimeOptions, load_model_profiles, parse_buckets
+    app.extensions['llot_runtime_options'] = RuntimeOptions(
+        parse_buckets(app.config['NUM_CTX_BUCKETS']),
+        profiles=load_model_profiles(app.config['OLLAMA_MODEL_PROFILES']),
+        catalog=catalog
+    )
+    
+    from app.services.model_residency import ModelResidency, startup_models
+    residency = ModelResidency(app, status_ttl=app.config['MODEL_STATUS_TTL'])
+    app.extensions['llot_model_residency'] = residency
+    # Load models in the background so the first translation does not pay for it
+    if app.config['OLLAMA_WARMUP'] and not app.config.get('TESTING'):
+        residency.warm_up(startup_models(app.config))
+
+
 def _register_blueprints(app):
     """Register all application blueprints."""
     from app.routes import main_bp, api_bp, favicon_bp
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,6 +17,83 @@ class Config:
     OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
     DEFAULT_MODEL = os.environ.get("OL_MODEL", "gemma4:26b")
     
+    # Model cascade: requests without a model (or "auto") use SMALL_MODEL for short inputs
+    # and alternatives, and DEFAULT_MODEL for long inputs, think mode and the listed pairs
+    SMALL_MODEL = os.environ.get("SMALL_MODEL", "")
+    ROUTER_MAX_SMALL_TOKENS = int(os.environ.get("ROUTER_MAX_SMALL_TOKENS", "40"))
+    ROUTER_MAX_SMALL_SEGMENTS = int(os.environ.get("ROUTER_MAX_SMALL_SEGMENTS", "2"))
+    ROUTER_LARGE_PAIRS = [p.strip() for p in os.environ.get("ROUTER_LARGE_PAIRS", "").split(",") if p.strip()]
+    
+    # Ollama HTTP transport (pooled keep-alive connections)
+    OLLAMA_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", "32"))
+    OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "5"))
+    OLLAMA_READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "120"))
+    OLLAMA_MAX_RETRIES = int(os.environ.get("OLLAMA_MAX_RETRIES", "2"))
+    OLLAMA_RETRY_BACKOFF = float(os.environ.get("OLLAMA_RETRY_BACKOFF", "0.3"))
+    
+    # Multiple backends: OLLAMA_HOST may list several comma-separated servers
+    OLLAMA_BACKEND_MAX_FAILURES = int(os.environ.get("OLLAMA_BACKEND_MAX_FAILURES", "3"))
+    OLLAMA_BACKEND_EJECT_BASE = float(os.environ.get("OLLAMA_BACKEND_EJECT_BASE", "5"))
+    OLLAMA_BACKEND_EJECT_MAX = float(os.environ.get("OLLAMA_BACKEND_EJECT_MAX", "300"))
+    OLLAMA_BACKEND_PROBE_INTERVAL = float(os.environ.get("OLLAMA_BACKEND_PROBE_INTERVAL", "15"))
+    
+    # Hedged requests (needs several backends): duplicate slow calls on a second backend
+    OLLAMA_HEDGE = os.environ.get("OLLAMA_HEDGE", "false").lower() in ("true", "1", "yes", "on")
+    OLLAMA_HEDGE_DELAY = float(os.environ.get("OLLAMA_HEDGE_DELAY", "0"))  # 0 = observed p95
+    OLLAMA_HEDGE_MIN_DELAY = float(os.environ.get("OLLAMA_HEDGE_MIN_DELAY", "1"))
+    OLLAMA_HEDGE_MAX_RATE = float(os.environ.get("OLLAMA_HEDGE_MAX_RATE", "0.1"))
+    OLLAMA_HEDGE_CLASSES = [c.strip() for c in os.environ.get("OLLAMA_HEDGE_CLASSES", "translate,alternatives").split(",") if c.strip()]
+    
+    # Model residency: keep_alive sent with every request, models loaded at startup
+    OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_WARMUP = os.environ.get("OLLAMA_WARMUP", "true").lower() in ("true", "1", "yes", "on")
+    OLLAMA_PRELOAD_MODELS = [m.strip() for m in os.environ.get("OLLAMA_PRELOAD_MODELS", "").split(",") if m.strip()]
+    MODEL_STATUS_TTL = float(os.environ.get("MODEL_STATUS_TTL", "10"))
+    MODEL_CATALOG_REFRESH = float(os.environ.get("MODEL_CATALOG_REFRESH", "300"))
+    
+    # Context window sizes (num_ctx) requests are fitted into; empty keeps the model default
+    NUM_CTX_BUCKETS = os.environ.get("NUM_CTX_BUCKETS", "4096,16384,32768")
+    # JSON file with Ollama options per model, e.g. {"*": {"num_thread": 8}}
+    OLLAMA_MODEL_PROFILES = os.environ.get("OLLAMA_MODEL_PROFILES", "")
+    
+    # Admission control: generations in flight per Ollama backend, queued requests beyond that
+    OLLAMA_MAX_IN_FLIGHT = int(os.environ.get("OLLAMA_MAX_IN_FLIGHT", "2"))
+    OLLAMA_MAX_QUEUE = int(os.environ.get("OLLAMA_MAX_QUEUE", "32"))
+    OLLAMA_QUEUE_TIMEOUT = float(os.environ.get("OLLAMA_QUEUE_TIMEOUT", "30"))
+    # Lock files that share the in-flight limit between all workers on the host; empty = per worker
+    OLLAMA_ADMISSION_DIR = os.environ.get(
+        "OLLAMA_ADMISSION_DIR", os.path.join(tempfile.gettempdir(), "llot-admission")
+    )
+    
+    # Translation cache (0 entries disables the in-memory tier, empty DB path the shared tier)
+    TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", "512"))
+    TRANSLATION_CACHE_TTL = int(os.environ.get("TRANSLATION_CACHE_TTL", "86400"))
+    TRANSLATION_CACHE_DB = os.environ.get("TRANSLATION_CACHE_DB", "")
+    TRANSLATION_CACHE_DB_MAX_ROWS = int(os.environ.get("TRANSLATION_CACHE_DB_MAX_ROWS", "50000"))
+    
+    # Word alternatives for the whole translation, computed in one background call
+    ALTERNATIVES_PRECOMPUTE = os.environ.get("ALTERNATIVES_PRECOMPUTE", "false").lower() in ("true", "1", "yes", "on")
+    ALTERNATIVES_PRECOMPUTE_MAX_WORDS = int(os.environ.get("ALTERNATIVES_PRECOMPUTE_MAX_WORDS", "60"))
+    
+    # Thinking budget per request class for think mode: class=tokens/seconds (0 = unlimited)
+    THINK_BUDGETS = os.environ.get(
+        "THINK_BUDGETS", "alternatives=256/10,translate=1024/30,refine=512/20,batch=2048/60"
+    )
+    
+    # Stop translations that loop or run far past their expected length
+    RUNAWAY_GUARD = os.environ.get("RUNAWAY_GUARD", "true").lower() in ("true", "1", "yes", "on")
+    
+    # Auto-detection analyses at most this many leading characters of a text
+    LANGUAGE_DETECT_MAX_CHARS = int(os.environ.get("LANGUAGE_DETECT_MAX_CHARS", "300"))
+    
+    # Batch translation
+    BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "4"))
+    BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "200"))
+    
+    # Long-document translation
+    DOCUMENT_CHUNK_TOKENS = int(os.environ.get("DOCUMENT_CHUNK_TOKENS", "800"))
+    DOCUMENT_CONCURRENCY = int(os.environ.get("DOCUMENT_CONCURRENCY", "4"))
+    
     # Application settings
     LISTEN_HOST = os.environ.get("APP_HOST", "0.0.0.0")
     LISTEN_PORT = int(os.environ.get("APP_PORT", "8080"))
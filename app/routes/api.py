@@ -1,11 +1,21 @@
-from flask import request, jsonify, current_app, Response
+from flask import request, jsonify, current_app, Response, stream_with_context
 from app.routes import api_bp
 from app.services.translator import TranslationService
+from app.services.batch import BatchTranslator
+from app.services.singleflight import SingleFlight
+from app.services.admission import OllamaBusyError
 from app.models.history import history_manager
 from app.utils.debug import debug_print
+import json
 import logging
 import os
 
+logger = logging.getLogger(__name__)
+translation_service = TranslationService()
+
+# Refinement modes: local pre-pass with LLM fallback, local only, LLM only
+REFINE_MODES = ("auto", "local", "llm")
+
 
 def _get_request_data():
     """Extract data from request (JSON or form)."""
@@ -13,8 +23,24 @@ def _get_request_data():
         return request.get_json() or {}
     return request.form.to_dict()
 
-logger = logging.getLogger(__name__)
-translation_service = TranslationService()
+
+def _wants_precomputed_alternatives(data):
+    """Whether to compute word alternatives in the background after translating."""
+    value = data.get("precompute_alternatives")
+    if value is None:
+        return current_app.config["ALTERNATIVES_PRECOMPUTE"]
+    return str(value).lower() in ("true", "1", "yes", "on")
+
+
+def _busy_response(error, **payload):
+    """Build a 429 response for a request rejected by admission control."""
+    payload.update({"error": "BUSY", "retry_after": error.retry_after})
+    return jsonify(payload), 429, {"Retry-After": str(error.retry_after)}
+
+
+def _busy_event(error):
+    """Build the NDJSON error event for a rejected streaming request."""
+    return json.dumps({"type": "error", "error": "BUSY", "retry_after": error.retry_after}) + "\n"
 
 
 @api_bp.route("/translate", methods=["POST"])
@@ -34,11 +60,32 @@ def translate():
         tone = (data.get("tone") or "neutral").strip()
         think = bool(data.get("think", False))
         model = (data.get("model") or "").strip() or None
+        incremental = bool(data.get("incremental", False))
+        precompute = _wants_precomputed_alternatives(data)
 
         # Perform translation
+        if incremental:
+            translated, detected, segments = translation_service.translate_incremental(
+                source_text, source_lang, target_lang, tone, think=think, model=model
+            )
+            if precompute:
+                translation_service.schedule_alternatives(
+                    source_text, translated, target_lang, tone, think=think, model=model
+                )
+            return jsonify({
+                "translated_text": translated,
+                "source_lang": detected or source_lang,
+                "target_lang": target_lang,
+                "segments": segments
+            })
+        
         translated, detected = translation_service.translate(
             source_text, source_lang, target_lang, tone, think=think, model=model
         )
+        if precompute:
+            translation_service.schedule_alternatives(
+                source_text, translated, target_lang, tone, think=think, model=model
+            )
         
         return jsonify({
             "translated_text": translated,
@@ -46,11 +93,143 @@ def translate():
             "target_lang": target_lang
         })
         
+    except OllamaBusyError as e:
+        return _busy_response(e, translated_text="")
     except Exception as e:
         logger.error(f"Translation error: {e}")
         return jsonify({"error": f"Translation error: {str(e)}"})
 
 
+@api_bp.route("/translate/stream", methods=["POST"])
+def translate_stream():
+    """Streaming translation endpoint (newline-delimited JSON events)."""
+    data = _get_request_data()
+    debug_print(f"Streaming translation request data: {data}")
+    
+    source_text = (data.get("source_text") or "").strip()
+    if not source_text:
+        return jsonify({"error": "EMPTY", "translated_text": ""})
+    
+    source_lang = (data.get("source_lang") or "auto").strip()
+    target_lang = (data.get("target_lang") or "de").strip()
+    tone = (data.get("tone") or "neutral").strip()
+    think = bool(data.get("think", False))
+    model = (data.get("model") or "").strip() or None
+    incremental = bool(data.get("incremental", False))
+    precompute = _wants_precomputed_alternatives(data)
+    # Incremental: segments are translated (or served from cache) and streamed in order
+    translate = translation_service.translate_incremental_stream if incremental \
+        else translation_service.translate_stream
+    
+    def generate():
+        try:
+            for event in translate(
+                source_text, source_lang, target_lang, tone, think=think, model=model
+            ):
+                if precompute and event["type"] == "done" and not event["truncated"]:
+                    translation_service.schedule_alternatives(
+                        source_text, event["translated_text"], target_lang, tone, think=think, model=model
+                    )
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except OllamaBusyError as e:
+            yield _busy_event(e)
+        except Exception as e:
+            logger.error(f"Streaming translation error: {e}")
+            yield json.dumps({"type": "error", "error": f"Translation error: {str(e)}"}) + "\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_bp.route("/translate/document", methods=["POST"])
+def translate_document():
+    """Translate a long document in parallel chunks."""
+    data = _get_request_data()
+    
+    source_text = (data.get("source_text") or "").strip()
+    if not source_text:
+        return jsonify({"error": "EMPTY", "translated_text": ""})
+    
+    source_lang = (data.get("source_lang") or "auto").strip()
+    target_lang = (data.get("target_lang") or "de").strip()
+    tone = (data.get("tone") or "neutral").strip()
+    think = bool(data.get("think", False))
+    model = (data.get("model") or "").strip() or None
+    
+    events = translation_service.translate_document(
+        source_text, source_lang, target_lang, tone, think=think, model=model
+    )
+    
+    if data.get("stream"):
+        def generate():
+            try:
+                for event in events:
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+            except OllamaBusyError as e:
+                yield _busy_event(e)
+            except Exception as e:
+                logger.error(f"Document translation error: {e}")
+                yield json.dumps({"type": "error", "error": f"Translation error: {str(e)}"}) + "\n"
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    try:
+        result = {}
+        for event in events:
+            result = event
+        return jsonify({
+            "translated_text": result["translated_text"],
+            "source_lang": result["source_lang"],
+            "target_lang": target_lang
+        })
+    except OllamaBusyError as e:
+        return _busy_response(e, translated_text="")
+    except Exception as e:
+        logger.error(f"Document translation error: {e}")
+        return jsonify({"error": f"Translation error: {str(e)}"})
+
+
+@api_bp.route("/translate/batch", methods=["POST"])
+def translate_batch():
+    """Translate a list of items with bounded concurrency."""
+    data = request.get_json(silent=True) or {}
+    items = data.get("items")
+    max_items = current_app.config["BATCH_MAX_ITEMS"]
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "EMPTY", "results": []}), 400
+    if len(items) > max_items:
+        return jsonify({"error": f"Too many items (max {max_items})", "results": []}), 400
+    
+    batch = BatchTranslator(translation_service, current_app.config["BATCH_CONCURRENCY"])
+    try:
+        items = batch.normalize_items(items, data)
+    except ValueError as e:
+        return jsonify({"error": str(e), "results": []}), 400
+    
+    if data.get("stream"):
+        def generate():
+            for result in batch.run(items):
+                yield json.dumps(dict(result, type="result"), ensure_ascii=False) + "\n"
+            yield json.dumps({"type": "done", "total": len(items)}) + "\n"
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    results = sorted(batch.run(items), key=lambda r: r["index"])
+    return jsonify({"results": results})
+
+
 @api_bp.route("/history/save", methods=["POST"])
 def save_history():
     """Save translation to history."""
@@ -95,6 +274,8 @@ def get_alternatives():
         
         return jsonify({"alternatives": alternatives})
         
+    except OllamaBusyError as e:
+        return _busy_response(e, alternatives=[])
     except Exception as e:
         logger.error(f"Alternatives error: {e}")
         return jsonify({"alternatives": []})
@@ -112,6 +293,9 @@ def refine_translation():
         tone = (data.get("tone") or "neutral").strip()
         think = bool(data.get("think", False))
         model = (data.get("model") or "").strip() or None
+        mode = (data.get("mode") or "auto").strip().lower()
+        if mode not in REFINE_MODES:
+            mode = "auto"
 
         # Process enforced phrases
         enforced_phrases = [
@@ -132,21 +316,25 @@ def refine_translation():
         if not source_text:
             return jsonify({"translated": ""})
 
-        translated, faithful = translation_service.refine_translation(
+        translated, faithful, path = translation_service.refine_translation(
             source_text, current_translation, target_lang, tone,
-            enforced_phrases, replacements, think=think, model=model
+            enforced_phrases, replacements, think=think, model=model, mode=mode
         )
         
         return jsonify({
             "translated": translated,
-            "faithful": faithful
+            "faithful": faithful,
+            "path": path
         })
         
+    except OllamaBusyError as e:
+        return _busy_response(e, translated=current_translation, faithful=False, path="llm")
     except Exception as e:
         logger.error(f"Refinement error: {e}")
         return jsonify({
             "translated": current_translation,
             "faithful": False,
+            "path": "llm",
             "error": str(e)
         })
 
@@ -168,7 +356,10 @@ class TTSCache:
     def clear(self):
         self._cache.clear()
 
+
 tts_cache = TTSCache()
+tts_inflight = SingleFlight()
+
 
 @api_bp.route("/tts", methods=["POST"])
 def text_to_speech():
@@ -254,8 +445,12 @@ def text_to_speech():
         try:
             from app.services.wyoming_tts_simple import SimpleWyomingTTSService
             
-            simple_tts = SimpleWyomingTTSService()
-            wav_content = simple_tts.synthesize(text, voice)
+            def synthesize():
+                simple_tts = SimpleWyomingTTSService()
+                return simple_tts.synthesize(text, voice)
+            
+            # Concurrent requests for the same text and voice share one synthesis
+            wav_content = tts_inflight.do(cache_key, synthesize)
             debug_print(f"Generated WAV with {len(wav_content)} bytes using simple Wyoming")
             
             # Cache the result
@@ -284,7 +479,8 @@ def text_to_speech():
 def health_check():
     """Check health status of all services."""
     try:
-        from app.services.ollama_client import get_ollama_client
+        from app.services.backend_pool import get_backend_pool
+        from app.services.model_catalog import get_model_catalog
         import requests
         
         status = {
@@ -293,10 +489,14 @@ def health_check():
             "overall": "ok"
         }
         
-        # Check Ollama
+        # Check Ollama from live backend probes; the model list comes from the catalog
         try:
-            client = get_ollama_client()
-            models = client.get_available_models()
+            backends = get_backend_pool().check()
+            status["ollama"]["backends"] = {host: error or "ok" for host, error in backends.items()}
+            errors = [error for error in backends.values() if error]
+            if len(errors) == len(backends):
+                raise Exception(errors[0])
+            models = get_model_catalog().names()
             if not models:
                 raise Exception("No models available")
             status["ollama"]["models"] = models
@@ -343,12 +543,91 @@ def health_check():
 
 @api_bp.route("/models", methods=["GET"])
 def get_models():
-    """Get available Ollama models."""
+    """Get available Ollama models from the in-memory catalog."""
+    from app.services.model_catalog import get_model_catalog
+    from app.services.model_router import get_model_router
+    
     try:
-        models = translation_service.get_available_models()
-        return jsonify({"models": models})
+        catalog = get_model_catalog()
+        if request.args.get("refresh", "").lower() in ("1", "true", "yes"):
+            catalog.refresh()
+        details = catalog.models()
+        models = [m["name"] for m in details]
+        router = get_model_router()
+        # The "auto" choice routes between the small and the default model
+        auto = {"small": router.small_model, "large": current_app.config["DEFAULT_MODEL"]} \
+            if router.enabled else None
+        response = jsonify({"models": models, "details": details, "status": _model_states(models),
+                            "auto": auto})
+        # Let the browser revalidate instead of downloading an unchanged list
+        response.headers["Cache-Control"] = "no-cache"
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error getting models: {e}")
         return jsonify({"error": str(e), "models": []}), 500
 
 
+def _model_states(models):
+    """Map model names to their load state (loaded, loading or cold)."""
+    from app.services.model_residency import get_model_residency
+    
+    residency = get_model_residency()
+    if residency is None:
+        return {}
+    return {model: residency.state_of(model) for model in models}
+
+
+@api_bp.route("/models/status", methods=["GET"])
+def get_models_status():
+    """Get which models are loaded in Ollama memory."""
+    from app.services.model_residency import get_model_residency
+    
+    residency = get_model_residency()
+    refresh = request.args.get("refresh", "").lower() in ("1", "true", "yes")
+    return jsonify(residency.status(refresh=refresh))
+
+
+@api_bp.route("/models/warmup", methods=["POST"])
+def warm_up_model():
+    """Start loading a model so the next request does not wait for it."""
+    from app.services.model_residency import get_model_residency
+    from app.services.model_router import AUTO_MODEL, get_model_router
+    
+    model = (_get_request_data().get("model") or "").strip()
+    if not model:
+        return jsonify({"error": "No model specified"}), 400
+    
+    models = [model]
+    if model == AUTO_MODEL:
+        models = [m for m in (get_model_router().small_model, current_app.config["DEFAULT_MODEL"]) if m]
+    loading = get_model_residency().warm_up(models)
+    return jsonify({"model": model, "loading": bool(loading)}), 202
+
+
+@api_bp.route("/stats", methods=["GET"])
+def get_stats():
+    """Get runtime statistics (caches, queues)."""
+    from app.services.admission import get_admission_controller
+    from app.services.backend_pool import get_backend_pool
+    from app.services.hedging import get_hedging_policy
+    from app.services.json_output import get_json_output_stats
+    from app.services.model_router import get_model_router
+    from app.services.output_budget import get_output_budget
+    from app.services.thinking import get_thinking_control
+    from app.services.translation_cache import get_translation_cache
+    
+    return jsonify({
+        "translation_cache": get_translation_cache().stats(),
+        "admission": get_admission_controller().stats(),
+        "backends": get_backend_pool().stats(),
+        "hedging": get_hedging_policy().stats() if get_hedging_policy() else None,
+        "structured_output": get_json_output_stats().stats(),
+        "output_budget": get_output_budget().stats(),
+        "thinking": get_thinking_control().stats(),
+        "routing": get_model_router().stats(),
+        "coalescing": {
+            "translation": translation_service.inflight.stats(),
+            "tts": tts_inflight.stats()
+        }
+    })
@@ -0,0 +1,305 @@
+"""
+Priority admission control for generation requests sent to Ollama.
+"""
+import hashlib
+import heapq
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+REQUEST_PRIORITIES = {
+    "alternatives": 0,
+    "translate": 1,
+    "refine": 2,
+    "batch": 3,
+}
+
+
+class OllamaBusyError(Exception):
+    """Raised when a request is not admitted because the backend queue is full."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, priority: int, seq: int, request_class: str):
+        self.priority = priority
+        self.seq = seq
+        self.request_class = request_class
+        self.rejected = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _BackendQueue:
+    def __init__(self):
+        self.in_flight = 0
+        self.waiters: List[_Waiter] = []
+        # Queued requests per priority
+        self.waiting: Dict[int, int] = {}
+        self.avg_service = 5.0
+
+
+class SharedSlots:
+    """Generation slots shared by all worker processes on a host.
+
+    Every backend has ``max_in_flight`` slot files in ``directory``; a
+    process holds a slot while it has an exclusive ``flock`` on one of them,
+    so the slots of a worker that dies are freed by the kernel. A process
+    with queued requests holds a shared lock on the wait file of their
+    priority, which tells other processes that higher-priority work is
+    waiting elsewhere.
+    """
+
+    def __init__(self, directory: str, max_in_flight: int):
+        self.directory = directory
+        self.max_in_flight = max_in_flight
+        os.makedirs(directory, exist_ok=True)
+        self._files: Dict[str, int] = {}
+        self._pid = os.getpid()
+        # Slot indices held by this process, per backend
+        self._held: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return fcntl is not None
+
+    def try_acquire(self, backend: str) -> bool:
+        """Take a free slot on a backend without blocking."""
+        held = self._held.setdefault(backend, [])
+        for index in range(self.max_in_flight):
+            if index in held:
+                continue
+            if self._lock(self._path(backend, f"slot{index}"), fcntl.LOCK_EX | fcntl.LOCK_NB):
+                held.append(index)
+                return True
+        return False
+
+    def release(self, backend: str):
+        held = self._held.get(backend)
+        if held:
+            fcntl.flock(self._fd(self._path(backend, f"slot{held.pop()}")), fcntl.LOCK_UN)
+
+    def set_waiting(self, backend: str, priority: int, waiting: bool):
+        """Announce (or withdraw) queued requests of a priority on a backend."""
+        fd = self._fd(self._path(backend, f"wait{priority}"))
+        fcntl.flock(fd, fcntl.LOCK_SH if waiting else fcntl.LOCK_UN)
+
+    def outranked(self, backend: str, priority: int) -> bool:
+        """Whether another process has requests of a higher priority waiting."""
+        for higher in range(priority):
+            path = self._path(backend, f"wait{higher}")
+            if not self._lock(path, fcntl.LOCK_EX | fcntl.LOCK_NB, probe=True):
+                return True
+            fcntl.flock(self._fd(path, probe=True), fcntl.LOCK_UN)
+        return False
+
+    def _lock(self, path: str, operation: int, probe: bool = False) -> bool:
+        try:
+            fcntl.flock(self._fd(path, probe), operation)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _fd(self, path: str, probe: bool = False) -> int:
+        # Descriptors inherited across a fork share their locks with the parent
+        if self._pid != os.getpid():
+            self._files, self._held, self._pid = {}, {}, os.getpid()
+        # Probes use their own descriptor so they never convert or drop this process' wait lock
+        name = path + ".probe" if probe else path
+        fd = self._files.get(name)
+        if fd is None:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+            self._files[name] = fd
+        return fd
+
+    def _path(self, backend: str, name: str) -> str:
+        digest = hashlib.sha1(backend.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.directory, f"{digest}.{name}")
+
+
+class AdmissionController:
+    """Limit in-flight generations per backend and queue the rest by priority.
+
+    Ollama processes generations for a model one after another anyway, so
+    queueing here lets interactive requests (word alternatives) overtake
+    bulk work (refine, batch). When the queue is full a new request is
+    rejected immediately with a ``Retry-After`` hint, unless it outranks the
+    lowest-priority waiter, which is then rejected instead.
+
+    Queues live in each worker process. With ``shared`` slots the limit of
+    in-flight generations holds for all workers on the host together, and a
+    worker does not start a request while another one has higher-priority
+    requests waiting for the same backend.
+    """
+
+    # Seconds between checks for a slot freed by another process
+    SHARED_POLL_INTERVAL = 0.05
+
+    def __init__(self, max_in_flight: int = 2, max_queue: int = 32, queue_timeout: float = 30.0,
+                 shared: Optional[SharedSlots] = None):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.shared = shared
+        self._cond = threading.Condition()
+        self._backends: Dict[str, _BackendQueue] = {}
+        self._seq = itertools.count()
+        self._stats: Dict[str, Dict] = {
+            name: {"admitted": 0, "rejected": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0}
+            for name in REQUEST_PRIORITIES
+        }
+
+    @contextmanager
+    def slot(self, backend: str, request_class: str = "translate") -> Iterator[None]:
+        """Hold a generation slot on a backend for the duration of the block.
+
+        Raises:
+            OllamaBusyError: If the request was rejected or timed out in the queue
+        """
+        started = self.acquire(backend, request_class)
+        try:
+            yield
+        finally:
+            self.release(backend, time.monotonic() - started)
+
+    def acquire(self, backend: str, request_class: str = "translate") -> float:
+        """Wait for a slot on a backend.
+
+        Returns:
+            Monotonic timestamp at which the slot was granted
+        """
+        request_class = request_class if request_class in REQUEST_PRIORITIES else "translate"
+        enqueued = time.monotonic()
+
+        with self._cond:
+            queue = self._backends.setdefault(backend, _BackendQueue())
+            priority = REQUEST_PRIORITIES[request_class]
+
+            if not queue.waiters and self._take_slot(queue, backend, priority):
+                self._record_admission(request_class, 0.0)
+                return time.monotonic()
+
+            waiter = _Waiter(priority, next(self._seq), request_class)
+            if len(queue.waiters) >= self.max_queue:
+                worst = max(queue.waiters) if queue.waiters else None
+                if worst is None or not waiter < worst:
+                    self._reject(queue, request_class)
+                # Make room by bumping the lowest-priority waiter
+                worst.rejected = True
+                self._dequeue(queue, backend, worst)
+
+            self._enqueue(queue, backend, waiter)
+            self._cond.notify_all()
+
+            deadline = enqueued + self.queue_timeout
+            while True:
+                if waiter.rejected:
+                    self._reject(queue, request_class)
+                if queue.waiters and queue.waiters[0] is waiter and self._take_slot(queue, backend, priority):
+                    self._dequeue(queue, backend, waiter)
+                    # Let the next waiter check whether another slot is free
+                    self._cond.notify_all()
+                    granted = time.monotonic()
+                    self._record_admission(request_class, (granted - enqueued) * 1000)
+                    return granted
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._dequeue(queue, backend, waiter)
+                    self._cond.notify_all()
+                    self._reject(queue, request_class)
+                # Slots freed by other processes are not signalled, so poll for them
+                self._cond.wait(min(remaining, self.SHARED_POLL_INTERVAL) if self.shared else remaining)
+
+    def release(self, backend: str, service_time: Optional[float] = None):
+        """Free a slot and wake up waiters."""
+        with self._cond:
+            queue = self._backends.setdefault(backend, _BackendQueue())
+            if queue.in_flight > 0:
+                queue.in_flight -= 1
+                if self.shared is not None:
+                    self.shared.release(backend)
+            if service_time is not None:
+                queue.avg_service = 0.8 * queue.avg_service + 0.2 * service_time
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            classes = {}
+            for name, s in self._stats.items():
+                admitted = s["admitted"]
+                classes[name] = {
+                    "admitted": admitted,
+                    "rejected": s["rejected"],
+                    "avg_wait_ms": round(s["wait_total_ms"] / admitted, 1) if admitted else 0.0,
+                    "max_wait_ms": round(s["wait_max_ms"], 1),
+                }
+            backends = {
+                host: {"in_flight": q.in_flight, "queued": len(q.waiters),
+                       "avg_service_s": round(q.avg_service, 2)}
+                for host, q in self._backends.items()
+            }
+        return {"max_in_flight": self.max_in_flight, "max_queue": self.max_queue,
+                "shared": self.shared is not None, "classes": classes, "backends": backends}
+
+    def _take_slot(self, queue: _BackendQueue, backend: str, priority: int) -> bool:
+        """Claim a slot if one is free; must be called with the lock held."""
+        if queue.in_flight >= self.max_in_flight:
+            return False
+        if self.shared is not None and (self.shared.outranked(backend, priority)
+                                        or not self.shared.try_acquire(backend)):
+            return False
+        queue.in_flight += 1
+        return True
+
+    def _enqueue(self, queue: _BackendQueue, backend: str, waiter: _Waiter):
+        heapq.heappush(queue.waiters, waiter)
+        queue.waiting[waiter.priority] = queue.waiting.get(waiter.priority, 0) + 1
+        if queue.waiting[waiter.priority] == 1 and self.shared is not None:
+            self.shared.set_waiting(backend, waiter.priority, True)
+
+    def _dequeue(self, queue: _BackendQueue, backend: str, waiter: _Waiter):
+        queue.waiters.remove(waiter)
+        heapq.heapify(queue.waiters)
+        queue.waiting[waiter.priority] -= 1
+        if queue.waiting[waiter.priority] == 0 and self.shared is not None:
+            self.shared.set_waiting(backend, waiter.priority, False)
+
+    def _record_admission(self, request_class: str, wait_ms: float):
+        s = self._stats[request_class]
+        s["admitted"] += 1
+        s["wait_total_ms"] += wait_ms
+        s["wait_max_ms"] = max(s["wait_max_ms"], wait_ms)
+
+    def _reject(self, queue: _BackendQueue, request_class: str):
+        """Record a rejection and raise; must be called with the lock held."""
+        self._stats[request_class]["rejected"] += 1
+        # Rough time until the queue ahead of a new request has drained
+        retry_after = max(1, math.ceil(
+            queue.avg_service * (len(queue.waiters) + 1) / max(1, self.max_in_flight)
+        ))
+        logger.warning(f"Rejected {request_class} request: Ollama queue full, retry after {retry_after}s")
+        raise OllamaBusyError("Ollama is busy, please retry later", retry_after=retry_after)
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the admission controller of the current application."""
+    return current_app.extensions["llot_admission"]
@@ -0,0 +1,328 @@
+"""
+Routing of Ollama requests across several backends.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+from flask import current_app
+from app.services.ollama_client import session_registry
+
+logger = logging.getLogger(__name__)
+
+
+def parse_hosts(value: str) -> List[str]:
+    """Split a comma-separated ``OLLAMA_HOST`` value into backend URLs."""
+    hosts = [h.strip().rstrip("/") for h in (value or "").split(",") if h.strip()]
+    return list(dict.fromkeys(hosts))
+
+
+def _canonical(model: str) -> str:
+    return model if ":" in model else f"{model}:latest"
+
+
+class Backend:
+    """Routing state and statistics of one Ollama server."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.resident: Optional[Set[str]] = None
+        self.installed: Optional[Set[str]] = None
+        # Outcome of the last health probe
+        self.probed_at = 0.0
+        self.probe_error: Optional[str] = None
+        self.requests = 0
+        self.failures = 0
+        self.latency_ms = 0.0
+        self.tokens_per_second = 0.0
+        self.completed_at: List[float] = []
+
+    @property
+    def ejected(self) -> bool:
+        """True from an ejection until a health probe succeeds again."""
+        return self.ejected_until > 0
+
+    def probe_due(self, now: float) -> bool:
+        """Whether the backend may be probed (ejected backends wait out their backoff)."""
+        return self.ejected_until <= now
+
+    def model_tier(self, model: Optional[str]) -> int:
+        """0 = model loaded, 1 = installed or unknown, 2 = known to be missing."""
+        if not model:
+            return 1
+        model = _canonical(model)
+        if self.resident and model in self.resident:
+            return 0
+        if self.installed is not None and model not in self.installed:
+            return 2
+        return 1
+
+
+class BackendPool:
+    """Spread generation requests over several Ollama servers.
+
+    A request goes to the healthy backend that already has the model loaded
+    and has the fewest outstanding requests (queued in llot or running).
+    Backends without the model installed are only used as a last resort.
+    After ``max_failures`` consecutive failures a backend is ejected. It is
+    probed again once an exponentially growing backoff has passed and only
+    receives traffic after a probe succeeds; each failed probe doubles the
+    backoff.
+    """
+
+    # Window for the requests-per-minute throughput figure
+    THROUGHPUT_WINDOW = 60.0
+    # Extra outstanding requests a preferred backend may have over the least loaded one
+    AFFINITY_SLACK = 2
+    # Age of probe results /api/health accepts when background probing is off
+    HEALTH_MAX_AGE = 15.0
+
+    def __init__(self, hosts: Iterable[str], session_options: Optional[Dict] = None,
+                 max_failures: int = 3, eject_base: float = 5.0, eject_max: float = 300.0,
+                 probe_interval: float = 15.0, probe_timeout: float = 3.0):
+        self.backends = [Backend(host) for host in hosts]
+        if not self.backends:
+            raise ValueError("At least one Ollama backend is required")
+        self.session_options = session_options or {}
+        self.max_failures = max_failures
+        self.eject_base = eject_base
+        self.eject_max = eject_max
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._rotation = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def hosts(self) -> List[str]:
+        return [b.host for b in self.backends]
+
+    def session(self, host: str):
+        """Get the pooled HTTP session for a backend."""
+        return session_registry.get_session(host, **self.session_options)
+
+    def select(self, model: Optional[str] = None, exclude: Iterable[str] = (),
+               prefer: Optional[str] = None) -> Backend:
+        """Pick the backend for a request without reserving it."""
+        with self._lock:
+            return self._select(model, set(exclude), prefer)
+
+    def healthy_hosts(self, model: Optional[str] = None) -> List[str]:
+        """Hosts of the backends in rotation (all of them if every backend is ejected).
+
+        Args:
+            model: Skip backends known not to have this model installed
+        """
+        with self._lock:
+            healthy = [b for b in self.backends if not b.ejected] or list(self.backends)
+            return [b.host for b in healthy if b.model_tier(model) < 2]
+
+    def acquire(self, model: Optional[str] = None, exclude: Iterable[str] = (),
+                prefer: Optional[str] = None) -> Backend:
+        """Pick a backend and count the request as outstanding on it.
+
+        Every ``acquire`` must be paired with ``release``.
+
+        Args:
+            model: Model the request will use
+            exclude: Hosts not to use (e.g. already tried)
+            prefer: Host to use unless it is unhealthy or clearly busier
+                than the others (affinity for follow-up requests)
+        """
+        with self._lock:
+            backend = self._select(model, set(exclude), prefer)
+            backend.outstanding += 1
+            return backend
+
+    def release(self, backend: Backend, ok: bool, latency: Optional[float] = None,
+                eval_count: Optional[int] = None, eval_duration: Optional[int] = None):
+        """Finish a request and record its outcome.
+
+        Args:
+            backend: Backend returned by ``acquire``
+            ok: False if the backend failed (connection error or 5xx)
+            latency: Request duration in seconds
+            eval_count: Generated tokens reported by Ollama
+            eval_duration: Generation time in nanoseconds reported by Ollama
+        """
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            backend.requests += 1
+            if not ok:
+                backend.failures += 1
+                self._record_failure(backend)
+                return
+
+            if not backend.ejected:
+                # Ejected backends are readmitted by a successful probe only
+                backend.consecutive_failures = 0
+                backend.ejections = 0
+            now = time.monotonic()
+            backend.completed_at = [t for t in backend.completed_at if now - t < self.THROUGHPUT_WINDOW]
+            backend.completed_at.append(now)
+            if latency is not None:
+                latency_ms = latency * 1000
+                backend.latency_ms = latency_ms if not backend.latency_ms else \
+                    0.8 * backend.latency_ms + 0.2 * latency_ms
+            if eval_count and eval_duration:
+                rate = eval_count / (eval_duration / 1e9)
+                backend.tokens_per_second = rate if not backend.tokens_per_second else \
+                    0.8 * backend.tokens_per_second + 0.2 * rate
+
+    def cancel(self, backend: Backend):
+        """Give back a backend whose request was never sent (e.g. rejected as busy)."""
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+
+    def probe(self):
+        """Check every backend that is due, refreshing its model lists.
+
+        Healthy backends are always due; ejected ones once their backoff has
+        passed. A successful probe readmits an ejected backend.
+        """
+        with self._probe_lock:
+            now = time.monotonic()
+            for backend in self.backends:
+                if backend.probe_due(now):
+                    self._probe_backend(backend)
+
+    def check(self, max_age: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """Health of every backend, probing again if the last probe is older than ``max_age``.
+
+        Concurrent callers share one probe round. Defaults to the probe interval.
+
+        Returns:
+            Dict of host to the error of its last probe (None when healthy)
+        """
+        if max_age is None:
+            max_age = self.probe_interval or self.HEALTH_MAX_AGE
+        if self._stale(max_age):
+            with self._probe_lock:
+                # Another caller may have probed while we waited for the lock
+                if self._stale(max_age):
+                    now = time.monotonic()
+                    for backend in self.backends:
+                        if backend.probe_due(now):
+                            self._probe_backend(backend)
+        with self._lock:
+            return {b.host: ("ejected after repeated failures" if b.ejected and not b.probe_error
+                             else b.probe_error) for b in self.backends}
+
+    def _stale(self, max_age: float) -> bool:
+        now = time.monotonic()
+        return any(now - b.probed_at > max_age for b in self.backends if b.probe_due(now))
+
+    def _next_probe_delay(self) -> float:
+        """Seconds until the next probe round, waking early for backends leaving backoff."""
+        now = time.monotonic()
+        with self._lock:
+            due = [b.ejected_until - now for b in self.backends if b.ejected_until > now]
+        return max(0.0, min([self.probe_interval] + due))
+
+    def _probe_backend(self, backend: Backend):
+        session = self.session(backend.host)
+        try:
+            ps = session.get(f"{backend.host}/api/ps", timeout=self.probe_timeout)
+            ps.raise_for_status()
+            tags = session.get(f"{backend.host}/api/tags", timeout=self.probe_timeout)
+            tags.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Ollama backend {backend.host} failed health probe: {e}")
+            with self._lock:
+                backend.probed_at = time.monotonic()
+                backend.probe_error = str(e)
+                self._record_failure(backend, force=True)
+            return
+
+        with self._lock:
+            if backend.ejections:
+                logger.info(f"Ollama backend {backend.host} is healthy again")
+            backend.probed_at = time.monotonic()
+            backend.probe_error = None
+            backend.consecutive_failures = 0
+            backend.ejections = 0
+            backend.ejected_until = 0.0
+            backend.resident = {m["name"] for m in ps.json().get("models", []) if m.get("name")}
+            backend.installed = {m["name"] for m in tags.json().get("models", []) if m.get("name")}
+
+    def start(self):
+        """Start probing backends in the background."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                self.probe()
+                self._stop.wait(self._next_probe_delay())
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="llot-backend-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                backend.host: {
+                    "healthy": not backend.ejected,
+                    "ejected_for_s": round(max(0.0, backend.ejected_until - now), 1),
+                    "outstanding": backend.outstanding,
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                    "avg_latency_ms": round(backend.latency_ms, 1),
+                    "tokens_per_second": round(backend.tokens_per_second, 1),
+                    "requests_per_minute": len([t for t in backend.completed_at
+                                                if now - t < self.THROUGHPUT_WINDOW]),
+                    "models_loaded": sorted(backend.resident or []),
+                }
+                for backend in self.backends
+            }
+
+    def _select(self, model: Optional[str], exclude: Set[str], prefer: Optional[str] = None) -> Backend:
+        """Pick a backend; must be called with the lock held."""
+        candidates = [b for b in self.backends if b.host not in exclude] or list(self.backends)
+        healthy = [b for b in candidates if not b.ejected]
+        if not healthy:
+            # Everything is ejected: try the one that comes back first
+            return min(candidates, key=lambda b: b.ejected_until)
+
+        if prefer:
+            preferred = next((b for b in healthy if b.host == prefer), None)
+            least = min(b.outstanding for b in healthy)
+            if preferred is not None and preferred.model_tier(model) < 2 \
+                    and preferred.outstanding <= least + self.AFFINITY_SLACK:
+                return preferred
+
+        # Rotate the starting point so ties do not always land on the first backend
+        offset = next(self._rotation) % len(self.backends)
+        order = {b.host: (i - offset) % len(self.backends) for i, b in enumerate(self.backends)}
+        return min(healthy, key=lambda b: (b.model_tier(model), b.outstanding, order[b.host]))
+
+    def _record_failure(self, backend: Backend, force: bool = False):
+        """Count a failure and eject the backend if needed; lock must be held."""
+        backend.consecutive_failures += 1
+        if not force and backend.consecutive_failures < self.max_failures:
+            return
+        # A single backend is never ejected: there is nowhere else to go
+        if len(self.backends) == 1:
+            return
+        backend.ejections += 1
+        duration = min(self.eject_max, self.eject_base * 2 ** (backend.ejections - 1))
+        backend.ejected_until = time.monotonic() + duration
+        backend.consecutive_failures = 0
+        logger.warning(f"Ejected Ollama backend {backend.host} for {duration:.0f}s")
+
+
+def get_backend_pool() -> Optional[BackendPool]:
+    """Get the backend pool of the current application."""
+    return current_app.extensions.get("llot_backend_pool")
@@ -0,0 +1,149 @@
+"""
+Bounded concurrent dispatch of translation work items.
+"""
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from flask import Flask, current_app
+
+logger = logging.getLogger(__name__)
+
+
+def map_concurrently(func: Callable[..., Any], tasks: Sequence[tuple], concurrency: int,
+                     app: Optional[Flask] = None) -> Iterator[Tuple[int, Any, Optional[Exception]]]:
+    """Run ``func(*task)`` for every task on a bounded thread pool.
+
+    Each call runs inside an application context so services can read the
+    Flask config. Results are yielded as soon as they complete.
+
+    Args:
+        func: Function to call
+        tasks: Argument tuples, one per call
+        concurrency: Maximum number of calls in flight
+        app: Flask application (defaults to the current one)
+
+    Yields:
+        Tuples of (task_index, result, error); exactly one of result/error is set
+    """
+    app = app or current_app._get_current_object()
+
+    def run(task):
+        with app.app_context():
+            return func(*task)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(tasks) or 1)))
+    try:
+        futures = {executor.submit(run, task): index for index, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result(), None
+            except Exception as e:
+                yield index, None, e
+    finally:
+        # Drop queued work if the consumer went away (e.g. client disconnected)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_flag(value: Any, default: bool = False) -> bool:
+    """Read a boolean request parameter; strings such as "false" or "0" are False."""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+
+class BatchTranslator:
+    """Translate a list of items with deduplication and bounded concurrency."""
+
+    ITEM_FIELDS = ("source_lang", "target_lang", "tone", "think", "model")
+    TEXT_FIELDS = ("source_lang", "target_lang", "tone", "model")
+
+    def __init__(self, translation_service, concurrency: int = 4):
+        self.translation_service = translation_service
+        self.concurrency = concurrency
+
+    def normalize_items(self, items: List[Dict], defaults: Dict) -> List[Dict]:
+        """Fill per-item parameters from request-level defaults.
+
+        An item with a field of the wrong type gets an ``error`` and is
+        reported as failed instead of translated.
+
+        Raises:
+            ValueError: If a request-level default has the wrong type
+        """
+        for field in self.TEXT_FIELDS:
+            if not isinstance(defaults.get(field) or "", str):
+                raise ValueError(f"Invalid {field}: expected a string")
+
+        normalized = []
+        for item in items:
+            if isinstance(item, str):
+                item = {"source_text": item}
+            if not isinstance(item, dict):
+                item = {}
+            invalid = [field for field in ("source_text",) + self.TEXT_FIELDS
+                       if not isinstance(item.get(field) or "", str)]
+            if invalid:
+                item = {"id": item.get("id")}
+            normalized.append({
+                "id": item.get("id"),
+                "source_text": (item.get("source_text") or "").strip(),
+                "source_lang": (item.get("source_lang") or defaults.get("source_lang") or "auto").strip(),
+                "target_lang": (item.get("target_lang") or defaults.get("target_lang") or "de").strip(),
+                "tone": (item.get("tone") or defaults.get("tone") or "neutral").strip(),
+                "think": parse_flag(item.get("think", defaults.get("think"))),
+                "model": (item.get("model") or defaults.get("model") or "").strip() or None,
+                "error": f"Invalid {', '.join(invalid)}: expected a string" if invalid else None,
+            })
+        return normalized
+
+    def run(self, items: List[Dict]) -> Iterator[Dict]:
+        """Translate normalized items, yielding results as they complete.
+
+        Identical items (same text and parameters) are translated once and the
+        result is fanned out to every index that requested it.
+
+        Yields:
+            Result dicts with the item ``index`` and either ``translated_text``
+            or ``error``
+        """
+        groups: Dict[str, List[int]] = {}
+        unique: List[Dict] = []
+        for index, item in enumerate(items):
+            if item["error"]:
+                yield {"index": index, "id": item["id"], "target_lang": item["target_lang"],
+                       "error": item["error"]}
+                continue
+            key = json.dumps([item["source_text"]] + [item[f] for f in self.ITEM_FIELDS])
+            if key not in groups:
+                groups[key] = []
+                unique.append(item)
+            groups[key].append(index)
+
+        keys = list(groups.keys())
+        logger.info(f"Batch translation: {len(items)} items, {len(unique)} unique")
+
+        for unique_index, translated, error in map_concurrently(
+            self._translate_item, [(item,) for item in unique], self.concurrency
+        ):
+            item = unique[unique_index]
+            for index in groups[keys[unique_index]]:
+                result = {"index": index, "id": items[index]["id"],
+                          "target_lang": item["target_lang"]}
+                if error is not None:
+                    result["error"] = f"Translation error: {str(error)}"
+                else:
+                    result["translated_text"], detected = translated
+                    result["source_lang"] = detected or item["source_lang"]
+                yield result
+
+    def _translate_item(self, item: Dict) -> Tuple[str, Optional[str]]:
+        if not item["source_text"]:
+            return "", None
+        return self.translation_service.translate(
+            item["source_text"], item["source_lang"], item["target_lang"], item["tone"],
+            think=item["think"], model=item["model"], request_class="batch"
+        )
@@ -0,0 +1,88 @@
+"""
+Hedged generation requests: a duplicate to a second backend for slow calls.
+"""
+import logging
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class HedgingPolicy:
+    """Decide when a slow request gets a duplicate on another backend.
+
+    The hedge delay is either fixed or the observed p95 latency, so only the
+    slowest few percent of requests are duplicated. Hedges are paid from a
+    budget that grows by ``max_rate`` per request, which caps the extra load
+    at that fraction of traffic even when a backend is stuck for a while.
+    """
+
+    # Latencies kept for the percentile estimate
+    WINDOW = 200
+    # Samples needed before the observed p95 replaces the fallback delay
+    MIN_SAMPLES = 20
+
+    def __init__(self, delay: float = 0.0, max_rate: float = 0.1, min_delay: float = 1.0,
+                 fallback_delay: float = 10.0, request_classes: Iterable[str] = ("translate", "alternatives")):
+        self.fixed_delay = delay
+        self.max_rate = max_rate
+        self.min_delay = min_delay
+        self.fallback_delay = fallback_delay
+        self.request_classes = set(request_classes)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=self.WINDOW)
+        self._budget = 1.0
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "skipped_budget": 0}
+
+    def applies_to(self, request_class: str) -> bool:
+        return request_class in self.request_classes
+
+    def delay(self) -> float:
+        """Seconds to wait for the first response before hedging."""
+        if self.fixed_delay > 0:
+            return self.fixed_delay
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.MIN_SAMPLES:
+            return self.fallback_delay
+        p95 = samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+        return max(self.min_delay, p95)
+
+    def start_request(self):
+        """Count a request and earn hedge budget for it."""
+        with self._lock:
+            self._stats["requests"] += 1
+            self._budget = min(10.0, self._budget + self.max_rate)
+
+    def try_hedge(self) -> bool:
+        """Spend budget on a hedge; False if the hedge rate cap is reached."""
+        with self._lock:
+            if self._budget < 1.0:
+                self._stats["skipped_budget"] += 1
+                return False
+            self._budget -= 1.0
+            self._stats["hedged"] += 1
+            return True
+
+    def record(self, latency: float, hedge_won: bool = False):
+        """Record the latency of a completed request."""
+        with self._lock:
+            self._latencies.append(latency)
+            if hedge_won:
+                self._stats["hedge_wins"] += 1
+
+    def stats(self) -> Dict:
+        delay = self.delay()
+        with self._lock:
+            stats = dict(self._stats)
+        stats["delay_s"] = round(delay, 2)
+        stats["hedge_rate"] = round(stats["hedged"] / stats["requests"], 3) if stats["requests"] else 0.0
+        return stats
+
+
+def get_hedging_policy() -> Optional[HedgingPolicy]:
+    """Get the hedging policy of the current application, if hedging is enabled."""
+    return current_app.extensions.get("llot_hedging")
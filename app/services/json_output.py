@@ -0,0 +1,134 @@
+"""
+JSON schemas for structured Ollama output and a tolerant parser for replies.
+"""
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+ALTERNATIVES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "alternatives": {"type": "array", "items": {"type": "string"}, "maxItems": 6},
+    },
+    "required": ["alternatives"],
+}
+
+REFINE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "translated": {"type": "string"},
+        "faithful": {"type": "boolean"},
+    },
+    "required": ["translated", "faithful"],
+}
+
+_CODE_FENCE = re.compile(r"```(?:json)?")
+
+
+def word_alternatives_schema(words: List[str]) -> Dict:
+    """Schema for alternatives of several words: ``{"alternatives": {word: [...]}}``."""
+    word_list = {"type": "array", "items": {"type": "string"}, "maxItems": 6}
+    return {
+        "type": "object",
+        "properties": {
+            "alternatives": {
+                "type": "object",
+                "properties": {word: word_list for word in words},
+                "required": list(words),
+            },
+        },
+        "required": ["alternatives"],
+    }
+
+
+def parse_json_output(text: str) -> Tuple[Optional[Any], str]:
+    """Parse the JSON object in a model reply.
+
+    Text around the object (prose, code fences) is ignored. A reply cut off
+    by the token limit is salvaged up to its last complete element, e.g.
+    ``{"alternatives": ["a", "b", "c`` gives ``{"alternatives": ["a", "b"]}``.
+    Strings are never closed artificially, so half a word or half a
+    translation is not returned.
+
+    Returns:
+        Tuple of (parsed value or None, outcome), outcome being "ok",
+        "salvaged" or "failed"
+    """
+    text = _CODE_FENCE.sub("", text or "")
+    start = text.find("{")
+    if start < 0:
+        return None, "failed"
+
+    stack: List[str] = []
+    in_string = escaped = False
+    # Position and open brackets after the last complete element
+    last_comma: Optional[Tuple[int, List[str]]] = None
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack or stack.pop() != char:
+                return None, "failed"
+            if not stack:
+                return _loads(text[start:i + 1], "ok")
+        elif char == ",":
+            last_comma = (i, list(stack))
+
+    # Truncated: close what is open, or drop the unfinished last element
+    if not in_string:
+        value, outcome = _loads(text[start:].rstrip() + "".join(reversed(stack)), "salvaged")
+        if value is not None:
+            return value, outcome
+    if last_comma is not None:
+        end, open_brackets = last_comma
+        return _loads(text[start:end] + "".join(reversed(open_brackets)), "salvaged")
+    return None, "failed"
+
+
+def _loads(text: str, outcome: str) -> Tuple[Optional[Any], str]:
+    try:
+        return json.loads(text), outcome
+    except json.JSONDecodeError:
+        return None, "failed"
+
+
+class JsonOutputStats:
+    """Count how often structured replies parse, need salvaging or fail, per model."""
+
+    OUTCOMES = ("ok", "salvaged", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, model: str, outcome: str):
+        with self._lock:
+            counts = self._counts.setdefault(model, dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+        if outcome != "ok":
+            logger.info(f"Structured output of {model}: {outcome}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {model: dict(counts) for model, counts in self._counts.items()}
+
+
+def get_json_output_stats() -> JsonOutputStats:
+    """Get the structured output counters of the current application."""
+    return current_app.extensions["llot_json_output"]
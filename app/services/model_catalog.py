@@ -0,0 +1,185 @@
+"""
+In-memory catalog of installed Ollama models, refreshed in the background.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from flask import Flask, current_app
+from app.services.ollama_client import get_backend_clients
+
+logger = logging.getLogger(__name__)
+
+
+def _model_metadata(tag: Dict, show: Dict) -> Dict:
+    """Merge an /api/tags entry with the /api/show response of the same model."""
+    details = tag.get("details") or {}
+    model_info = show.get("model_info") or {}
+    architecture = model_info.get("general.architecture") or details.get("family")
+    context_length = model_info.get(f"{architecture}.context_length") if architecture else None
+    return {
+        "name": tag["name"],
+        "digest": tag.get("digest"),
+        "size": tag.get("size"),
+        "modified_at": tag.get("modified_at"),
+        "family": details.get("family"),
+        "parameter_size": details.get("parameter_size"),
+        "quantization_level": details.get("quantization_level"),
+        "architecture": architecture,
+        "context_length": context_length,
+    }
+
+
+class ModelCatalog:
+    """Installed models and their metadata, kept in memory.
+
+    The model list is read from Ollama's ``/api/tags`` on an interval by a
+    background thread (and on demand), so listing models, health checks and
+    model switches do not each cost a round trip to Ollama. With several
+    backends the catalog is the union of the models installed on the healthy
+    ones, and each model lists the ``backends`` that have it. ``/api/show`` is
+    only called for models whose digest is new, and a changed digest (the
+    model was re-pulled) invalidates cached translations of that model.
+    """
+
+    # Seconds before an access retries a refresh that failed
+    ERROR_RETRY_INTERVAL = 10.0
+
+    def __init__(self, app: Flask, refresh_interval: float = 300.0):
+        self.app = app
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._models: Dict[str, Dict] = {}
+        self._refreshed_at = 0.0
+        self._attempted_at = 0.0
+        self._error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background refresh thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="llot-model-catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self) -> bool:
+        """Re-read the installed models from Ollama.
+
+        Returns:
+            True if Ollama answered, False if the previous catalog was kept
+        """
+        # Concurrent on-demand refreshes share a single round trip
+        if not self._refresh_lock.acquire(blocking=False):
+            with self._refresh_lock:
+                return self._error is None
+        try:
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def models(self) -> List[Dict]:
+        """Get metadata of all installed models, sorted by name."""
+        self._ensure_loaded()
+        with self._lock:
+            return [dict(self._models[name]) for name in sorted(self._models)]
+
+    def names(self) -> List[str]:
+        """Get the names of all installed models."""
+        return [m["name"] for m in self.models()]
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Get metadata of one model, or None if it is not installed."""
+        self._ensure_loaded()
+        with self._lock:
+            model = self._models.get(name)
+            return dict(model) if model else None
+
+    def has(self, name: str) -> bool:
+        """Check whether a model is installed, refreshing once if it is unknown."""
+        return self.get(name) is not None or (self.refresh() and self.get(name) is not None)
+
+    def status(self) -> Dict:
+        """Get the catalog state for health checks."""
+        with self._lock:
+            return {
+                "models": len(self._models),
+                "refreshed_at": self._refreshed_at or None,
+                "error": self._error,
+            }
+
+    def _ensure_loaded(self):
+        if self._refreshed_at and self._error is None:
+            return
+        if not self._attempted_at or time.monotonic() - self._attempted_at > self.ERROR_RETRY_INTERVAL:
+            self.refresh()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+
+    def _refresh(self) -> bool:
+        self._attempted_at = time.monotonic()
+        try:
+            with self.app.app_context():
+                clients = get_backend_clients()
+                # First backend listing a model provides its metadata
+                tags: Dict[str, tuple] = {}
+                errors = []
+                for client in clients:
+                    try:
+                        listed = client.list_models()
+                    except Exception as e:
+                        logger.warning(f"Failed to list models of {client.host}: {e}")
+                        errors.append(str(e))
+                        continue
+                    for tag in listed:
+                        tags.setdefault(tag["name"], (client, tag, []))[2].append(client.host)
+                if len(errors) == len(clients):
+                    raise Exception(errors[0])
+
+                with self._lock:
+                    known = dict(self._models)
+
+                models = {}
+                for name, (client, tag, hosts) in tags.items():
+                    previous = known.get(name)
+                    if previous and previous.get("digest") == tag.get("digest"):
+                        models[name] = dict(previous, backends=hosts)
+                        continue
+                    try:
+                        show = client.show_model(name)
+                    except Exception as e:
+                        logger.warning(f"Failed to get details of model {name}: {e}")
+                        show = {}
+                    models[name] = dict(_model_metadata(tag, show), backends=hosts)
+        except Exception as e:
+            logger.warning(f"Failed to refresh model catalog: {e}")
+            with self._lock:
+                self._error = str(e)
+            return False
+
+        changed = [name for name, model in known.items()
+                   if name in models and model.get("digest") != models[name].get("digest")]
+        with self._lock:
+            self._models = models
+            self._refreshed_at = time.time()
+            self._error = None
+
+        cache = self.app.extensions.get("llot_translation_cache")
+        for name in changed:
+            logger.info(f"Model {name} changed digest, dropping its cached translations")
+            if cache is not None:
+                cache.invalidate_model(name)
+        return True
+
+
+def get_model_catalog() -> ModelCatalog:
+    """Get the model catalog of the current application."""
+    return current_app.extensions["llot_model_catalog"]
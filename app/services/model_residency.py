@@ -0,0 +1,144 @@
+"""
+Tracking and warming of models resident in Ollama memory.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from flask import Flask, current_app
+from app.services.ollama_client import get_backend_clients
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(model: str) -> str:
+    """Ollama reports untagged models with the implicit ``latest`` tag."""
+    return model if ":" in model else f"{model}:latest"
+
+
+class ModelResidency:
+    """Keep configured models loaded and report which models are in memory.
+
+    Loading a model into Ollama takes seconds to minutes, which would
+    otherwise be paid by the first translation after startup, after a model
+    switch, or after Ollama unloaded an idle model. Models are preloaded in
+    the background and the resident set is read from Ollama's running-models
+    API, cached for ``status_ttl`` seconds so the UI can poll it cheaply.
+    With several backends a model is loaded on every healthy backend that
+    has it installed, and the status lists the ``backends`` holding it.
+    """
+
+    def __init__(self, app: Flask, status_ttl: float = 10.0):
+        self.app = app
+        self.status_ttl = status_ttl
+        self._lock = threading.Lock()
+        self._loading: Dict[str, float] = {}
+        self._resident: Dict[str, Dict] = {}
+        self._checked_at = 0.0
+        self._reachable = False
+
+    def warm_up(self, models: Iterable[str], wait: bool = False) -> List[str]:
+        """Preload models that are not resident yet.
+
+        Args:
+            models: Model names to load
+            wait: Block until loading finished instead of loading in the background
+
+        Returns:
+            Names of the models being loaded
+        """
+        with self._lock:
+            pending = [m for m in dict.fromkeys(_canonical(m) for m in models if m)
+                       if m not in self._loading and self._missing_hosts(m)]
+            for model in pending:
+                self._loading[model] = time.time()
+
+        for model in pending:
+            if wait:
+                self._load(model)
+            else:
+                threading.Thread(target=self._load, args=(model,),
+                                 name=f"llot-preload-{model}", daemon=True).start()
+        return pending
+
+    def status(self, refresh: bool = False) -> Dict:
+        """Get the load state of models.
+
+        Args:
+            refresh: Query Ollama even if the cached state is still fresh
+
+        Returns:
+            Dict with ``reachable`` and ``models`` mapping model name to its
+            ``state`` (``loaded`` or ``loading``) plus Ollama's memory details
+        """
+        if refresh or time.monotonic() - self._checked_at > self.status_ttl:
+            self._refresh()
+
+        with self._lock:
+            models = {
+                name: {"state": "loaded", "expires_at": info.get("expires_at"),
+                       "size_vram": info.get("size_vram"), "backends": info["backends"]}
+                for name, info in self._resident.items()
+            }
+            for name, since in self._loading.items():
+                models.setdefault(name, {"state": "loading", "since": since})
+            return {"reachable": self._reachable, "models": models}
+
+    def state_of(self, model: str) -> str:
+        """Get the state of one model: ``loaded``, ``loading`` or ``cold``."""
+        return self.status()["models"].get(_canonical(model), {}).get("state", "cold")
+
+    def _missing_hosts(self, model: str) -> List[str]:
+        """Healthy backends that could hold a model but do not; lock must be held."""
+        loaded = self._resident.get(model, {}).get("backends", [])
+        pool = self.app.extensions["llot_backend_pool"]
+        return [host for host in pool.healthy_hosts(model) if host not in loaded]
+
+    def _load(self, model: str):
+        started = time.monotonic()
+        try:
+            with self.app.app_context():
+                clients = get_backend_clients(model)
+            with self._lock:
+                loaded_on = self._resident.get(model, {}).get("backends", [])
+            for client in clients:
+                if client.host in loaded_on:
+                    continue
+                if client.preload():
+                    logger.info(f"Model {model} loaded on {client.host} in {time.monotonic() - started:.1f}s")
+        finally:
+            with self._lock:
+                self._loading.pop(model, None)
+            # The resident set changed; do not serve the stale one
+            self._checked_at = 0.0
+
+    def _refresh(self):
+        with self.app.app_context():
+            clients = get_backend_clients()
+        resident: Dict[str, Dict] = {}
+        reachable = False
+        for client in clients:
+            try:
+                running = client.get_running_models()
+            except Exception as e:
+                logger.debug(f"Could not query running models of {client.host}: {e}")
+                continue
+            reachable = True
+            for model in running:
+                resident.setdefault(model["name"], dict(model, backends=[]))["backends"].append(client.host)
+
+        with self._lock:
+            self._resident = resident
+            self._reachable = reachable
+            self._checked_at = time.monotonic()
+
+
+def startup_models(config) -> List[str]:
+    """Models to preload when the application starts."""
+    models = [config["DEFAULT_MODEL"], config.get("SMALL_MODEL")] + list(config.get("OLLAMA_PRELOAD_MODELS", []))
+    return list(dict.fromkeys(m for m in models if m))
+
+
+def get_model_residency() -> Optional[ModelResidency]:
+    """Get the residency tracker of the current application."""
+    return current_app.extensions.get("llot_model_residency")
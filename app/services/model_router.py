@@ -0,0 +1,116 @@
+"""
+Routing of requests between a small fast model and the default (large) model.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from flask import current_app
+from app.services.segmenter import estimate_tokens, split_segments
+
+logger = logging.getLogger(__name__)
+
+# Model name that lets the router pick
+AUTO_MODEL = "auto"
+
+
+@dataclass(frozen=True)
+class Route:
+    """The model chosen for a request and why."""
+    model: str
+    name: str
+    # Model to retry with if the chosen one fails
+    escalate_to: Optional[str] = None
+
+
+class ModelRouter:
+    """Send short, simple requests to a small model and the rest to the default model.
+
+    Only requests without an explicit model (or with ``"auto"``) are routed.
+    Think mode, language pairs listed in ``large_pairs`` and inputs longer
+    than ``max_small_tokens`` or ``max_small_segments`` sentences go to the
+    default model; word alternatives and other short inputs go to the small
+    one. Latency is tracked per route, so the thresholds can be tuned
+    against ``/api/stats``.
+    """
+
+    def __init__(self, small_model: str, max_small_tokens: int = 40, max_small_segments: int = 2,
+                 large_pairs: Iterable[str] = ()):
+        self.small_model = small_model
+        self.max_small_tokens = max_small_tokens
+        self.max_small_segments = max_small_segments
+        self.large_pairs = set(large_pairs)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.small_model)
+
+    def route(self, task: str, source_text: str, source_lang: str, target_lang: str,
+              think: bool, default_model: str) -> Route:
+        """Pick the model for a request.
+
+        Args:
+            task: "translate", "alternatives", "refine" or "document"
+            source_text: Text being translated
+            source_lang: Source language code (may be "auto")
+            target_lang: Target language code
+            think: Whether think mode is requested
+            default_model: The large model
+        """
+        if not self.enabled or self.small_model == default_model:
+            return Route(default_model, "default")
+        if think:
+            return Route(default_model, "large/think")
+        if self._large_pair(source_lang, target_lang):
+            return Route(default_model, "large/language_pair")
+        if task == "alternatives":
+            return Route(self.small_model, "small/alternatives", escalate_to=default_model)
+        if task == "document" or estimate_tokens(source_text) > self.max_small_tokens \
+                or len(split_segments(source_text.strip())) > self.max_small_segments:
+            return Route(default_model, "large/long_input")
+        return Route(self.small_model, "small/short_input", escalate_to=default_model)
+
+    @contextmanager
+    def timed(self, route: Route):
+        """Measure a request served on a route."""
+        started = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(route, time.monotonic() - started, ok)
+
+    def record(self, route: Route, latency: float, ok: bool = True):
+        with self._lock:
+            stats = self._stats.setdefault(route.name, {"model": route.model, "requests": 0,
+                                                        "failures": 0, "total_latency": 0.0})
+            stats["model"] = route.model
+            stats["requests"] += 1
+            stats["failures"] += int(not ok)
+            stats["total_latency"] += latency
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {
+                    "model": stats["model"],
+                    "requests": stats["requests"],
+                    "failures": stats["failures"],
+                    "avg_latency_ms": round(1000 * stats["total_latency"] / stats["requests"], 1),
+                }
+                for name, stats in self._stats.items()
+            }
+
+    def _large_pair(self, source_lang: str, target_lang: str) -> bool:
+        return bool({f"{source_lang}>{target_lang}", f"*>{target_lang}", f"{source_lang}>*"}
+                    & self.large_pairs)
+
+
+def get_model_router() -> ModelRouter:
+    """Get the model router of the current application."""
+    return current_app.extensions["llot_model_router"]
@@ -1,79 +1,677 @@
 import requests
+import copy
 import json
 import logging
-from typing import Optional, List
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterator, Optional, List, Tuple
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.services.admission import AdmissionController, OllamaBusyError
+from app.services.runtime_options import estimate_prompt_tokens
 
 logger = logging.getLogger(__name__)
 
 
+class SessionRegistry:
+    """Process-wide registry of pooled keep-alive HTTP sessions keyed by host.
+
+    Sessions are created lazily on first use, so with gunicorn every worker
+    builds its own connection pool after forking. If a fork happens after a
+    pool was created, the child drops the inherited sessions and starts fresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._pid = os.getpid()
+
+    def get_session(self, host: str, pool_size: int = 32, max_retries: int = 2,
+                    backoff: float = 0.3) -> requests.Session:
+        """Get the shared session for a host, creating it if needed.
+
+        Args:
+            host: Base URL of the Ollama server
+            pool_size: Maximum number of keep-alive connections to the host
+            max_retries: Retries for connection errors (and 502/503/504 on GET)
+            backoff: Exponential backoff factor between retries
+
+        Returns:
+            Pooled requests session
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._sessions = {}
+                self._pid = os.getpid()
+
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._create_session(pool_size, max_retries, backoff)
+                self._sessions[host] = session
+                logger.info(f"Created HTTP pool for {host} (size={pool_size}, retries={max_retries})")
+            return session
+
+    def reset(self):
+        """Close and forget all sessions."""
+        with self._lock:
+            for session in self._sessions.values():
+                try:
+                    session.close()
+                except Exception:
+                    pass
+            self._sessions = {}
+
+    def _after_fork(self):
+        """Drop inherited sessions in a forked child without touching their sockets."""
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _create_session(pool_size: int, max_retries: int, backoff: float) -> requests.Session:
+        # Generation requests are not idempotent, so only connection failures are
+        # retried for POST; read/status retries are limited to GET (model listing).
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+class OllamaCancelledError(Exception):
+    """Raised when a generation was aborted because its result is no longer needed."""
+
+
+session_registry = SessionRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=session_registry._after_fork)
+
+
 class OllamaClient:
     """Client for interacting with Ollama API."""
 
-    def __init__(self, host: str, model: str):
+    def __init__(self, host: str, model: str, session: Optional[requests.Session] = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 120.0,
+                 admission: Optional[AdmissionController] = None, request_class: str = "translate",
+                 keep_alive: Optional[str] = None, pool=None, hedging=None,
+                 preferred_host: Optional[str] = None, runtime=None, thinking=None):
         self.host = host.rstrip("/")
         self.model = model
-        self.timeout = 120
+        self.session = session or session_registry.get_session(self.host)
+        self.connect_timeout = connect_timeout
+        self.timeout = read_timeout
+        self.admission = admission
+        self.request_class = request_class
+        self.keep_alive = keep_alive or None
+        self.pool = pool
+        self.hedging = hedging
+        self.exclude_hosts: Tuple[str, ...] = ()
+        self.preferred_host = preferred_host
+        self.runtime = runtime
+        self.thinking = thinking
+        self._response = None
+        self.last_stream_status: Optional[str] = None
+        # Streamed fragments (about one token each) of the last request
+        self.thinking_tokens = 0
+        self.answer_tokens = 0
+        # The last request exceeded its thinking budget and was answered without thinking
+        self.thinking_cut_off = False
+
+    def _timeouts(self, read_timeout: Optional[float] = None) -> Tuple[float, float]:
+        return (self.connect_timeout, read_timeout or self.timeout)
+
+    def _generation_slot(self):
+        """Context manager holding an admission slot for a generation request."""
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.slot(self.host, self.request_class)
+
+    def _acquire_backend(self, exclude: Tuple[str, ...] = ()):
+        """Route the next generation request through the backend pool.
+
+        Points the client at the chosen backend and returns it, or returns
+        None when the client talks to a single fixed host.
+        """
+        if self.pool is None:
+            return None
+        backend = self.pool.acquire(self.model, exclude, prefer=self.preferred_host)
+        self.host = backend.host
+        self.session = self.pool.session(backend.host)
+        return backend
+
+    def _chat_payload(self, prompt: str, max_tokens: int, temperature: float,
+                      think: bool, stream: bool, system: Optional[str] = None,
+                      history: Optional[List[Dict]] = None,
+                      response_format: Optional[Dict] = None,
+                      output_tokens: Optional[int] = None) -> dict:
+        """Build the /api/chat request body."""
+        messages = list(history or []) + [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        options = {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+        }
+        if self.runtime is not None:
+            runtime = self.runtime.options(self.model, estimate_prompt_tokens(messages),
+                                           output_tokens or max_tokens)
+            options = {**runtime, **options}
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+            "think": think,
+            "options": options,
+        }
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        if response_format:
+            payload["format"] = response_format
+        return payload
 
     def chat_completion(self, prompt: str, max_tokens: int = 2048,
-                        temperature: float = 0.0, think: bool = False) -> Optional[str]:
+                        temperature: float = 0.0, think: bool = False,
+                        cancel_event: Optional[threading.Event] = None,
+                        system: Optional[str] = None,
+                        history: Optional[List[Dict]] = None,
+                        response_format: Optional[Dict] = None,
+                        guard: Optional[Callable[[str], bool]] = None,
+                        output_tokens: Optional[int] = None) -> Optional[str]:
         """Call Ollama /api/chat endpoint.
 
         Args:
-            prompt: The prompt to send
+            prompt: The prompt to send (user message)
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
             think: Whether to enable chain-of-thought reasoning (thinking models only)
+            cancel_event: If given, the response is streamed and the upstream
+                connection is closed as soon as the event is set
+            system: Optional system message sent before the prompt
+            history: Earlier user/assistant messages of the conversation
+            response_format: JSON schema the reply must follow (Ollama ``format``)
+            guard: If given, the response is streamed and every fragment is
+                passed to it; the generation stops when it returns True and
+                ``last_stream_status`` is then ``"runaway"``
+            output_tokens: Expected answer length, used instead of ``max_tokens``
+                to size the context window when ``max_tokens`` is only a backstop
 
         Returns:
             Generated text or None if failed
+
+        Raises:
+            OllamaCancelledError: If ``cancel_event`` was set before completion
+        """
+        if self._should_hedge():
+            try:
+                return self._hedged_completion(prompt, max_tokens, temperature, think, cancel_event,
+                                               system, history, response_format, guard, output_tokens)
+            except (OllamaCancelledError, OllamaBusyError):
+                raise
+            except Exception as e:
+                # Every attempt failed: retry like an unhedged request, which
+                # fails over to the other backends
+                logger.warning(f"Hedged Ollama request failed ({e}), retrying without hedging")
+        if cancel_event is not None or guard is not None or self._thinking_budget(think) is not None:
+            return self._collect_stream(prompt, max_tokens, temperature, think, cancel_event,
+                                        system, history, response_format, guard, output_tokens)
+
+        self.thinking_cut_off = False
+        payload = self._chat_payload(prompt, max_tokens, temperature, think, stream=False,
+                                     system=system, history=history, response_format=response_format,
+                                     output_tokens=output_tokens)
+
+        try:
+            data = self._post_chat(payload)
+            content = data.get("message", {}).get("content", "").strip()
+
+            if not content:
+                raise Exception("Empty response from Ollama")
+
+            return content
+
+        except requests.RequestException as e:
+            logger.error(f"Ollama request failed: {e}")
+            raise Exception(f"Ollama connection error: {e}")
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.error(f"Ollama response parsing failed: {e}")
+            raise Exception(f"Ollama response error: {e}")
+
+    def _post_chat(self, payload: dict) -> dict:
+        """Send a non-streaming chat request and return the decoded response.
+
+        With a backend pool, a request that cannot connect is retried once on
+        every other backend before giving up.
+        """
+        tried: List[str] = []
+        while True:
+            backend = self._acquire_backend(tuple(tried))
+            url = f"{self.host}/api/chat"
+            started = time.monotonic()
+            sent = failed = False
+            data: Dict = {}
+            try:
+                logger.info(f"Calling Ollama /api/chat: {url} (think={payload['think']}, class={self.request_class})")
+                with self._generation_slot():
+                    sent = True
+                    response = self.session.post(url, json=payload, timeout=self._timeouts())
+
+                if not response.ok:
+                    failed = response.status_code >= 500
+                    raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+
+                data = response.json()
+                return data
+            except requests.ConnectionError:
+                failed = True
+                if backend is None or len(tried) + 1 >= len(self.pool.backends):
+                    raise
+                tried.append(backend.host)
+                logger.warning(f"Ollama backend {backend.host} unreachable, trying another backend")
+            except requests.Timeout:
+                failed = True
+                raise
+            finally:
+                if backend is not None and not sent:
+                    self.pool.cancel(backend)
+                elif backend is not None:
+                    self.pool.release(backend, not failed, time.monotonic() - started,
+                                      data.get("eval_count"), data.get("eval_duration"))
+
+    def _thinking_budget(self, think: bool):
+        if not think or self.thinking is None:
+            return None
+        return self.thinking.budget_for(self.request_class)
+
+    def _should_hedge(self) -> bool:
+        return (self.hedging is not None and self.pool is not None
+                and len(self.pool.backends) > 1 and self.hedging.applies_to(self.request_class))
+
+    def _hedged_completion(self, prompt: str, max_tokens: int, temperature: float, think: bool,
+                           cancel_event: Optional[threading.Event] = None,
+                           system: Optional[str] = None,
+                           history: Optional[List[Dict]] = None,
+                           response_format: Optional[Dict] = None,
+                           guard: Optional[Callable[[str], bool]] = None,
+                           output_tokens: Optional[int] = None) -> str:
+        """Run a chat completion, duplicating it on a second backend if it is slow.
+
+        Both attempts are streamed so the loser can be cancelled, which closes
+        its connection and stops the generation on that backend. The first
+        successful attempt wins and its host, status and token counts are
+        copied back; an error is only raised once all attempts failed.
+        """
+        policy = self.hedging
+        policy.start_request()
+        results: queue.Queue = queue.Queue()
+        attempts: List[Tuple["OllamaClient", threading.Event]] = []
+        started = time.monotonic()
+
+        def launch(exclude: Tuple[str, ...]):
+            client = copy.copy(self)
+            client.hedging = None
+            client.exclude_hosts = exclude
+            event = threading.Event()
+            attempts.append((client, event))
+            # Each attempt watches its own output
+            attempt_guard = copy.deepcopy(guard)
+
+            def run():
+                try:
+                    content = client._collect_stream(prompt, max_tokens, temperature, think, event,
+                                                     system, history, response_format, attempt_guard,
+                                                     output_tokens)
+                    results.put((client, content, None))
+                except Exception as e:
+                    results.put((client, None, e))
+
+            threading.Thread(target=run, name="llot-hedge", daemon=True).start()
+
+        launch(())
+        hedge_at = started + policy.delay()
+        pending = 1
+        error: Optional[Exception] = None
+        try:
+            while pending:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OllamaCancelledError("Ollama generation cancelled")
+
+                wait = None
+                if len(attempts) == 1 and hedge_at is not None:
+                    wait = max(0.0, hedge_at - time.monotonic())
+                if cancel_event is not None:
+                    wait = min(wait if wait is not None else 0.25, 0.25)
+
+                try:
+                    client, content, exc = results.get(timeout=wait)
+                except queue.Empty:
+                    if len(attempts) == 1 and hedge_at is not None and time.monotonic() >= hedge_at:
+                        hedge_at = None
+                        if policy.try_hedge():
+                            primary = attempts[0][0]
+                            logger.info(f"Ollama request on {primary.host} is slow, hedging on another backend")
+                            launch((primary.host,))
+                            pending += 1
+                    continue
+
+                pending -= 1
+                if exc is None:
+                    policy.record(time.monotonic() - started, hedge_won=client is not attempts[0][0])
+                    self.host = client.host
+                    self.last_stream_status = client.last_stream_status
+                    self.thinking_cut_off = client.thinking_cut_off
+                    self.thinking_tokens = client.thinking_tokens
+                    self.answer_tokens = client.answer_tokens
+                    return content
+                error = exc
+            raise error
+        finally:
+            # Cancel whichever attempt is still running, even if it is still
+            # waiting for its first token
+            for client, event in attempts:
+                event.set()
+                client.abort()
+
+    def abort(self):
+        """Close the connection of a streamed request running in another thread."""
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _collect_stream(self, prompt: str, max_tokens: int, temperature: float, think: bool,
+                        cancel_event: Optional[threading.Event], system: Optional[str] = None,
+                        history: Optional[List[Dict]] = None,
+                        response_format: Optional[Dict] = None,
+                        guard: Optional[Callable[[str], bool]] = None,
+                        output_tokens: Optional[int] = None) -> str:
+        """Run a streamed chat completion and return the full content."""
+        stream = self.chat_completion_stream(
+            prompt, max_tokens=max_tokens, temperature=temperature, think=think,
+            cancel_event=cancel_event, system=system, history=history,
+            response_format=response_format, output_tokens=output_tokens
+        )
+        parts = []
+        runaway = False
+        try:
+            for fragment in stream:
+                parts.append(fragment)
+                if guard is not None and guard(fragment):
+                    runaway = True
+                    break
+        finally:
+            stream.close()
+        if runaway:
+            logger.warning(f"Stopping runaway generation on {self.host}")
+            self.last_stream_status = "runaway"
+        content = "".join(parts).strip()
+
+        if self.last_stream_status == "cancelled":
+            raise OllamaCancelledError("Ollama generation cancelled")
+        if not content:
+            raise Exception("Empty response from Ollama")
+        return content
+
+    def chat_completion_stream(self, prompt: str, max_tokens: int = 2048,
+                               temperature: float = 0.0, think: bool = False,
+                               cancel_event: Optional[threading.Event] = None,
+                               system: Optional[str] = None,
+                               history: Optional[List[Dict]] = None,
+                               response_format: Optional[Dict] = None,
+                               output_tokens: Optional[int] = None) -> Iterator[str]:
+        """Call Ollama /api/chat endpoint with streaming enabled.
+
+        Yields content fragments as Ollama produces them. If the overall timeout
+        is reached, the stream stops and whatever was generated so far is kept;
+        ``last_stream_status`` is then set to ``"timeout"`` instead of ``"done"``.
+
+        Closing the generator (e.g. because the HTTP client disconnected) or
+        setting ``cancel_event`` closes the upstream connection, which makes
+        Ollama stop the generation. ``last_stream_status`` is then ``"cancelled"``.
+
+        Thinking output is not yielded but counted in ``thinking_tokens``. If
+        the request class has a thinking budget and the model thinks longer,
+        the generation is stopped and the request is sent again without
+        thinking; ``thinking_cut_off`` is then True.
+
+        Args:
+            prompt: The prompt to send
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            think: Whether to enable chain-of-thought reasoning (thinking models only)
+            cancel_event: Optional event that aborts the generation when set
+            system: Optional system message sent before the prompt
+            history: Earlier user/assistant messages of the conversation
+            response_format: JSON schema the reply must follow (Ollama ``format``)
+            output_tokens: Expected answer length used to size the context window
+
+        Yields:
+            Generated text fragments
         """
+        budget = self._thinking_budget(think)
+        self.thinking_tokens = self.answer_tokens = 0
+        self.thinking_cut_off = False
+        payload = self._chat_payload(prompt, max_tokens, temperature, think, stream=True,
+                                     system=system, history=history, response_format=response_format,
+                                     output_tokens=output_tokens)
+        try:
+            yield from self._stream_chat(payload, cancel_event, budget)
+            if self.last_stream_status == "thinking_budget":
+                self.thinking_cut_off = True
+                logger.info(f"Thinking budget of {self.request_class} request exceeded after "
+                            f"{self.thinking_tokens} tokens, answering without thinking")
+                payload = self._chat_payload(prompt, max_tokens, temperature, False, stream=True,
+                                             system=system, history=history,
+                                             response_format=response_format,
+                                             output_tokens=output_tokens)
+                yield from self._stream_chat(payload, cancel_event)
+        finally:
+            if think and self.thinking is not None:
+                self.thinking.record(self.request_class, self.thinking_tokens, self.answer_tokens,
+                                     self.thinking_cut_off)
+
+    def _stream_chat(self, payload: dict, cancel_event: Optional[threading.Event] = None,
+                     thinking_budget=None) -> Iterator[str]:
+        """Send a streamed chat request and yield its content fragments."""
+        self.last_stream_status = None
+        produced = False
+        response = None
+        slot_started = None
+        failed = False
+        final: Dict = {}
+        thinking_started = None
+
+        if cancel_event is not None and cancel_event.is_set():
+            self.last_stream_status = "cancelled"
+            return
+
+        backend = self._acquire_backend(self.exclude_hosts)
         url = f"{self.host}/api/chat"
-        payload = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "stream": False,
-            "think": think,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens,
-            },
-        }
+        started = time.monotonic()
+        if self.admission:
+            try:
+                slot_started = self.admission.acquire(self.host, self.request_class)
+            except Exception:
+                if backend is not None:
+                    self.pool.cancel(backend)
+                raise
+        deadline = time.monotonic() + self.timeout
 
         try:
-            logger.info(f"Calling Ollama /api/chat: {url} (think={think})")
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            logger.info(f"Calling Ollama /api/chat (stream): {url} "
+                        f"(think={payload['think']}, class={self.request_class})")
+            response = self.session.post(url, json=payload, stream=True,
+                                         timeout=self._timeouts())
+            self._response = response
+            if cancel_event is not None and cancel_event.is_set():
+                self.last_stream_status = "cancelled"
+                return
 
             if not response.ok:
+                failed = response.status_code >= 500
                 raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
 
-            data = response.json()
-            content = data.get("message", {}).get("content", "").strip()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise Exception(f"Ollama API error: {data['error']}")
 
-            if not content:
-                raise Exception("Empty response from Ollama")
+                message = data.get("message", {})
+                if message.get("thinking"):
+                    self.thinking_tokens += 1
+                    if thinking_started is None:
+                        thinking_started = time.monotonic()
+                    if thinking_budget is not None and thinking_budget.exceeded(
+                            self.thinking_tokens, time.monotonic() - thinking_started):
+                        self.last_stream_status = "thinking_budget"
+                        return
 
-            return content
+                content = message.get("content", "")
+                if content:
+                    produced = True
+                    self.answer_tokens += 1
+                    yield content
+
+                if data.get("done"):
+                    self.last_stream_status = "done"
+                    final = data
+                    return
+
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Ollama generation cancelled, closing upstream stream")
+                    self.last_stream_status = "cancelled"
+                    return
+
+                if time.monotonic() > deadline:
+                    logger.warning(f"Ollama stream exceeded {self.timeout}s, returning partial output")
+                    self.last_stream_status = "timeout"
+                    return
+
+            self.last_stream_status = "done"
 
         except requests.RequestException as e:
+            if produced and isinstance(e, (requests.Timeout, requests.ConnectionError)):
+                logger.warning(f"Ollama stream interrupted, returning partial output: {e}")
+                self.last_stream_status = "timeout"
+                return
+            if cancel_event is not None and cancel_event.is_set():
+                # Aborted from another thread while waiting for output
+                self.last_stream_status = "cancelled"
+                return
+            failed = isinstance(e, (requests.Timeout, requests.ConnectionError))
             logger.error(f"Ollama request failed: {e}")
             raise Exception(f"Ollama connection error: {e}")
         except (json.JSONDecodeError, KeyError) as e:
             logger.error(f"Ollama response parsing failed: {e}")
             raise Exception(f"Ollama response error: {e}")
+        except Exception:
+            if cancel_event is not None and cancel_event.is_set():
+                self.last_stream_status = "cancelled"
+                return
+            raise
+        except GeneratorExit:
+            # Consumer went away (client disconnected or request superseded)
+            if self.last_stream_status is None:
+                logger.info("Ollama stream consumer closed, aborting upstream generation")
+                self.last_stream_status = "cancelled"
+            raise
+        finally:
+            self._response = None
+            if response is not None:
+                response.close()
+            if slot_started is not None:
+                self.admission.release(self.host, time.monotonic() - slot_started)
+            if backend is not None:
+                self.pool.release(backend, not failed, time.monotonic() - started,
+                                  final.get("eval_count"), final.get("eval_duration"))
 
     def get_available_models(self) -> List[str]:
         """Get list of available models from Ollama."""
-        url = f"{self.host}/api/tags"
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            return [m.get("name", "") for m in data.get("models", []) if m.get("name")]
+            return [m["name"] for m in self.list_models()]
         except Exception as e:
             logger.error(f"Failed to get models from Ollama: {e}")
             return []
 
+    def list_models(self) -> List[Dict]:
+        """Get installed models with size, digest and details (Ollama /api/tags).
+
+        Raises:
+            Exception: If Ollama cannot be reached
+        """
+        url = f"{self.host}/api/tags"
+        response = self.session.get(url, timeout=self._timeouts(10))
+        response.raise_for_status()
+        return [m for m in response.json().get("models", []) if m.get("name")]
+
+    def show_model(self, model: str) -> Dict:
+        """Get model metadata such as architecture and context length (Ollama /api/show).
+
+        Raises:
+            Exception: If Ollama cannot be reached or does not know the model
+        """
+        url = f"{self.host}/api/show"
+        response = self.session.post(url, json={"model": model}, timeout=self._timeouts(10))
+        response.raise_for_status()
+        return response.json()
+
+    def preload(self, model: Optional[str] = None) -> bool:
+        """Load a model into memory without generating anything.
+
+        Args:
+            model: Model to load (defaults to the client's model)
+
+        Returns:
+            True if Ollama reported the model as loaded
+        """
+        url = f"{self.host}/api/generate"
+        payload = {"model": model or self.model}
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        if self.runtime is not None:
+            # Load with the smallest context bucket, the one most requests use
+            options = self.runtime.options(payload["model"], 0, 0)
+            if options:
+                payload["options"] = options
+        try:
+            logger.info(f"Preloading Ollama model {payload['model']}")
+            response = self.session.post(url, json=payload, timeout=self._timeouts())
+            response.raise_for_status()
+            return bool(response.json().get("done", True))
+        except Exception as e:
+            logger.warning(f"Failed to preload model {payload['model']}: {e}")
+            return False
+
+    def get_running_models(self) -> List[Dict]:
+        """Get models currently loaded in memory (Ollama /api/ps).
+
+        Raises:
+            Exception: If Ollama cannot be reached
+        """
+        url = f"{self.host}/api/ps"
+        response = self.session.get(url, timeout=self._timeouts(10))
+        response.raise_for_status()
+        return [m for m in response.json().get("models", []) if m.get("name")]
+
     def change_model(self, new_model: str) -> bool:
         """Change the active model."""
         try:
@@ -88,9 +686,68 @@ class OllamaClient:
             return False
 
 
-def get_ollama_client(model: str = None) -> OllamaClient:
-    """Get configured Ollama client instance."""
+def get_ollama_client(model: str = None, request_class: str = "translate",
+                      backend: Optional[str] = None) -> OllamaClient:
+    """Get configured Ollama client instance.
+
+    Clients are lightweight; the underlying keep-alive connection pool is
+    shared per host through the process-wide session registry.
+
+    Args:
+        model: Model name (defaults to DEFAULT_MODEL)
+        request_class: Admission priority class for generation requests
+            (alternatives, translate, refine or batch)
+        backend: Host to prefer when several backends are configured, e.g. the
+            one that already evaluated the conversation being continued
+    """
+    config = current_app.config
+    model = model or config["DEFAULT_MODEL"]
+    pool = current_app.extensions.get("llot_backend_pool")
+    if pool is not None:
+        # Generation requests are routed per call; other calls use this backend
+        host = pool.select(model, prefer=backend).host
+        session = pool.session(host)
+    else:
+        host = config["OLLAMA_HOST"].split(",")[0].strip().rstrip("/")
+        session = session_registry.get_session(
+            host,
+            pool_size=config.get("OLLAMA_POOL_SIZE", 32),
+            max_retries=config.get("OLLAMA_MAX_RETRIES", 2),
+            backoff=config.get("OLLAMA_RETRY_BACKOFF", 0.3),
+        )
     return OllamaClient(
-        host=current_app.config["OLLAMA_HOST"],
-        model=model or current_app.config["DEFAULT_MODEL"],
+        host=host,
+        model=model,
+        session=session,
+        connect_timeout=config.get("OLLAMA_CONNECT_TIMEOUT", 5.0),
+        read_timeout=config.get("OLLAMA_READ_TIMEOUT", 120.0),
+        admission=current_app.extensions.get("llot_admission"),
+        request_class=request_class,
+        keep_alive=config.get("OLLAMA_KEEP_ALIVE"),
+        pool=pool,
+        hedging=current_app.extensions.get("llot_hedging"),
+        preferred_host=backend,
+        runtime=current_app.extensions.get("llot_runtime_options"),
+        thinking=current_app.extensions.get("llot_thinking"),
     )
+
+
+def get_backend_clients(model: Optional[str] = None) -> List[OllamaClient]:
+    """Get one client per healthy backend.
+
+    For calls whose answer differs between servers, such as the installed
+    or running models, or that must reach every server, such as preloading.
+
+    Args:
+        model: Skip backends known not to have this model installed
+    """
+    pool = current_app.extensions.get("llot_backend_pool")
+    if pool is None:
+        return [get_ollama_client(model)]
+    clients = []
+    for host in pool.healthy_hosts(model):
+        client = get_ollama_client(model, backend=host)
+        # Pin non-generation calls to this backend rather than the routed one
+        client.host, client.session = host, pool.session(host)
+        clients.append(client)
+    return clients
@@ -0,0 +1,181 @@
+"""
+Output token budgets for translations and detection of runaway generations.
+"""
+import logging
+import math
+import threading
+from typing import Dict, Optional, Tuple
+from flask import current_app
+from app.services.segmenter import count_dense_chars, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class RunawayGuard:
+    """Watch a streamed translation for output that has gone off the rails.
+
+    Called with every generated fragment; returns True once the output is
+    far longer than expected (commentary, a second translation) or ends in
+    the same phrase repeated over and over. Lengths are counted in
+    ``estimate_tokens`` units, the unit the expected length is learned in.
+    """
+
+    # Characters at the end of the output searched for repetition
+    WINDOW = 400
+    # A run of at least MIN_COPIES copies of a 2-80 character unit at the very end
+    MIN_UNIT, MAX_UNIT = 2, 80
+    MIN_COPIES = 4
+    # Shorter runs ("ha ha ha ha") are left alone
+    MIN_REPEAT_CHARS = 40
+
+    def __init__(self, limit: float, source_text: str = ""):
+        self.limit = limit
+        self.source_text = source_text
+        self._chars = 0
+        self._dense = 0
+        self._tail = ""
+
+    @property
+    def tokens(self) -> float:
+        """Estimated tokens generated so far."""
+        return self._dense + (self._chars - self._dense) / 4
+
+    def __call__(self, fragment: str) -> bool:
+        self._chars += len(fragment)
+        self._dense += count_dense_chars(fragment)
+        if self.tokens > self.limit:
+            return True
+        self._tail = (self._tail + fragment)[-self.WINDOW:]
+        return self._repeating(self._tail)
+
+    def trim(self, text: str) -> str:
+        """Cut a repeated run at the end of the text down to a single copy."""
+        stripped = text.rstrip()
+        repetition = self._repetition(stripped[-self.WINDOW:])
+        if repetition is None:
+            return text
+        unit, run = repetition
+        return stripped[:len(stripped) - run] + unit
+
+    def _repeating(self, tail: str) -> bool:
+        return self._repetition(tail) is not None
+
+    def _repetition(self, tail: str) -> Optional[Tuple[str, int]]:
+        """Find a runaway loop at the end of the text.
+
+        Runs on every fragment, so each unit length is checked by comparing
+        slices backwards from the end instead of searching the whole tail.
+
+        Returns:
+            Tuple of (repeated unit, length of the run), or None
+        """
+        size = len(tail)
+        for period in range(self.MIN_UNIT, min(self.MAX_UNIT, size // self.MIN_COPIES) + 1):
+            unit = tail[-period:]
+            if tail[-2 * period:-period] != unit:
+                continue
+            start = size - 2 * period
+            while start >= period and tail[start - period:start] == unit:
+                start -= period
+            run = size - start
+            if run < self.MIN_COPIES * period or not unit.strip():
+                continue
+            # The shortest repeating unit decides; longer ones are multiples of it
+            if run < self.MIN_REPEAT_CHARS:
+                return None
+            # Repetition copied from the source is not a loop
+            return (unit, run) if unit * self.MIN_COPIES not in self.source_text else None
+        return None
+
+
+class OutputBudget:
+    """Expected translation lengths, learned per language pair.
+
+    The ratio of translation to source length (in estimated tokens) is kept
+    as a moving average per language pair. A translation is allowed
+    ``LIMIT_FACTOR`` times its expected length plus some slack before the
+    runaway guard stops it; Ollama's ``num_predict`` is set well above that
+    as a backstop, since real token counts differ from the estimate.
+    """
+
+    # Expansion ratio used until a language pair has samples
+    DEFAULT_RATIO = 1.5
+    # Weight of a new sample in the moving average
+    ALPHA = 0.1
+    # Sources shorter than this (in estimated tokens) are not learned from
+    MIN_SOURCE_TOKENS = 4
+    LIMIT_FACTOR = 2.5
+    SLACK = 24
+    # num_predict per estimated token of the limit
+    BACKSTOP_FACTOR = 3
+    # Extra num_predict when thinking, which counts against the same limit
+    # (the thinking budget of the request class stops it earlier)
+    THINKING_MAX_TOKENS = 2048
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ratios: Dict[str, Dict] = {}
+        self._runaway = {"length": 0, "repetition": 0}
+
+    def expected_tokens(self, source_text: str, source_lang: str, target_lang: str) -> float:
+        return estimate_tokens(source_text) * self.ratio(source_lang, target_lang)
+
+    def ratio(self, source_lang: str, target_lang: str) -> float:
+        with self._lock:
+            entry = self._ratios.get(f"{source_lang}>{target_lang}")
+            return entry["ratio"] if entry else self.DEFAULT_RATIO
+
+    def limit(self, source_text: str, source_lang: str, target_lang: str) -> float:
+        """Output length (estimated tokens) after which a translation counts as runaway."""
+        return self.expected_tokens(source_text, source_lang, target_lang) * self.LIMIT_FACTOR + self.SLACK
+
+    def max_tokens(self, source_text: str, source_lang: str, target_lang: str, think: bool = False) -> int:
+        """``num_predict`` for translating a text."""
+        backstop = math.ceil(self.limit(source_text, source_lang, target_lang) * self.BACKSTOP_FACTOR)
+        return backstop + self.THINKING_MAX_TOKENS if think else backstop
+
+    def context_tokens(self, source_text: str, source_lang: str, target_lang: str, think: bool = False) -> int:
+        """Output tokens to reserve in the context window.
+
+        Based on the runaway limit rather than the ``num_predict`` backstop,
+        which would push similar texts into different ``num_ctx`` buckets.
+        """
+        limit = math.ceil(self.limit(source_text, source_lang, target_lang))
+        return limit + self.THINKING_MAX_TOKENS if think else limit
+
+    def guard(self, source_text: str, source_lang: str, target_lang: str) -> RunawayGuard:
+        return RunawayGuard(self.limit(source_text, source_lang, target_lang), source_text)
+
+    def record(self, source_text: str, translated: str, source_lang: str, target_lang: str):
+        """Learn from a completed translation."""
+        source_tokens = estimate_tokens(source_text)
+        if source_tokens < self.MIN_SOURCE_TOKENS:
+            return
+        sample = min(5.0, max(0.2, estimate_tokens(translated) / source_tokens))
+        with self._lock:
+            entry = self._ratios.setdefault(f"{source_lang}>{target_lang}",
+                                            {"ratio": sample, "samples": 0})
+            entry["ratio"] += self.ALPHA * (sample - entry["ratio"])
+            entry["samples"] += 1
+
+    def stopped(self, guard: RunawayGuard, text: str) -> str:
+        """Count a generation stopped by the guard and trim its output."""
+        trimmed = guard.trim(text)
+        reason = "repetition" if trimmed != text else "length"
+        with self._lock:
+            self._runaway[reason] += 1
+        logger.warning(f"Stopped runaway translation ({reason}) after {len(text)} chars")
+        return trimmed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "ratios": {pair: {"ratio": round(entry["ratio"], 2), "samples": entry["samples"]}
+                           for pair, entry in self._ratios.items()},
+                "runaway": dict(self._runaway),
+            }
+
+
+def get_output_budget() -> OutputBudget:
+    """Get the output budget of the current application."""
+    return current_app.extensions["llot_output_budget"]
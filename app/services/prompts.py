@@ -0,0 +1,128 @@
+"""
+Versioned system prompts for the translation tasks.
+
+Every request of a task starts with the same system message, and the user
+message puts the parts that change least often (languages, tone) before the
+text itself. Ollama keeps the KV cache of the previous prompt per model, so
+requests that share a prefix skip re-evaluating it. Bump ``version`` whenever a
+template changes: it is part of the cache keys, so results produced with an
+older prompt are not served again.
+
+Follow-up templates are not sent as system messages. They open the next user
+turn of an earlier translation conversation, so the evaluated prefix of
+that conversation (system prompt, source text, translation) is reused.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A fixed system prompt and its version."""
+    name: str
+    version: int
+    system: str
+
+    @property
+    def tag(self) -> str:
+        """Identifier used in cache keys, e.g. ``translate/v2``."""
+        return f"{self.name}/v{self.version}"
+
+
+TRANSLATE = PromptTemplate("translate", 2, (
+    "You are a professional translator. Translate the text in the user's message "
+    "into the requested target language, using the requested tone. "
+    "Keep formatting (line breaks). Do not add extra commentary, "
+    "do not translate code tags, XML, or URLs. "
+    "Return only the translated text, without explanations. "
+    "Preserve punctuation and capitalization as appropriate."
+))
+
+SEGMENT = PromptTemplate("segment", 2, TRANSLATE.system + (
+    " The text is one sentence, paragraph or section of a longer document. "
+    "Translate only the text; preceding text and its translation are given for "
+    "reference and must not be repeated."
+))
+
+ALTERNATIVES = PromptTemplate("alternatives", 2, (
+    "You are assisting with post-editing of a translation. Given a source text, "
+    "its current translation and a clicked token of that translation, provide up to 6 "
+    "alternative single-word or short-phrase (1–3 words) replacements for the token.\n"
+    "Rules:\n"
+    "- Keep alternatives concise (<= 3 words), natural in context, and appropriate for the target language.\n"
+    "- Prefer synonyms or close variants that fit the specific sentence.\n"
+    "- Avoid duplicates and avoid repeating the original token unless an inflected form differs significantly.\n"
+    "- Return STRICT JSON as: {\"alternatives\": [\"...\", \"...\"]} with no extra text."
+))
+
+REFINE = PromptTemplate("refine", 2, (
+    "You are a professional translator. Produce a corrected, fluent translation of the "
+    "source text into the requested target language, starting from the user-edited draft.\n"
+    "Return STRICT JSON ONLY:\n"
+    '{"translated": "<final translation>", "faithful": true|false}\n'
+    "No explanations, no extra keys, no markdown.\n\n"
+    "CONSTRAINTS:\n"
+    "- The final translation MUST be faithful to the meaning of the source text.\n"
+    "- You MUST include each of the user-chosen phrases EXACTLY as written (verbatim).\n"
+    "- Apply the listed replacements to the current translation (they are user edits). "
+    "Ensure each 'to' phrase appears and the corresponding 'from' token no longer appears.\n"
+    "- If an enforced phrase changes the nuance, ADJUST the rest so the translation still matches the source meaning.\n"
+    "- If you CANNOT keep it faithful while keeping the enforced phrases, set faithful=false "
+    "and still output best-effort in 'translated'.\n"
+    "- Do NOT introduce information absent from the source; you may paraphrase to keep it idiomatic.\n"
+    "- You may inflect surrounding words and adjust word order, but DO NOT alter the chosen phrases themselves."
+))
+
+REFINE_EXCERPT = PromptTemplate("refine-excerpt", 1, REFINE.system + (
+    "\n\nThe source text and draft are an excerpt of a longer document. Refine only the "
+    "excerpt; the text before and after it is given for reference and must not be repeated."
+))
+
+ALTERNATIVES_FOLLOW_UP = PromptTemplate("alternatives-follow-up", 1, (
+    "Now help post-edit your translation. Provide up to 6 alternative single-word or "
+    "short-phrase (1–3 words) replacements for the clicked token of the translation.\n"
+    "Rules:\n"
+    "- Keep alternatives concise (<= 3 words), natural in context, and appropriate for the target language.\n"
+    "- Prefer synonyms or close variants that fit the specific sentence.\n"
+    "- Avoid duplicates and avoid repeating the original token unless an inflected form differs significantly.\n"
+    "- Return STRICT JSON as: {\"alternatives\": [\"...\", \"...\"]} with no extra text."
+))
+
+REFINE_FOLLOW_UP = PromptTemplate("refine-follow-up", 1, (
+    "Now produce a corrected, fluent version of your translation that respects the user's edits.\n"
+    "Return STRICT JSON ONLY:\n"
+    '{"translated": "<final translation>", "faithful": true|false}\n'
+    "No explanations, no extra keys, no markdown.\n\n"
+    "CONSTRAINTS:\n"
+    "- The final translation MUST be faithful to the meaning of the source text.\n"
+    "- You MUST include each of the user-chosen phrases EXACTLY as written (verbatim).\n"
+    "- Apply the listed replacements (they are user edits). "
+    "Ensure each 'to' phrase appears and the corresponding 'from' token no longer appears.\n"
+    "- If an enforced phrase changes the nuance, ADJUST the rest so the translation still matches the source meaning.\n"
+    "- If you CANNOT keep it faithful while keeping the enforced phrases, set faithful=false "
+    "and still output best-effort in 'translated'.\n"
+    "- Do NOT introduce information absent from the source; you may paraphrase to keep it idiomatic.\n"
+    "- You may inflect surrounding words and adjust word order, but DO NOT alter the chosen phrases themselves."
+))
+
+ALL_ALTERNATIVES = PromptTemplate("all-alternatives", 1, (
+    "You are assisting with post-editing of a translation. Given a source text, its "
+    "current translation and a list of tokens of that translation, provide up to 6 "
+    "alternative single-word or short-phrase (1–3 words) replacements for every token.\n"
+    "Rules:\n"
+    "- Keep alternatives concise (<= 3 words), natural in context, and appropriate for the target language.\n"
+    "- Prefer synonyms or close variants that fit the specific sentence.\n"
+    "- Avoid duplicates and avoid repeating the original token unless an inflected form differs significantly.\n"
+    "- Return STRICT JSON as: {\"alternatives\": {\"<token>\": [\"...\", \"...\"]}} with every listed "
+    "token as a key and no extra text."
+))
+
+ALL_ALTERNATIVES_FOLLOW_UP = PromptTemplate("all-alternatives-follow-up", 1, (
+    "Now help post-edit your translation. For every listed token of the translation, provide up to 6 "
+    "alternative single-word or short-phrase (1–3 words) replacements.\n"
+    "Rules:\n"
+    "- Keep alternatives concise (<= 3 words), natural in context, and appropriate for the target language.\n"
+    "- Prefer synonyms or close variants that fit the specific sentence.\n"
+    "- Avoid duplicates and avoid repeating the original token unless an inflected form differs significantly.\n"
+    "- Return STRICT JSON as: {\"alternatives\": {\"<token>\": [\"...\", \"...\"]}} with every listed "
+    "token as a key and no extra text."
+))
@@ -0,0 +1,150 @@
+"""
+Local refinement of user edits that do not need the LLM.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+from app.services.segmenter import Segment, is_dense_script
+
+# Target languages whose words barely inflect, so swapping one word for
+# another rarely breaks agreement with the rest of the sentence
+LOW_INFLECTION_LANGUAGES = {"en", "zh", "ja", "ko", "th", "vi", "id", "ms"}
+
+
+def _word_pattern(phrase: str) -> re.Pattern:
+    """Match a phrase as whole words (no letters/digits directly around it).
+
+    Scripts without spaces between words (CJK, Thai) are matched anywhere.
+    """
+    if is_dense_script(phrase):
+        return re.compile(re.escape(phrase))
+    return re.compile(r"(?<!\w)" + re.escape(phrase) + r"(?!\w)")
+
+
+def contains_phrase(text: str, phrase: str) -> bool:
+    return bool(_word_pattern(phrase).search(text))
+
+
+def missing_phrases(text: str, phrases: List[str]) -> List[str]:
+    """Enforced phrases that do not occur verbatim in the text."""
+    return [p for p in phrases if not contains_phrase(text, p)]
+
+
+# Spellings whose first letter does not tell the sound: vowels read as "you"
+# or "w" (a university, a one-off) and a silent h (an hour)
+_CONSONANT_SOUND = re.compile(r"uni|use|usu|ut[io]|ur[aei]|uku|eu|ewe|one\b|once")
+_VOWEL_SOUND = re.compile(r"hour|honest|honou?r|heir")
+# Prefixes read either way (a unidirectional / an unidentified)
+_EITHER_SOUND = re.compile(r"uni[dmn]")
+_ARTICLE_BEFORE = re.compile(r"(?<!\w)([Aa]n?)(\s+)$")
+
+
+def english_article(phrase: str) -> Optional[str]:
+    """Pick "a" or "an" for an English phrase.
+
+    Returns:
+        The article, or None when the spelling does not tell (acronyms,
+        numbers and prefixes that are read both ways)
+    """
+    word = phrase.split()[0].lstrip("\"'(") if phrase.split() else ""
+    if not word[:1].isalpha() or (len(word) > 1 and word.isupper()):
+        return None
+    word = word.lower()
+    if _EITHER_SOUND.match(word):
+        return None
+    if _VOWEL_SOUND.match(word):
+        return "an"
+    if _CONSONANT_SOUND.match(word):
+        return "a"
+    return "an" if word[0] in "aeiou" else "a"
+
+
+def apply_replacements(text: str, replacements: List[Dict[str, str]],
+                       target_lang: str = "") -> Tuple[str, bool]:
+    """Apply user replacements that are not in the text yet.
+
+    A replacement whose ``to`` phrase already occurs is taken as applied (the
+    UI swaps the word before asking for a refinement). Otherwise the first
+    whole-word occurrence of ``from`` is replaced. For English the indefinite
+    article in front of that occurrence is adjusted (a/an).
+
+    Returns:
+        Tuple of (text, whether an article may be wrong and needs the model)
+    """
+    unsure = False
+    for replacement in replacements:
+        source, target = replacement["from"], replacement["to"]
+        match = _word_pattern(target).search(text)
+        if match is None:
+            match = _word_pattern(source).search(text)
+            if match is None:
+                continue
+            text = text[:match.start()] + target + text[match.end():]
+        if target_lang == "en":
+            text, fixed = _fix_english_article(text, match.start(), target)
+            unsure = unsure or not fixed
+    return text, unsure
+
+
+def _fix_english_article(text: str, position: int, word: str) -> Tuple[str, bool]:
+    """Adjust the article directly in front of ``position``.
+
+    Returns:
+        Tuple of (text, False if there is an article the rule cannot decide)
+    """
+    article = _ARTICLE_BEFORE.search(text[:position])
+    if article is None:
+        return text, True
+    wanted = english_article(word)
+    if wanted is None:
+        return text, False
+    if article.group(1)[0].isupper():
+        wanted = wanted.capitalize()
+    return text[:article.start()] + wanted + article.group(2) + text[position:], True
+
+
+def is_mechanical_swap(source: str, target: str, target_lang: str) -> bool:
+    """Guess whether replacing ``source`` by ``target`` leaves the grammar intact.
+
+    True for languages with little inflection, and otherwise when both words
+    have the same number of words and share their ending (a sign of the same
+    case, number and gender, e.g. "schönen" -> "hübschen").
+    """
+    if source == target:
+        return True
+    if len(source.split()) != len(target.split()):
+        return False
+    if target_lang in LOW_INFLECTION_LANGUAGES:
+        return True
+    source_last, target_last = source.split()[-1].lower(), target.split()[-1].lower()
+    if min(len(source_last), len(target_last)) < 4:
+        return False
+    return source_last[-2:] == target_last[-2:]
+
+
+def local_refine(current_translation: str, target_lang: str, enforced_phrases: List[str],
+                 replacements: List[Dict[str, str]]) -> Tuple[str, bool]:
+    """Apply edits locally and decide whether the LLM still has to look at them.
+
+    Returns:
+        Tuple of (locally refined text, whether an LLM pass is needed)
+    """
+    text, unsure = apply_replacements(current_translation, replacements, target_lang)
+    needs_model = unsure or bool(missing_phrases(text, enforced_phrases)) or any(
+        not contains_phrase(text, r["to"]) or not is_mechanical_swap(r["from"], r["to"], target_lang)
+        for r in replacements
+    )
+    return text, needs_model
+
+
+def edit_span(segments: List[Segment], phrases: List[str]) -> Optional[Tuple[int, int]]:
+    """Find the range of segments that contain any of the phrases.
+
+    Returns:
+        Tuple of (start, end) segment indices, end exclusive, or None if no
+        segment contains a phrase
+    """
+    hits = [i for i, segment in enumerate(segments)
+            if any(contains_phrase(segment.text, phrase) for phrase in phrases)]
+    if not hits:
+        return None
+    return hits[0], hits[-1] + 1
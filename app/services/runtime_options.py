@@ -0,0 +1,108 @@
+"""
+Per-request Ollama runtime options: context window size and model profiles.
+"""
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from app.services.segmenter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def parse_buckets(value: str) -> List[int]:
+    """Parse a comma-separated ``NUM_CTX_BUCKETS`` value into sorted sizes."""
+    return sorted({int(v) for v in (value or "").split(",") if v.strip()})
+
+
+def load_model_profiles(path: str) -> Dict[str, Dict]:
+    """Read per-model runtime options from a JSON file.
+
+    The file maps model names to Ollama options, e.g.
+    ``{"*": {"num_thread": 8}, "llama3.2:3b": {"num_batch": 512}}``. A missing
+    or invalid file gives no profiles.
+    """
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            profiles = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to read model profiles from {path}: {e}")
+        return {}
+    if not isinstance(profiles, dict):
+        logger.warning(f"Model profiles in {path} must be a JSON object")
+        return {}
+    return {name: options for name, options in profiles.items() if isinstance(options, dict)}
+
+
+def estimate_prompt_tokens(messages: Iterable[Dict]) -> int:
+    """Estimate the tokens of chat messages, including per-message overhead."""
+    return sum(estimate_tokens(m.get("content") or "") + 4 for m in messages)
+
+
+class RuntimeOptions:
+    """Choose ``num_ctx`` and model-specific options for each request.
+
+    ``num_ctx`` is the smallest bucket that holds the prompt and the expected
+    output, capped at the model's context length from the model catalog.
+    Ollama reloads a model when its ``num_ctx`` changes, so the buckets are
+    few and fixed rather than sized per request. A ``num_ctx`` in a model's
+    profile pins the context window of that model instead.
+    """
+
+    # Estimates count ~4 characters per token; scripts that tokenize worse need headroom
+    PROMPT_MARGIN = 1.5
+
+    def __init__(self, buckets: List[int], profiles: Optional[Dict[str, Dict]] = None, catalog=None):
+        self.buckets = sorted(buckets)
+        self.profiles = profiles or {}
+        self.catalog = catalog
+
+    def num_ctx(self, model: str, prompt_tokens: int, output_tokens: int) -> Optional[int]:
+        """Pick the context window for a request, or None to keep the model default."""
+        if not self.buckets:
+            return None
+        needed = int(prompt_tokens * self.PROMPT_MARGIN) + output_tokens
+        context_length = self._context_length(model)
+        buckets = [b for b in self.buckets if not context_length or b <= context_length] \
+            or [context_length]
+        for bucket in buckets:
+            if bucket >= needed:
+                return bucket
+        logger.warning(f"Prompt of ~{prompt_tokens} tokens may not fit the context of {model} "
+                       f"({buckets[-1]} tokens)")
+        return buckets[-1]
+
+    def profile(self, model: str) -> Dict:
+        """Options configured for a model (exact name, name without tag, then ``*``)."""
+        options = dict(self.profiles.get("*", {}))
+        options.update(self.profiles.get(model.split(":")[0], {}))
+        options.update(self.profiles.get(model, {}))
+        return options
+
+    def options(self, model: str, prompt_tokens: int, output_tokens: int) -> Dict:
+        """Runtime options to merge into a request's ``options``."""
+        options = self.profile(model)
+        if "num_ctx" in options:
+            return options
+        num_ctx = self.num_ctx(model, prompt_tokens, output_tokens)
+        if num_ctx:
+            options["num_ctx"] = num_ctx
+        return options
+
+    def _context_length(self, model: str) -> Optional[int]:
+        if self.catalog is None:
+            return None
+        try:
+            metadata = self.catalog.get(model) or (
+                self.catalog.get(f"{model}:latest") if ":" not in model else None)
+        except Exception as e:
+            logger.debug(f"Model catalog unavailable for {model}: {e}")
+            return None
+        return (metadata or {}).get("context_length")
+
+
+def get_runtime_options() -> Optional[RuntimeOptions]:
+    """Get the runtime options of the current application."""
+    return current_app.extensions.get("llot_runtime_options")
@@ -0,0 +1,175 @@
+"""
+Sentence and paragraph segmentation that preserves the original formatting.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# A boundary is sentence-final punctuation (with closing quotes/brackets)
+# followed by spaces, full stops of scripts that need no space after them
+# (CJK), a space between Thai words (Thai marks sentence ends with a space),
+# or a line break.
+_BOUNDARY = re.compile(
+    r"[.!?…।؟۔]+[\"'”’»)\]]*(?:[ \t]*\n\s*|[ \t]+)"
+    r"|[。！？]+[」』”’）]*\s*"
+    r"|(?<=[\u0e00-\u0e7f])[ \t]+(?=[\u0e00-\u0e7f])"
+    r"|[ \t]*\n\s*"
+)
+
+_LINE_BREAK = re.compile(r"[ \t]*\n\s*")
+
+# Scripts where one character is roughly one token
+_DENSE_SCRIPT = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\u0e00-\u0e7f]")
+
+
+@dataclass
+class Segment:
+    """A piece of source text and the whitespace that follows it."""
+    text: str
+    separator: str = ""
+
+    @property
+    def is_blank(self) -> bool:
+        return not self.text.strip()
+
+
+def split_segments(text: str) -> List[Segment]:
+    """Split text into sentence/paragraph segments.
+
+    Joining ``segment.text + segment.separator`` for all segments gives back
+    the original text exactly.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of segments (at least one)
+    """
+    segments = []
+    pos = 0
+    for match in _BOUNDARY.finditer(text):
+        if match.end() == match.start():
+            continue
+        matched = match.group()
+        punctuation = matched.rstrip()
+        end = match.start() + len(punctuation)
+        segments.append(Segment(text[pos:end], text[end:match.end()]))
+        pos = match.end()
+
+    if pos < len(text) or not segments:
+        segments.append(Segment(text[pos:], ""))
+
+    return segments
+
+
+def join_segments(segments: List[Segment], texts: List[str]) -> str:
+    """Stitch translated segment texts back together with the original separators."""
+    return "".join(text + segment.separator for segment, text in zip(segments, texts))
+
+
+def split_paragraphs(text: str) -> List[Segment]:
+    """Split text at line breaks, keeping the breaks as separators."""
+    segments = []
+    pos = 0
+    for match in _LINE_BREAK.finditer(text):
+        segments.append(Segment(text[pos:match.start()], match.group()))
+        pos = match.end()
+    segments.append(Segment(text[pos:], ""))
+    return segments
+
+
+def align_segments(source: str, translation: str) -> Optional[Tuple[List[Segment], List[Segment]]]:
+    """Split a text and its translation into corresponding segments.
+
+    Translations usually keep the sentence structure of their source, so when
+    both sides have the same number of sentences they are paired in order.
+    Otherwise paragraphs are tried.
+
+    Returns:
+        Tuple of (source_segments, translation_segments) of equal length, or
+        None if the two texts do not line up
+    """
+    for split in (split_segments, split_paragraphs):
+        source_segments, translation_segments = split(source), split(translation)
+        if len(source_segments) == len(translation_segments):
+            return source_segments, translation_segments
+    return None
+
+
+def is_dense_script(text: str) -> bool:
+    """Whether the text contains scripts written without spaces between words."""
+    return bool(_DENSE_SCRIPT.search(text))
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of LLM tokens in a text.
+
+    CJK, Hangul and Thai characters count as one token each; other text
+    averages about four characters per token.
+    """
+    dense = count_dense_chars(text)
+    return dense + (len(text) - dense + 3) // 4
+
+
+def count_dense_chars(text: str) -> int:
+    """Count the characters that ``estimate_tokens`` counts as one token each."""
+    return len(_DENSE_SCRIPT.findall(text))
+
+
+def chunk_segments(segments: List[Segment], max_tokens: int) -> List[Segment]:
+    """Group consecutive segments into chunks within a token budget.
+
+    A chunk keeps the separators between its segments and carries the
+    separator of its last segment, so ``join_segments`` still restores the
+    original formatting. A single segment larger than the budget becomes a
+    chunk of its own. Paragraph breaks are preferred as chunk boundaries once
+    a chunk is at least half full.
+    """
+    chunks = []
+    parts: List[Segment] = []
+    used = 0
+
+    def flush():
+        if parts:
+            text = "".join(seg.text + seg.separator for seg in parts[:-1]) + parts[-1].text
+            chunks.append(Segment(text, parts[-1].separator))
+
+    for segment in segments:
+        tokens = estimate_tokens(segment.text)
+        if parts and used + tokens > max_tokens:
+            flush()
+            parts, used = [], 0
+
+        parts.append(segment)
+        used += tokens
+
+        if "\n" in segment.separator and used >= max_tokens // 2:
+            flush()
+            parts, used = [], 0
+
+    flush()
+    return chunks
+
+
+def content_words(text: str, limit: int = 0) -> List[str]:
+    """List the distinct words of a text in order of appearance.
+
+    Words are split the same way the UI makes translation words clickable:
+    runs of letters, digits and combining marks. Numbers are skipped.
+
+    Args:
+        text: Text to split
+        limit: Maximum number of words to return (0 for all)
+    """
+    words, current = [], []
+    for char in text + " ":
+        if char.isalnum() or unicodedata.category(char).startswith("M"):
+            current.append(char)
+            continue
+        if current:
+            word = "".join(current)
+            if not word.isdigit() and word not in words:
+                words.append(word)
+            current = []
+    return words[:limit] if limit else words
@@ -0,0 +1,173 @@
+"""
+Coalescing of identical concurrent calls (single-flight).
+"""
+import threading
+from typing import Any, Callable, Dict, Iterator, List
+
+
+class _Call:
+    """An in-flight call that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class _Stream:
+    """An in-flight generator whose items are replayed to every consumer."""
+
+    def __init__(self, source: Iterator):
+        self.source = source
+        self.items: List[Any] = []
+        self.done = False
+        self.error: BaseException = None
+        # A consumer is reading the next item from the source
+        self.pulling = False
+        self.consumers = 0
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome.
+
+    The first caller for a key (the leader) executes the function. Callers that
+    arrive while it is running block until it finishes and then receive the
+    same result, or have the same exception raised. ``stream`` does the same
+    for generators, passing every item on to all consumers as it arrives.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Stream] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """Execute ``func`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call
+            func: Function to execute if no identical call is in flight
+
+        Returns:
+            The function result
+
+        Raises:
+            Exception: Whatever the leader's call raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stream(self, key: str, func: Callable[[], Iterator]) -> Iterator:
+        """Run the generator from ``func`` once for all concurrent consumers with the same key.
+
+        Every consumer receives all items from the first one on. Whichever
+        consumer is reading drives the generator, so it keeps running while
+        anyone is listening and is closed when the last consumer leaves.
+
+        Args:
+            key: Identity of the stream
+            func: Function returning the generator if no identical stream is in flight
+
+        Yields:
+            The generator's items
+
+        Raises:
+            Exception: Whatever the generator raised
+        """
+        with self._lock:
+            call = self._streams.get(key)
+            if call is None:
+                call = _Stream(func())
+                self._streams[key] = call
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+            call.consumers += 1
+        return self._consume(key, call)
+
+    def _consume(self, key: str, call: _Stream) -> Iterator:
+        index = 0
+        try:
+            while True:
+                with call.cond:
+                    while index >= len(call.items) and not call.done and call.pulling:
+                        call.cond.wait()
+                    pull = False
+                    if index < len(call.items):
+                        item = call.items[index]
+                        index += 1
+                    elif call.done:
+                        if call.error is not None:
+                            raise call.error
+                        return
+                    else:
+                        call.pulling = pull = True
+
+                if pull:
+                    self._pull(key, call)
+                else:
+                    yield item
+        finally:
+            with self._lock:
+                call.consumers -= 1
+                abandoned = call.consumers == 0 and not call.done
+                if abandoned and self._streams.get(key) is call:
+                    del self._streams[key]
+            if abandoned:
+                call.done = True
+                call.source.close()
+
+    def _pull(self, key: str, call: _Stream):
+        """Read the next item from the source for all consumers."""
+        error = None
+        try:
+            item = next(call.source)
+        except StopIteration:
+            finished = True
+        except Exception as e:
+            finished, error = True, e
+        else:
+            finished = False
+        if finished:
+            with self._lock:
+                if self._streams.get(key) is call:
+                    del self._streams[key]
+        with call.cond:
+            if finished:
+                call.done, call.error = True, error
+            else:
+                call.items.append(item)
+            call.pulling = False
+            call.cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls) + len(self._streams)
+        return stats
@@ -0,0 +1,76 @@
+"""
+Thinking budgets for requests with think mode enabled.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ThinkingBudget:
+    """Limits on the reasoning phase of one request; 0 means no limit."""
+    tokens: int = 0
+    seconds: float = 0.0
+
+    def exceeded(self, tokens: int, elapsed: float) -> bool:
+        return (self.tokens > 0 and tokens > self.tokens) or (self.seconds > 0 and elapsed > self.seconds)
+
+
+def parse_thinking_budgets(value: str) -> Dict[str, ThinkingBudget]:
+    """Parse ``THINK_BUDGETS``, e.g. ``translate=1024/30,alternatives=256/10``.
+
+    Each entry is ``class=tokens/seconds``; the seconds part is optional.
+    """
+    budgets = {}
+    for entry in (value or "").split(","):
+        if "=" not in entry:
+            continue
+        request_class, limits = (part.strip() for part in entry.split("=", 1))
+        tokens, _, seconds = limits.partition("/")
+        try:
+            budgets[request_class] = ThinkingBudget(int(tokens or 0), float(seconds or 0))
+        except ValueError:
+            logger.warning(f"Ignoring invalid thinking budget: {entry.strip()}")
+    return budgets
+
+
+class ThinkingControl:
+    """Thinking budgets per request class and statistics of think-mode requests.
+
+    Thinking output is streamed separately from the answer. When a request
+    thinks for longer than its budget, the client stops it and asks again
+    without thinking, so a hard text cannot hold a generation slot for the
+    whole read timeout.
+    """
+
+    def __init__(self, budgets: Dict[str, ThinkingBudget]):
+        self.budgets = budgets
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def budget_for(self, request_class: str) -> Optional[ThinkingBudget]:
+        return self.budgets.get(request_class)
+
+    def record(self, request_class: str, thinking_tokens: int, answer_tokens: int, cut_off: bool):
+        """Record a finished think-mode request."""
+        with self._lock:
+            stats = self._stats.setdefault(request_class, {
+                "requests": 0, "cut_off": 0, "thinking_tokens": 0, "answer_tokens": 0,
+            })
+            stats["requests"] += 1
+            stats["cut_off"] += int(cut_off)
+            stats["thinking_tokens"] += thinking_tokens
+            stats["answer_tokens"] += answer_tokens
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {request_class: dict(stats) for request_class, stats in self._stats.items()}
+
+
+def get_thinking_control() -> Optional[ThinkingControl]:
+    """Get the thinking control of the current application."""
+    return current_app.extensions.get("llot_thinking")
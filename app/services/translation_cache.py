@@ -0,0 +1,245 @@
+"""
+Translation result cache with an in-memory LRU tier and an optional SQLite tier.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_source_text(text: str) -> str:
+    """Normalize source text for cache lookups.
+
+    Unicode is NFC-normalized, line endings are unified, trailing whitespace
+    is stripped from each line and blank lines around the text are dropped.
+    Leading indentation and spacing inside a line are kept, because they are
+    preserved in the output.
+    """
+    text = unicodedata.normalize("NFC", text)
+    lines = [line.rstrip() for line in text.splitlines()]
+    return "\n".join(lines).strip("\n")
+
+
+class TranslationCache:
+    """Bounded LRU cache of translation results, optionally backed by SQLite.
+
+    The memory tier is private to each worker process. When ``db_path`` is set,
+    results are also stored in a SQLite database in WAL mode so that all
+    gunicorn workers on the host share them.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: int = 86400,
+                 db_path: Optional[str] = None, db_max_rows: int = 50000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path or None
+        self.db_max_rows = db_max_rows
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._local = threading.local()
+        self._writes = 0
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0,
+                       "misses": 0, "evictions": 0, "invalidations": 0}
+
+        if self.db_path:
+            self._init_db()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.db_path)
+
+    @staticmethod
+    def make_key(namespace: str, **parts: Any) -> str:
+        """Build a cache key from a namespace and request parameters.
+
+        A ``source_text`` part is normalized before hashing.
+        """
+        if "source_text" in parts:
+            parts["source_text"] = normalize_source_text(parts["source_text"])
+        raw = json.dumps([namespace, parts], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, count: bool = True) -> Optional[Dict]:
+        """Look up a cached value, checking memory first and then SQLite.
+
+        Args:
+            key: Cache key from ``make_key``
+            count: Include the lookup in the hit/miss statistics (off for
+                bookkeeping entries that are not translation results)
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, model, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    if count:
+                        self._stats["hits"] += 1
+                        self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+        if self.db_path:
+            row = self._db_get(key, now)
+            if row is not None:
+                value, model, expires_at = row
+                self._memory_set(key, value, model, expires_at)
+                if count:
+                    with self._lock:
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                return value
+
+        if count:
+            with self._lock:
+                self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Dict, model: str = ""):
+        """Store a JSON-serializable value in all enabled tiers."""
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl
+        self._memory_set(key, value, model, expires_at)
+        if self.db_path:
+            self._db_set(key, value, model, expires_at)
+
+    def invalidate_model(self, model: str) -> int:
+        """Drop all entries produced by a model.
+
+        Returns:
+            Number of in-memory entries removed
+        """
+        with self._lock:
+            stale = [k for k, (_, m, _) in self._memory.items() if m == model]
+            for k in stale:
+                del self._memory[k]
+            self._stats["invalidations"] += 1
+
+        if self.db_path:
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.execute("DELETE FROM translations WHERE model = ?", (model,))
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache invalidation failed: {e}")
+
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached translations for model {model}")
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["shared_tier"] = bool(self.db_path)
+        return stats
+
+    def _memory_set(self, key: str, value: Dict, model: str, expires_at: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (value, model, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process; connections must not cross a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=2.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        try:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, model TEXT, value TEXT, "
+                    "created REAL, expires_at REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_created ON translations (created)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_model ON translations (model)")
+            logger.info(f"Shared translation cache at {self.db_path}")
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Failed to open shared translation cache {self.db_path}: {e}")
+            self.db_path = None
+
+    def _db_get(self, key: str, now: float) -> Optional[tuple]:
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, model, expires_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, model, expires_at = row
+            if expires_at <= now:
+                with conn:
+                    conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                return None
+            return json.loads(value), model, expires_at
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.warning(f"Translation cache read failed: {e}")
+            return None
+
+    def _db_set(self, key: str, value: Dict, model: str, expires_at: float):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO translations (key, model, value, created, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, model, json.dumps(value, ensure_ascii=False), time.time(), expires_at),
+                )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % 100 == 0
+            if prune:
+                self._db_prune(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache write failed: {e}")
+
+    def _db_prune(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("DELETE FROM translations WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.db_max_rows,),
+            )
+
+
+def get_translation_cache() -> TranslationCache:
+    """Get the translation cache of the current application."""
+    return current_app.extensions["llot_translation_cache"]
@@ -1,9 +1,28 @@
 import json
-import re
 import logging
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from flask import current_app
 from app.services.ollama_client import get_ollama_client
-from app.services.language_detector import LanguageDetector
+from app.services.admission import OllamaBusyError
+from app.services.translation_cache import get_translation_cache, normalize_source_text
+from app.services.model_residency import get_model_residency
+from app.services.model_catalog import get_model_catalog
+from app.services.model_router import AUTO_MODEL, Route, get_model_router
+from app.services.output_budget import get_output_budget
+from app.services.refine_local import contains_phrase, edit_span, local_refine, missing_phrases
+from app.services.segmenter import (
+    Segment, align_segments, split_segments, join_segments, chunk_segments, content_words
+)
+from app.services.batch import map_concurrently
+from app.services.json_output import (
+    ALTERNATIVES_SCHEMA, REFINE_SCHEMA, get_json_output_stats, parse_json_output, word_alternatives_schema
+)
+from app.services.singleflight import SingleFlight
+from app.services import prompts
+from app.services.language_detector import get_language_detector
 from app.models.language import LanguageService
 
 logger = logging.getLogger(__name__)
@@ -11,9 +30,13 @@ logger = logging.getLogger(__name__)
 
 class TranslationService:
     def __init__(self):
-        self.language_detector = LanguageDetector()
+        # Identical concurrent requests share one Ollama call
+        self.inflight = SingleFlight()
+        # Work started after a response was sent (threads are created on first use)
+        self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llot-background")
     
-    def translate(self, source_text: str, source_lang: str, target_lang: str, tone: str = "neutral", think: bool = False, model: str = None) -> Tuple[str, Optional[str]]:
+    def translate(self, source_text: str, source_lang: str, target_lang: str, tone: str = "neutral", think: bool = False, model: str = None,
+                  request_class: str = "translate") -> Tuple[str, Optional[str]]:
         """Translate text from source language to target language.
         
         Args:
@@ -21,6 +44,7 @@ class TranslationService:
             source_lang: Source language code or 'auto'
             target_lang: Target language code
             tone: Translation tone
+            request_class: Admission priority class ('translate' or 'batch')
             
         Returns:
             Tuple of (translated_text, detected_language)
@@ -31,6 +55,37 @@ class TranslationService:
         if not source_text.strip():
             return "", None
         
+        cache = get_translation_cache()
+        route = self._route(model, "translate", source_text, source_lang, target_lang, think)
+        resolved_model = route.model
+        cache_key = self._translation_cache_key(
+            source_text, source_lang, target_lang, tone, resolved_model, think
+        )
+        cached = cache.get(cache_key)
+        if cached:
+            logger.info(f"Translation cache hit: {len(source_text)} chars")
+            return cached["translated_text"], cached.get("detected")
+        
+        try:
+            with get_model_router().timed(route):
+                return self.inflight.do(cache_key, lambda: self._translate_uncached(
+                    source_text, source_lang, target_lang, tone, think, resolved_model, cache_key, request_class
+                ))
+            
+        except OllamaBusyError:
+            raise
+        except Exception as e:
+            if route.escalate_to:
+                logger.warning(f"Translation with {resolved_model} failed ({e}), escalating to {route.escalate_to}")
+                return self.translate(source_text, source_lang, target_lang, tone, think=think,
+                                      model=route.escalate_to, request_class=request_class)
+            logger.error(f"Translation failed: {e}")
+            raise
+    
+    def _translate_uncached(self, source_text: str, source_lang: str, target_lang: str, tone: str,
+                            think: bool, model: str, cache_key: str,
+                            request_class: str = "translate") -> Tuple[str, Optional[str]]:
+        """Translate via Ollama and store the result in the cache."""
         detected = self._detect_language_if_needed(source_text, source_lang)
         source_lang_for_prompt = detected if detected and source_lang == "auto" else source_lang
         
@@ -38,20 +93,443 @@ class TranslationService:
             source_text, source_lang_for_prompt, target_lang, tone
         )
         
-        try:
-            client = get_ollama_client(model=model)
-            logger.info(f"Translation prompt: {prompt[:500]}...")
-            translated = client.chat_completion(prompt, temperature=0.0, think=think)
+        client = get_ollama_client(model=model, request_class=request_class)
+        logger.info(f"Translation prompt: {prompt[:500]}...")
+        translated, complete = self._generate_translation(
+            client, prompt, prompts.TRANSLATE.system, source_text, source_lang_for_prompt, target_lang, think
+        )
+        
+        if complete:
+            if self._answered_without_thinking(client, think):
+                cache_key = self._translation_cache_key(source_text, source_lang, target_lang, tone, model, False)
+            get_translation_cache().set(cache_key, {"translated_text": translated, "detected": detected}, model=model)
+            self._remember_conversation(source_text, target_lang, tone, model, prompt, translated, client.host)
+        logger.info(f"Translation completed: {len(source_text)} chars -> {len(translated)} chars")
+        return translated, detected
+    
+    def translate_incremental(self, source_text: str, source_lang: str, target_lang: str, tone: str = "neutral", think: bool = False, model: str = None) -> Tuple[str, Optional[str], Dict]:
+        """Translate text segment by segment, reusing cached segment translations.
+        
+        The text is split into sentences/paragraphs. Each segment is cached
+        together with its preceding segment, so editing one sentence only sends
+        that sentence (and the one after it) to Ollama.
+        
+        Args:
+            source_text: Text to translate
+            source_lang: Source language code or 'auto'
+            target_lang: Target language code
+            tone: Translation tone
             
-            if not translated:
-                raise Exception("Empty response from Ollama")
+        Returns:
+            Tuple of (translated_text, detected_language, segment_stats)
+        
+        Raises:
+            Exception: If translation of a segment fails
+        """
+        segments = split_segments(source_text)
+        if sum(not seg.is_blank for seg in segments) <= 1:
+            translated, detected = self.translate(
+                source_text, source_lang, target_lang, tone, think=think, model=model
+            )
+            return translated, detected, {"total": 1, "translated": 1}
+        
+        for event in self._incremental_events(segments, source_text, source_lang, target_lang, tone,
+                                              think, model, stream=False):
+            if event["type"] == "done":
+                return event["translated_text"], event["detected"], event["segments"]
+    
+    def translate_incremental_stream(self, source_text: str, source_lang: str, target_lang: str,
+                                     tone: str = "neutral", think: bool = False,
+                                     model: str = None) -> Iterator[Dict]:
+        """Translate text segment by segment, streaming the segments as they are generated.
+        
+        Works like ``translate_incremental``, but yields the events of
+        ``translate_stream`` (the ``done`` event also carries the segment
+        statistics). Closing the generator, e.g. when the client disconnects,
+        stops the segment that is being generated.
+        
+        Raises:
+            Exception: If translation of a segment fails
+        """
+        segments = split_segments(source_text)
+        if sum(not seg.is_blank for seg in segments) <= 1:
+            for event in self.translate_stream(source_text, source_lang, target_lang, tone,
+                                               think=think, model=model):
+                if event["type"] == "done":
+                    # Events may be shared with coalesced streams, so do not modify them
+                    event = dict(event, segments={"total": 1, "translated": 0 if event.get("cached") else 1})
+                yield event
+            return
+        
+        key = get_translation_cache().make_key(
+            "incremental", source_text=source_text, source_lang=source_lang, target_lang=target_lang,
+            tone=tone, model=model, think=think, prompt=prompts.SEGMENT.tag
+        )
+        for event in self.inflight.stream(key, lambda: self._incremental_events(
+            segments, source_text, source_lang, target_lang, tone, think, model, stream=True
+        )):
+            yield {name: value for name, value in event.items() if name != "detected"}
+    
+    def _incremental_events(self, segments: List[Segment], source_text: str, source_lang: str,
+                            target_lang: str, tone: str, think: bool, model: Optional[str],
+                            stream: bool) -> Iterator[Dict]:
+        """Translate segments in order, yielding ``start``, ``delta`` and ``done`` events.
+        
+        With ``stream`` the segments sent to Ollama are streamed fragment by
+        fragment; otherwise each segment arrives as one delta.
+        """
+        content_segments = [seg for seg in segments if not seg.is_blank]
+        cache = get_translation_cache()
+        resolved_model = self._route(model, "translate", source_text, source_lang, target_lang, think).model
+        detected = self._detect_language_if_needed(source_text, source_lang)
+        source_lang_for_prompt = detected if detected and source_lang == "auto" else source_lang
+        resolved_source = detected or source_lang
+        yield {"type": "start", "source_lang": resolved_source, "target_lang": target_lang}
+        
+        client = get_ollama_client(model=resolved_model)
+        texts = []
+        previous_source, previous_translation = "", ""
+        misses = 0
+        truncated = False
+        
+        for segment in segments:
+            if segment.is_blank:
+                texts.append(segment.text)
+                if segment.text + segment.separator:
+                    yield {"type": "delta", "text": segment.text + segment.separator}
+                continue
             
-            logger.info(f"Translation completed: {len(source_text)} chars -> {len(translated)} chars")
-            return translated, detected
+            key_parts = dict(source_text=segment.text, previous=previous_source,
+                             source_lang=source_lang_for_prompt, target_lang=target_lang,
+                             tone=tone, model=resolved_model, prompt=prompts.SEGMENT.tag)
+            cached = cache.get(cache.make_key("segment", think=think, **key_parts))
+            if cached:
+                translated = cached["translated_text"]
+                yield {"type": "delta", "text": translated}
+            else:
+                prompt = self._build_segment_prompt(
+                    segment.text, previous_source, previous_translation,
+                    source_lang_for_prompt, target_lang, tone
+                )
+                if stream:
+                    outcome = {}
+                    for fragment in self._stream_translation(
+                        client, prompt, prompts.SEGMENT.system, segment.text,
+                        source_lang_for_prompt, target_lang, think, outcome
+                    ):
+                        yield {"type": "delta", "text": fragment}
+                    translated, complete = outcome["translated"], outcome["complete"]
+                else:
+                    translated, complete = self._generate_translation(
+                        client, prompt, prompts.SEGMENT.system, segment.text,
+                        source_lang_for_prompt, target_lang, think
+                    )
+                    yield {"type": "delta", "text": translated}
+                if complete:
+                    answered_think = think and not self._answered_without_thinking(client, think)
+                    cache.set(cache.make_key("segment", think=answered_think, **key_parts),
+                              {"translated_text": translated}, model=resolved_model)
+                truncated = truncated or not complete
+                misses += 1
             
-        except Exception as e:
-            logger.error(f"Translation failed: {e}")
+            texts.append(translated)
+            previous_source, previous_translation = segment.text, translated
+            if segment.separator:
+                yield {"type": "delta", "text": segment.separator}
+        
+        result = join_segments(segments, texts)
+        if not truncated:
+            # Follow-ups continue from the assembled text as if it was translated in one
+            # turn; no backend has evaluated that prompt, so none is preferred
+            prompt = self._build_translation_prompt(source_text, source_lang_for_prompt, target_lang, tone)
+            self._remember_conversation(source_text, target_lang, tone, resolved_model, prompt, result, None)
+        logger.info(f"Incremental translation: {misses}/{len(content_segments)} segments sent to Ollama")
+        yield {"type": "done", "translated_text": result, "source_lang": resolved_source,
+               "target_lang": target_lang, "truncated": truncated, "detected": detected,
+               "segments": {"total": len(content_segments), "translated": misses}}
+    
+    def translate_document(self, source_text: str, source_lang: str, target_lang: str, tone: str = "neutral", think: bool = False, model: str = None) -> Iterator[Dict]:
+        """Translate a long document as concurrently translated chunks.
+        
+        The text is split on paragraph/sentence boundaries into chunks that fit
+        the DOCUMENT_CHUNK_TOKENS budget. Chunks are translated in parallel and
+        reassembled in order with the original separators.
+        
+        Args:
+            source_text: Text to translate
+            source_lang: Source language code or 'auto'
+            target_lang: Target language code
+            tone: Translation tone
+            
+        Yields:
+            Event dicts: ``start`` with the number of chunks, ``progress`` after
+            each finished chunk and a final ``done`` with the full translation
+        
+        Raises:
+            Exception: If a chunk fails to translate
+        """
+        config = current_app.config
+        resolved_model = self._route(model, "document", source_text, source_lang, target_lang, think).model
+        detected = self._detect_language_if_needed(source_text, source_lang)
+        source_lang_for_prompt = detected if detected and source_lang == "auto" else source_lang
+        resolved_source = detected or source_lang
+        
+        chunks = chunk_segments(split_segments(source_text), config["DOCUMENT_CHUNK_TOKENS"])
+        content = [i for i, chunk in enumerate(chunks) if not chunk.is_blank]
+        yield {"type": "start", "chunks": len(content), "source_lang": resolved_source,
+               "target_lang": target_lang}
+        
+        texts = [chunk.text for chunk in chunks]
+        tasks = []
+        for i in content:
+            # Chunks run in parallel, so only the preceding source text is available as context
+            previous = split_segments(chunks[i - 1].text)[-1].text if i > 0 else ""
+            tasks.append((chunks[i].text, previous, source_lang_for_prompt, target_lang,
+                          tone, resolved_model, think))
+        
+        done = 0
+        cancel_event = threading.Event()
+        tasks = [task + (cancel_event,) for task in tasks]
+        try:
+            for task_index, translated, error in map_concurrently(
+                self._translate_chunk, tasks, config["DOCUMENT_CONCURRENCY"]
+            ):
+                if error is not None:
+                    raise error
+                texts[content[task_index]] = translated
+                done += 1
+                yield {"type": "progress", "done": done, "total": len(content)}
+        finally:
+            # Abort chunks still generating if we fail or the client goes away
+            if done < len(content):
+                cancel_event.set()
+        
+        translated = join_segments(chunks, texts)
+        # Recorded like an incremental translation; chunks ran on several backends
+        prompt = self._build_translation_prompt(source_text, source_lang_for_prompt, target_lang, tone)
+        self._remember_conversation(source_text, target_lang, tone, resolved_model, prompt, translated, None)
+        logger.info(f"Document translation completed: {len(content)} chunks, "
+                    f"{len(source_text)} chars -> {len(translated)} chars")
+        yield {"type": "done", "translated_text": translated, "source_lang": resolved_source,
+               "target_lang": target_lang}
+    
+    def _translate_chunk(self, chunk: str, previous_source: str, source_lang: str, target_lang: str,
+                         tone: str, model: str, think: bool,
+                         cancel_event: Optional[threading.Event] = None) -> str:
+        """Translate one document chunk, using the translation cache."""
+        cache = get_translation_cache()
+        key_parts = dict(source_text=chunk, previous=previous_source, source_lang=source_lang,
+                         target_lang=target_lang, tone=tone, model=model, prompt=prompts.SEGMENT.tag)
+        cached = cache.get(cache.make_key("chunk", think=think, **key_parts))
+        if cached:
+            return cached["translated_text"]
+        
+        prompt = self._build_segment_prompt(chunk, previous_source, "", source_lang, target_lang, tone)
+        client = get_ollama_client(model=model, request_class="batch")
+        translated, complete = self._generate_translation(
+            client, prompt, prompts.SEGMENT.system, chunk, source_lang, target_lang, think, cancel_event
+        )
+        
+        if complete:
+            answered_think = think and not self._answered_without_thinking(client, think)
+            cache.set(cache.make_key("chunk", think=answered_think, **key_parts),
+                      {"translated_text": translated}, model=model)
+        return translated
+    
+    def _generate_translation(self, client, prompt: str, system: str, source_text: str,
+                              source_lang: str, target_lang: str, think: bool,
+                              cancel_event: Optional[threading.Event] = None) -> Tuple[str, bool]:
+        """Generate a translation within the output budget of its language pair.
+        
+        Returns:
+            Tuple of (translated_text, complete); complete is False if the
+            generation was stopped as runaway (the output is then trimmed and
+            should not be cached)
+        
+        Raises:
+            Exception: If Ollama returned nothing
+        """
+        budget = get_output_budget()
+        guard = budget.guard(source_text, source_lang, target_lang) \
+            if current_app.config["RUNAWAY_GUARD"] else None
+        translated = client.chat_completion(
+            prompt, max_tokens=budget.max_tokens(source_text, source_lang, target_lang, think),
+            temperature=0.0, think=think, cancel_event=cancel_event, system=system, guard=guard,
+            output_tokens=budget.context_tokens(source_text, source_lang, target_lang, think)
+        )
+        if not translated:
+            raise Exception("Empty response from Ollama")
+        
+        if guard is not None and client.last_stream_status == "runaway":
+            return budget.stopped(guard, translated), False
+        budget.record(source_text, translated, source_lang, target_lang)
+        return translated, True
+    
+    def _stream_translation(self, client, prompt: str, system: str, source_text: str,
+                            source_lang: str, target_lang: str, think: bool,
+                            outcome: Dict) -> Iterator[str]:
+        """Stream a translation within the output budget of its language pair.
+        
+        Yields the generated fragments, without leading whitespace. Once the
+        stream is exhausted, ``outcome`` holds the ``translated`` text and
+        ``complete``, which is False if the generation was stopped as runaway
+        or cut off by the timeout (the output should then not be cached).
+        Closing the generator closes the upstream stream, which stops the
+        Ollama generation.
+        
+        Raises:
+            Exception: If Ollama returned nothing
+        """
+        budget = get_output_budget()
+        guard = budget.guard(source_text, source_lang, target_lang) \
+            if current_app.config["RUNAWAY_GUARD"] else None
+        parts = []
+        runaway = False
+        stream = client.chat_completion_stream(
+            prompt, max_tokens=budget.max_tokens(source_text, source_lang, target_lang, think),
+            temperature=0.0, think=think, system=system,
+            output_tokens=budget.context_tokens(source_text, source_lang, target_lang, think)
+        )
+        try:
+            for fragment in stream:
+                # Drop leading whitespace so the client never renders a blank first frame
+                if not parts:
+                    fragment = fragment.lstrip()
+                    if not fragment:
+                        continue
+                parts.append(fragment)
+                yield fragment
+                if guard is not None and guard(fragment):
+                    runaway = True
+                    break
+        finally:
+            # Closing the upstream stream stops the Ollama generation when our
+            # consumer (the HTTP response) was closed by a client disconnect
+            stream.close()
+        
+        translated = "".join(parts).strip()
+        if not translated:
+            raise Exception("Empty response from Ollama")
+        
+        if runaway:
+            translated = budget.stopped(guard, translated)
+        else:
+            budget.record(source_text, translated, source_lang, target_lang)
+        outcome["translated"] = translated
+        outcome["complete"] = not runaway and client.last_stream_status != "timeout"
+    
+    def translate_stream(self, source_text: str, source_lang: str, target_lang: str, tone: str = "neutral", think: bool = False, model: str = None) -> Iterator[Dict]:
+        """Translate text, yielding partial output as it is generated.
+        
+        Args:
+            source_text: Text to translate
+            source_lang: Source language code or 'auto'
+            target_lang: Target language code
+            tone: Translation tone
+            
+        Yields:
+            Event dicts: one ``start`` event with the resolved source language,
+            ``delta`` events with text fragments and a final ``done`` event with
+            the full translation (``truncated`` is set if the timeout was hit).
+        
+        Raises:
+            Exception: If translation fails before any output was produced (a
+                small-model route escalates to the large model first)
+        """
+        if not source_text.strip():
+            yield {"type": "done", "translated_text": "", "source_lang": source_lang,
+                   "target_lang": target_lang, "truncated": False}
+            return
+        
+        cache = get_translation_cache()
+        route = self._route(model, "translate", source_text, source_lang, target_lang, think)
+        resolved_model = route.model
+        cache_key = self._translation_cache_key(
+            source_text, source_lang, target_lang, tone, resolved_model, think
+        )
+        cached = cache.get(cache_key)
+        if cached:
+            resolved_source = cached.get("detected") or source_lang
+            yield {"type": "start", "source_lang": resolved_source, "target_lang": target_lang}
+            yield {"type": "delta", "text": cached["translated_text"]}
+            yield {"type": "done", "translated_text": cached["translated_text"], "source_lang": resolved_source,
+                   "target_lang": target_lang, "truncated": False, "cached": True}
+            return
+        
+        # Identical streams (debounce repeats, several tabs) share one generation
+        yield from self.inflight.stream(cache_key, lambda: self._stream_uncached(
+            source_text, source_lang, target_lang, tone, think, route, cache_key
+        ))
+    
+    def _stream_uncached(self, source_text: str, source_lang: str, target_lang: str, tone: str,
+                         think: bool, route: Route, cache_key: str) -> Iterator[Dict]:
+        """Stream a translation from Ollama and store the result in the cache."""
+        cache = get_translation_cache()
+        resolved_model = route.model
+        detected = self._detect_language_if_needed(source_text, source_lang)
+        source_lang_for_prompt = detected if detected and source_lang == "auto" else source_lang
+        resolved_source = detected or source_lang
+        
+        prompt = self._build_translation_prompt(
+            source_text, source_lang_for_prompt, target_lang, tone
+        )
+        
+        client = get_ollama_client(model=resolved_model)
+        started = time.monotonic()
+        yield {"type": "start", "source_lang": resolved_source, "target_lang": target_lang}
+        
+        outcome = {}
+        produced = abandoned = False
+        try:
+            for fragment in self._stream_translation(
+                client, prompt, prompts.TRANSLATE.system, source_text, source_lang_for_prompt,
+                target_lang, think, outcome
+            ):
+                produced = True
+                yield {"type": "delta", "text": fragment}
+        except GeneratorExit:
+            # The client went away, which says nothing about the route
+            abandoned = True
+            raise
+        except OllamaBusyError:
             raise
+        except Exception as e:
+            if produced or not route.escalate_to:
+                raise
+            logger.warning(f"Translation with {resolved_model} failed ({e}), escalating to {route.escalate_to}")
+            escalate = True
+        else:
+            escalate = False
+        finally:
+            if not abandoned:
+                get_model_router().record(route, time.monotonic() - started,
+                                          ok=outcome.get("complete", False))
+        
+        if escalate:
+            # Nothing was shown yet, so the larger model can take over the stream
+            for event in self.translate_stream(source_text, source_lang, target_lang, tone,
+                                               think=think, model=route.escalate_to):
+                if event["type"] != "start":
+                    yield event
+            return
+        
+        translated = outcome["translated"]
+        truncated = not outcome["complete"]
+        if not truncated:
+            if self._answered_without_thinking(client, think):
+                cache_key = self._translation_cache_key(
+                    source_text, source_lang, target_lang, tone, resolved_model, False
+                )
+            cache.set(cache_key, {"translated_text": translated, "detected": detected}, model=resolved_model)
+            self._remember_conversation(source_text, target_lang, tone, resolved_model, prompt,
+                                        translated, client.host)
+        logger.info(f"Streamed translation completed: {len(source_text)} chars -> {len(translated)} chars"
+                    f"{' (truncated)' if truncated else ''}")
+        done = {"type": "done", "translated_text": translated, "source_lang": resolved_source,
+                "target_lang": target_lang, "truncated": truncated}
+        if think:
+            done["tokens"] = {"thinking": client.thinking_tokens, "answer": client.answer_tokens}
+        yield done
     
     def get_alternatives(self, source_text: str, current_translation: str, clicked_word: str,
                         target_lang: str, tone: str, think: bool = False, model: str = None) -> List[str]:
@@ -70,30 +548,159 @@ class TranslationService:
         if not all([source_text, current_translation, clicked_word]):
             return []
         
-        prompt = self._build_alternatives_prompt(
-            source_text, current_translation, clicked_word, target_lang, tone
+        route = self._route(model, "alternatives", source_text, "auto", target_lang, think)
+        resolved_model = route.model
+        key = self._alternatives_cache_key(
+            source_text, current_translation, clicked_word, target_lang, tone, resolved_model, think
         )
+        # Filled by precompute_alternatives or an earlier click
+        cached = get_translation_cache().get(key)
+        if cached:
+            return cached["alternatives"]
         
         try:
-            client = get_ollama_client(model=model)
-            response = client.chat_completion(prompt, max_tokens=512, temperature=0.0, think=think)
-            
-            if not response:
-                return []
-            
-            alternatives = self._extract_alternatives_from_response(response)
-            return self._filter_alternatives(alternatives)
+            with get_model_router().timed(route):
+                return self.inflight.do(key, lambda: self._fetch_alternatives(
+                    source_text, current_translation, clicked_word, target_lang, tone, think, resolved_model, key
+                ))
             
+        except OllamaBusyError:
+            raise
         except Exception as e:
+            if route.escalate_to:
+                logger.warning(f"Alternatives with {resolved_model} failed ({e}), escalating to {route.escalate_to}")
+                return self.get_alternatives(source_text, current_translation, clicked_word, target_lang,
+                                             tone, think=think, model=route.escalate_to)
             logger.warning(f"Failed to get alternatives: {e}")
             return []
     
+    def _fetch_alternatives(self, source_text: str, current_translation: str, clicked_word: str,
+                            target_lang: str, tone: str, think: bool, model: str,
+                            cache_key: str) -> List[str]:
+        """Ask Ollama for alternatives of a clicked word."""
+        # Only a conversation held with this model can be continued
+        conversation = self._find_conversation(source_text, target_lang, tone, model)
+        if conversation:
+            # Continue the translation conversation on the backend that holds its prefix
+            prompt = self._build_follow_up_prompt(
+                prompts.ALTERNATIVES_FOLLOW_UP, conversation, current_translation,
+                f"CLICKED_TOKEN: \"{clicked_word}\""
+            )
+            client = get_ollama_client(model=model, request_class="alternatives",
+                                       backend=conversation.get("host"))
+            response = client.chat_completion(prompt, max_tokens=512, temperature=0.0, think=think,
+                                              system=prompts.TRANSLATE.system,
+                                              history=conversation["messages"],
+                                              response_format=ALTERNATIVES_SCHEMA)
+        else:
+            prompt = self._build_alternatives_prompt(
+                source_text, current_translation, clicked_word, target_lang, tone
+            )
+            client = get_ollama_client(model=model, request_class="alternatives")
+            response = client.chat_completion(prompt, max_tokens=512, temperature=0.0, think=think,
+                                              system=prompts.ALTERNATIVES.system,
+                                              response_format=ALTERNATIVES_SCHEMA)
+        
+        if not response:
+            return []
+        
+        alternatives = self._filter_alternatives(self._extract_alternatives_from_response(response, model))
+        if alternatives:
+            get_translation_cache().set(cache_key, {"alternatives": alternatives}, model=model)
+        return alternatives
+    
+    def schedule_alternatives(self, source_text: str, translation: str, target_lang: str, tone: str,
+                              think: bool = False, model: str = None):
+        """Precompute word alternatives for a translation in the background."""
+        app = current_app._get_current_object()
+        resolved_model = self._route(model, "alternatives", source_text, "auto", target_lang, think).model
+        key = get_translation_cache().make_key(
+            "all-alternatives", source_text=source_text, translation=normalize_source_text(translation),
+            target_lang=target_lang, tone=tone, model=resolved_model, think=think
+        )
+        
+        def run():
+            with app.app_context():
+                try:
+                    # A second request for the same translation joins the running job
+                    self.inflight.do(key, lambda: self.precompute_alternatives(
+                        source_text, translation, target_lang, tone, think, resolved_model
+                    ))
+                except Exception as e:
+                    logger.warning(f"Failed to precompute alternatives: {e}")
+        
+        self._background.submit(run)
+    
+    def precompute_alternatives(self, source_text: str, translation: str, target_lang: str, tone: str,
+                                think: bool = False, model: str = None) -> int:
+        """Get alternatives for all words of a translation in a single Ollama call.
+        
+        The alternatives of every word are cached under the same key a click
+        on that word uses, so ``get_alternatives`` answers from the cache.
+        
+        Returns:
+            Number of words whose alternatives were cached
+        """
+        cache = get_translation_cache()
+        resolved_model = self._route(model, "alternatives", source_text, "auto", target_lang, think).model
+        words = content_words(translation, current_app.config["ALTERNATIVES_PRECOMPUTE_MAX_WORDS"])
+        keys = {
+            word: self._alternatives_cache_key(source_text, translation, word, target_lang, tone,
+                                               resolved_model, think)
+            for word in words
+        }
+        pending = [word for word in words if cache.get(keys[word]) is None]
+        if not pending:
+            return 0
+        
+        tokens = "TOKENS: " + json.dumps(pending, ensure_ascii=False)
+        conversation = self._find_conversation(source_text, target_lang, tone, resolved_model)
+        if conversation:
+            prompt = self._build_follow_up_prompt(
+                prompts.ALL_ALTERNATIVES_FOLLOW_UP, conversation, translation, tokens
+            )
+            system, history = prompts.TRANSLATE.system, conversation["messages"]
+        else:
+            prompt = self._alternatives_context(source_text, translation, target_lang, tone) + tokens
+            system, history = prompts.ALL_ALTERNATIVES.system, None
+        
+        # Runs behind interactive requests; roughly 30 output tokens per word
+        client = get_ollama_client(model=resolved_model, request_class="batch",
+                                   backend=conversation.get("host") if conversation else None)
+        response = client.chat_completion(prompt, max_tokens=64 + 32 * len(pending), temperature=0.0,
+                                          think=think, system=system, history=history,
+                                          response_format=word_alternatives_schema(pending))
+        
+        # A reply cut off by the token limit still yields the words before the cut
+        by_word = self._extract_alternatives_from_response(response or "", resolved_model)
+        if not isinstance(by_word, dict):
+            return 0
+        
+        stored = 0
+        for word in pending:
+            alternatives = self._filter_alternatives(by_word.get(word) or [])
+            if alternatives:
+                cache.set(keys[word], {"alternatives": alternatives}, model=resolved_model)
+                stored += 1
+        logger.info(f"Precomputed alternatives for {stored}/{len(pending)} words")
+        return stored
+    
     def refine_translation(self, source_text: str, current_translation: str,
                           target_lang: str, tone: str, enforced_phrases: List[str],
-                          replacements: List[Dict[str, str]], think: bool = False, model: str = None) -> Tuple[str, bool]:
+                          replacements: List[Dict[str, str]], think: bool = False, model: str = None,
+                          mode: str = "auto") -> Tuple[str, bool, str]:
         """
         Refine translation with user constraints.
         
+        Replacements are applied locally first. The model is only asked when
+        an enforced phrase is still missing or a replacement may need the
+        surrounding words to agree with it (``mode="auto"``), or always
+        (``mode="llm"``). ``mode="local"`` never calls the model.
+        
+        When source and translation line up sentence by sentence, only the
+        sentences touched by the edits go to the model (with their neighbours
+        as context) and the result is spliced back into the translation.
+        
         Args:
             source_text: Original source text
             current_translation: Current translation draft
@@ -101,44 +708,91 @@ class TranslationService:
             tone: Translation tone
             enforced_phrases: Phrases that must be included
             replacements: List of {from: str, to: str} replacements
+            mode: "auto", "local" or "llm"
             
         Returns:
-            Tuple of (refined_translation, is_faithful)
+            Tuple of (refined_translation, is_faithful, path), path being
+            "local" or "llm"
         """
         if not source_text.strip():
-            return "", True
+            return "", True, "local"
         
-        prompt = self._build_refinement_prompt(
-            source_text, current_translation, target_lang, tone,
-            enforced_phrases, replacements
-        )
+        if mode != "llm":
+            local_text, needs_model = local_refine(current_translation, target_lang,
+                                                   enforced_phrases, replacements)
+            if mode == "local" or not needs_model:
+                return local_text, not missing_phrases(local_text, enforced_phrases), "local"
+            current_translation = local_text
+        
+        resolved_model = self._follow_up_route(model, "refine", source_text, target_lang, tone, think).model
+        scope = self._refine_scope(source_text, current_translation, enforced_phrases, replacements)
+        conversation = None if scope else self._find_conversation(source_text, target_lang, tone, resolved_model)
+        if scope:
+            source_segments, translation_segments, start, end = scope
+            prompt = self._build_excerpt_refinement_prompt(
+                source_segments, translation_segments, start, end, target_lang, tone,
+                enforced_phrases, replacements
+            )
+            system, history = prompts.REFINE_EXCERPT.system, None
+            logger.info(f"Scoped refinement: {end - start}/{len(translation_segments)} segments sent to Ollama")
+        elif conversation:
+            prompt = self._build_follow_up_prompt(
+                prompts.REFINE_FOLLOW_UP, conversation, current_translation,
+                self._refinement_constraints(enforced_phrases, replacements)
+            )
+            system, history = prompts.TRANSLATE.system, conversation["messages"]
+        else:
+            prompt = self._build_refinement_prompt(
+                source_text, current_translation, target_lang, tone,
+                enforced_phrases, replacements
+            )
+            system, history = prompts.REFINE.system, None
         
         try:
-            client = get_ollama_client(model=model)
-            response = client.chat_completion(prompt, max_tokens=768, temperature=0.0, think=think)
+            client = get_ollama_client(model=resolved_model, request_class="refine",
+                                       backend=conversation.get("host") if conversation else None)
+            response = client.chat_completion(prompt, max_tokens=768, temperature=0.0, think=think,
+                                              system=system, history=history,
+                                              response_format=REFINE_SCHEMA)
             
             if not response:
-                return current_translation, False
+                return current_translation, False, "llm"
             
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response, flags=re.S)
-            if json_match:
-                data = json.loads(json_match.group(0))
-            else:
-                data = json.loads(response)
+            data, outcome = self._parse_structured_response(response, resolved_model)
+            if not data or not isinstance(data.get("translated"), str) or not data["translated"].strip():
+                return current_translation, False, "llm"
             
-            translated = data.get("translated", "")
-            faithful = bool(data.get("faithful", True))
+            translated = data["translated"]
+            # A reply cut off before its verdict is not vouched for
+            faithful = outcome == "ok" and bool(data.get("faithful", False))
+            if scope and translated:
+                translated = self._splice_excerpt(translation_segments, start, end, translated)
             
-            return translated, faithful
+            return translated, faithful, "llm"
             
+        except OllamaBusyError:
+            raise
         except Exception as e:
             logger.warning(f"Failed to refine translation: {e}")
-            return current_translation, False
+            return current_translation, False, "llm"
     
     def _build_translation_prompt(self, source_text: str, source_lang: str, 
                                  target_lang: str, tone: str) -> str:
-        """Build prompt for translation."""
+        """Build the user message for a translation (system prompt: ``prompts.TRANSLATE``)."""
+        return self._translation_header(source_lang, target_lang, tone) + "\n\nText:\n" + source_text
+    
+    def _build_segment_prompt(self, segment: str, previous_source: str, previous_translation: str,
+                              source_lang: str, target_lang: str, tone: str) -> str:
+        """Build the user message for one segment of a longer text (system prompt: ``prompts.SEGMENT``)."""
+        prompt = self._translation_header(source_lang, target_lang, tone)
+        if previous_source:
+            prompt += f"\n\nPreceding text:\n{previous_source}"
+        if previous_translation:
+            prompt += f"\n\nPreceding translation:\n{previous_translation}"
+        return prompt + "\n\nText:\n" + segment
+    
+    def _translation_header(self, source_lang: str, target_lang: str, tone: str) -> str:
+        """Describe languages and tone, least frequently changing first."""
         target_name = LanguageService.get_language_name(target_lang)
         source_name = ("auto-detected" if source_lang == "auto" 
                       else LanguageService.get_language_name(source_lang))
@@ -149,82 +803,121 @@ class TranslationService:
         }
         tone_desc = tone_map.get(tone, "neutral")
         
-        instructions = [
-            f"You are a professional translator. Translate the user's text to {target_name} ({target_lang}).",
-            f"Source language: {source_name}."
-        ]
-        
-        if tone_desc and tone_desc != "neutral":
-            instructions.append(
-                f"Use a {tone_desc} tone in the translation. "
-                "Adapt phrasing and formality accordingly for the target language."
-            )
-        
-        instructions.extend([
-            "Keep formatting (line breaks). Do not add extra commentary, "
-            "do not translate code tags, XML, or URLs.",
-            "Return only the translated text, without explanations. "
-            "Preserve punctuation and capitalization as appropriate."
-        ])
-        
-        return " ".join(instructions) + "\n\nUser text:\n" + source_text
+        return (
+            f"Target language: {target_name} ({target_lang})\n"
+            f"Tone: {tone_desc}\n"
+            f"Source language: {source_name}"
+        )
     
     def _build_alternatives_prompt(self, source_text: str, current_translation: str,
                                   clicked_word: str, target_lang: str, tone: str) -> str:
-        """Build prompt for getting alternatives."""
+        """Build the user message for word alternatives (system prompt: ``prompts.ALTERNATIVES``).
+        
+        The clicked token comes last, so clicks on different words of the same
+        translation share everything before it.
+        """
+        return (self._alternatives_context(source_text, current_translation, target_lang, tone)
+                + f"CLICKED_TOKEN: \"{clicked_word}\"")
+    
+    def _alternatives_context(self, source_text: str, current_translation: str,
+                              target_lang: str, tone: str) -> str:
+        """Build the part of an alternatives prompt that does not depend on the token."""
         return (
-            "You are assisting with post-editing of a translation.\n"
-            f"Target language code: {target_lang}.\n"
-            f"Tone: {tone}.\n"
-            "Given the source sentence and its current translation to the target language, "
-            f"provide up to 6 alternative single-word or short-phrase (1–3 words) replacements for the clicked token:\n"
-            f"CLICKED_TOKEN: \"{clicked_word}\"\n\n"
-            "Rules:\n"
-            "- Keep alternatives concise (<= 3 words), natural in context, and appropriate for the target language.\n"
-            "- Prefer synonyms or close variants that fit the specific sentence.\n"
-            "- Avoid duplicates and avoid repeating the original token unless an inflected form differs significantly.\n"
-            "- Return STRICT JSON as: {\"alternatives\": [\"...\", \"...\"]} with no extra text.\n\n"
+            f"Target language code: {target_lang}\n"
+            f"Tone: {tone}\n\n"
             f"Source:\n{source_text}\n\n"
-            f"Current translation:\n{current_translation}\n"
+            f"Current translation:\n{current_translation}\n\n"
         )
     
     def _build_refinement_prompt(self, source_text: str, current_translation: str,
                                 target_lang: str, tone: str, enforced_phrases: List[str],
                                 replacements: List[Dict[str, str]]) -> str:
-        """Build prompt for translation refinement."""
+        """Build the user message for translation refinement (system prompt: ``prompts.REFINE``)."""
         target_name = LanguageService.get_language_name(target_lang)
         
+        return (
+            f"Target language: {target_name} ({target_lang})\n"
+            f"Tone: {tone}\n\n"
+            f"Source text:\n{source_text}\n\n"
+            f"Current translation (user-edited draft):\n{current_translation}\n\n"
+            + self._refinement_constraints(enforced_phrases, replacements)
+        )
+    
+    def _build_excerpt_refinement_prompt(self, source_segments: List[Segment],
+                                         translation_segments: List[Segment], start: int, end: int,
+                                         target_lang: str, tone: str, enforced_phrases: List[str],
+                                         replacements: List[Dict[str, str]]) -> str:
+        """Build the user message for refining segments ``start:end`` (system prompt: ``prompts.REFINE_EXCERPT``)."""
+        target_name = LanguageService.get_language_name(target_lang)
+        prompt = f"Target language: {target_name} ({target_lang})\nTone: {tone}\n\n"
+        if start > 0:
+            prompt += (f"Preceding source text:\n{source_segments[start - 1].text}\n\n"
+                       f"Preceding translation:\n{translation_segments[start - 1].text}\n\n")
+        if end < len(source_segments):
+            prompt += (f"Following source text:\n{source_segments[end].text}\n\n"
+                       f"Following translation:\n{translation_segments[end].text}\n\n")
+        return (
+            prompt
+            + f"Source text:\n{self._join_excerpt(source_segments, start, end)}\n\n"
+            + f"Current translation (user-edited draft):\n{self._join_excerpt(translation_segments, start, end)}\n\n"
+            + self._refinement_constraints(enforced_phrases, replacements)
+        )
+    
+    def _refine_scope(self, source_text: str, current_translation: str, enforced_phrases: List[str],
+                      replacements: List[Dict[str, str]]) -> Optional[Tuple[List[Segment], List[Segment], int, int]]:
+        """Find the segments a refinement has to touch.
+        
+        Returns:
+            Tuple of (source_segments, translation_segments, start, end), or
+            None if the whole text should be refined (the texts do not line
+            up, an enforced phrase is missing, or the edits cover most of it)
+        """
+        if missing_phrases(current_translation, enforced_phrases):
+            return None
+        aligned = align_segments(source_text, current_translation)
+        if not aligned or len(aligned[1]) < 3:
+            return None
+        
+        source_segments, translation_segments = aligned
+        # Replacements not applied yet are found by the word they replace
+        phrases = enforced_phrases + [r["to"] if contains_phrase(current_translation, r["to"]) else r["from"]
+                                      for r in replacements]
+        span = edit_span(translation_segments, phrases)
+        if span is None or 2 * (span[1] - span[0]) > len(translation_segments):
+            return None
+        return source_segments, translation_segments, span[0], span[1]
+    
+    def _join_excerpt(self, segments: List[Segment], start: int, end: int) -> str:
+        """Join segments ``start:end`` with their separators in between."""
+        return "".join(seg.text + seg.separator for seg in segments[start:end - 1]) + segments[end - 1].text
+    
+    def _splice_excerpt(self, segments: List[Segment], start: int, end: int, refined: str) -> str:
+        """Replace segments ``start:end`` of a text by the refined excerpt."""
+        before = "".join(seg.text + seg.separator for seg in segments[:start])
+        after = "".join(seg.text + seg.separator for seg in segments[end:])
+        return before + refined.strip() + segments[end - 1].separator + after
+    
+    def _refinement_constraints(self, enforced_phrases: List[str],
+                                replacements: List[Dict[str, str]]) -> str:
+        """List the user's enforced phrases and replacements."""
         constraint_list = "\n".join(f"- {p}" for p in enforced_phrases) if enforced_phrases else "- (none)"
         repl_list = ("\n".join(f"- replace '{r['from']}' → '{r['to']}'" for r in replacements) 
                     if replacements else "- (none)")
-        
-        return (
-            "You are a professional translator.\n"
-            f"Task: Produce a corrected, fluent translation of the source text into {target_name} ({target_lang}).\n"
-            f"Tone: {tone}.\n"
-            "Return STRICT JSON ONLY:\n"
-            '{"translated": "<final translation>", "faithful": true|false}'
-            "\nNo explanations, no extra keys, no markdown.\n\n"
-            "CONSTRAINTS:\n"
-            "- The final translation MUST be faithful to the meaning of the source text.\n"
-            "- You MUST include each of the following user-chosen phrases EXACTLY as written (verbatim):\n"
-            f"{constraint_list}\n"
-            "- Apply the following replacements to the current translation (they are user edits):\n"
-            f"{repl_list}\n"
-            "- Ensure each 'to' phrase appears and the corresponding 'from' token no longer appears.\n"
-            "- If the enforced phrase changes the nuance, ADJUST the rest so the translation still matches the source meaning.\n"
-            "- If you CANNOT keep it faithful while keeping the enforced phrase, set faithful=false and still output best-effort in 'translated'.\n"
-            "- Do NOT introduce information absent from the source; you may paraphrase to keep it idiomatic.\n"
-            "- You may inflect surrounding words and adjust word order, but DO NOT alter the chosen phrases themselves.\n\n"
-            f"Source text:\n{source_text}\n"
-            f"\nCurrent translation (user-edited draft):\n{current_translation}\n"
-        )
+        return f"Phrases to include verbatim:\n{constraint_list}\n\nReplacements:\n{repl_list}"
+    
+    def _build_follow_up_prompt(self, template: prompts.PromptTemplate, conversation: Dict,
+                                current_translation: str, request: str) -> str:
+        """Build the next user turn of a translation conversation."""
+        prompt = template.system
+        previous = conversation["messages"][-1]["content"]
+        if current_translation.strip() != previous.strip():
+            prompt += f"\n\nCurrent translation (user-edited draft):\n{current_translation}"
+        return prompt + "\n\n" + request
     
     def get_available_models(self) -> List[str]:
         """Get list of available Ollama models."""
         try:
-            client = get_ollama_client()
-            return client.get_available_models()
+            return get_model_catalog().names()
         except Exception as e:
             logger.error(f"Failed to get available models: {e}")
             return []
@@ -232,13 +925,17 @@ class TranslationService:
     def change_model(self, new_model: str) -> bool:
         """Change the active Ollama model."""
         try:
-            client = get_ollama_client()
-            success = client.change_model(new_model)
+            success = get_model_catalog().has(new_model)
+            if not success:
+                logger.warning(f"Model {new_model} not in available models")
             
             if success:
-                # Update Flask config for future requests
-                from flask import current_app
+                # Update Flask config for future requests; cached translations are
+                # keyed by model, so those of the previous model stay valid
                 current_app.config['DEFAULT_MODEL'] = new_model
+                residency = get_model_residency()
+                if residency is not None:
+                    residency.warm_up([new_model])
                 logger.info(f"Model changed to: {new_model}")
                 
             return success
@@ -246,25 +943,114 @@ class TranslationService:
             logger.error(f"Failed to change model to {new_model}: {e}")
             return False
     
+    def _route(self, model: Optional[str], task: str, source_text: str, source_lang: str,
+               target_lang: str, think: bool) -> Route:
+        """Pick the model for a request; an explicit model choice is always kept."""
+        if model and model != AUTO_MODEL:
+            return Route(model, "selected")
+        return get_model_router().route(task, source_text, source_lang, target_lang, think,
+                                        current_app.config["DEFAULT_MODEL"])
+    
+    def _follow_up_route(self, model: Optional[str], task: str, source_text: str, target_lang: str,
+                         tone: str, think: bool) -> Route:
+        """Pick the model for a refinement of an existing translation.
+        
+        Without an explicit model choice the request goes to the model that
+        produced the translation, so it can continue that conversation; the
+        router only decides when no translation is on record. Word
+        alternatives are not routed this way: they stay on the small model.
+        """
+        if not model or model == AUTO_MODEL:
+            conversation = self._find_conversation(source_text, target_lang, tone)
+            if conversation and conversation.get("model"):
+                return Route(conversation["model"], f"translation/{task}")
+        return self._route(model, task, source_text, "auto", target_lang, think)
+    
+    def _translation_cache_key(self, source_text: str, source_lang: str, target_lang: str,
+                               tone: str, model: str, think: bool) -> str:
+        """Build the cache key for a full-text translation."""
+        return get_translation_cache().make_key(
+            "translate", source_text=source_text, source_lang=source_lang,
+            target_lang=target_lang, tone=tone, model=model, think=think, prompt=prompts.TRANSLATE.tag
+        )
+    
+    def _alternatives_cache_key(self, source_text: str, translation: str, word: str, target_lang: str,
+                                tone: str, model: str, think: bool) -> str:
+        """Build the cache key for the alternatives of one word of a translation."""
+        return get_translation_cache().make_key(
+            "alternatives", source_text=source_text, translation=normalize_source_text(translation),
+            word=word, target_lang=target_lang, tone=tone, model=model, think=think,
+            prompt=prompts.ALTERNATIVES.tag
+        )
+    
+    def _conversation_key(self, source_text: str, target_lang: str, tone: str) -> str:
+        # Not keyed by model: the latest translation of a text is the one on screen
+        return get_translation_cache().make_key(
+            "conversation", source_text=source_text, target_lang=target_lang, tone=tone,
+            prompt=prompts.TRANSLATE.tag
+        )
+    
+    def _answered_without_thinking(self, client, think: bool) -> bool:
+        """Whether a thinking request fell back to answering without thinking.
+
+        Such a result is cached under the key of a request without thinking,
+        so a later thinking request gets a real thinking answer.
+        """
+        return think and client.thinking_cut_off
+    
+    def _remember_conversation(self, source_text: str, target_lang: str, tone: str, model: str,
+                               prompt: str, translated: str, host: Optional[str]):
+        """Record a finished translation so follow-up requests can continue it.
+        
+        The conversation is stored in the translation cache (shared between
+        workers when the SQLite tier is enabled) together with the model that
+        produced it and the backend that evaluated it.
+        """
+        get_translation_cache().set(
+            self._conversation_key(source_text, target_lang, tone),
+            {"messages": [{"role": "user", "content": prompt},
+                          {"role": "assistant", "content": translated}],
+             "model": model, "host": host},
+            model=model
+        )
+    
+    def _find_conversation(self, source_text: str, target_lang: str, tone: str,
+                           model: Optional[str] = None) -> Optional[Dict]:
+        """Get the latest translation conversation of a source text, if one is known.
+        
+        Args:
+            model: Only return a conversation held with this model
+        """
+        # Not a translation lookup, so it stays out of the cache hit rate
+        conversation = get_translation_cache().get(self._conversation_key(source_text, target_lang, tone),
+                                                   count=False)
+        if conversation and model and conversation.get("model") != model:
+            return None
+        return conversation
+    
     def _detect_language_if_needed(self, source_text: str, source_lang: str) -> Optional[str]:
         """Detect language if source_lang is 'auto'."""
         if source_lang == "auto":
-            return self.language_detector.detect_language(source_text)
+            return get_language_detector().detect_language(source_text)
         return None
     
-    def _extract_alternatives_from_response(self, response: str) -> List[str]:
+    def _extract_alternatives_from_response(self, response: str, model: str) -> List[str]:
         """Extract alternatives from Ollama response."""
-        try:
-            # Try to find JSON in response
-            json_match = re.search(r'\{.*\}', response, flags=re.S)
-            if json_match:
-                data = json.loads(json_match.group(0))
-            else:
-                data = json.loads(response)
-            
-            return data.get("alternatives", [])
-        except json.JSONDecodeError:
-            return []
+        data, _ = self._parse_structured_response(response, model)
+        return data.get("alternatives", []) if data else []
+    
+    def _parse_structured_response(self, response: str, model: str) -> Tuple[Optional[Dict], str]:
+        """Parse a JSON object reply, counting parse outcomes per model.
+
+        Returns:
+            Tuple of (parsed object or None, outcome), outcome being "ok",
+            "salvaged" or "failed"
+        """
+        data, outcome = parse_json_output(response)
+        if not isinstance(data, dict):
+            data, outcome = None, "failed"
+        get_json_output_stats().record(model, outcome)
+        return data, outcome
     
     def _filter_alternatives(self, alternatives: List[str]) -> List[str]:
         """Filter and validate alternatives."""
@@ -690,16 +690,37 @@ class DropdownManager {
         const savedModel = localStorage.getItem('llot-model');
         modelSelect.innerHTML = '';
 
+        const details = {};
+        (data.details || []).forEach(info => { details[info.name] = info; });
+
+        // Let the server pick between the small and the large model
+        if (data.auto) {
+          const option = document.createElement('option');
+          option.value = 'auto';
+          option.textContent = 'auto';
+          option.selected = savedModel === 'auto';
+          option.dataset.details = `${data.auto.small} for short texts, ${data.auto.large} otherwise`;
+          modelSelect.appendChild(option);
+        }
+
         data.models.forEach(model => {
           const option = document.createElement('option');
+          const info = details[model] || {};
           option.value = model;
           option.textContent = model;
           option.selected = model === savedModel;
+          option.dataset.details = [
+            info.parameter_size,
+            info.quantization_level,
+            info.context_length ? `${info.context_length} ctx` : null
+          ].filter(Boolean).join(' · ');
           modelSelect.appendChild(option);
         });
+        this.applyModelStates(data.status || {});
 
         // If saved model not in list, fallback to first
-        if (savedModel && !data.models.includes(savedModel)) {
+        const available = data.auto ? ['auto', ...data.models] : data.models;
+        if (savedModel && !available.includes(savedModel)) {
           modelSelect.selectedIndex = 0;
           localStorage.setItem('llot-model', modelSelect.value);
         } else if (!savedModel) {
@@ -711,8 +732,56 @@ class DropdownManager {
     }
   }
 
-  changeModel(newModel) {
+  applyModelStates(states) {
+    const modelSelect = this.elements.modelSelectOutput;
+    if (!modelSelect) return;
+
+    const labels = { loaded: '●', loading: '◐', cold: '○' };
+    Array.from(modelSelect.options).forEach(option => {
+      const state = states[option.value];
+      option.textContent = state ? `${labels[state] || ''} ${option.value}`.trim() : option.value;
+      const hint = state === 'cold' ? 'Not loaded: the first translation will be slower' : (state || '');
+      option.title = [option.dataset.details, hint].filter(Boolean).join(' · ');
+    });
+
+    // Keep polling while a model is loading so the indicator flips to loaded
+    clearTimeout(this.modelStatusTimer);
+    if (Object.values(states).includes('loading')) {
+      this.modelStatusTimer = setTimeout(() => this.refreshModelStates(), 3000);
+    }
+  }
+
+  async refreshModelStates() {
+    try {
+      const response = await fetch('/api/models/status?refresh=1');
+      const data = await response.json();
+      const states = {};
+      const models = data.models || {};
+      Array.from(this.elements.modelSelectOutput?.options || []).forEach(option => {
+        if (option.value === 'auto') return;
+        const name = option.value.includes(':') ? option.value : `${option.value}:latest`;
+        states[option.value] = models[name]?.state || 'cold';
+      });
+      this.applyModelStates(states);
+    } catch (error) {
+      console.error('Failed to load model status:', error);
+    }
+  }
+
+  async changeModel(newModel) {
     localStorage.setItem('llot-model', newModel);
+
+    // Load the model now instead of on the first translation
+    try {
+      await fetch('/api/models/warmup', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ model: newModel })
+      });
+      this.refreshModelStates();
+    } catch (error) {
+      console.error('Failed to warm up model:', error);
+    }
   }
   
   getLanguages() {
@@ -760,6 +829,8 @@ class DropdownManager {
 // ============================================================================
 
 class TranslationManager {
+  static INCREMENTAL_MIN_CHARS = 300;
+
   constructor(elements, state) {
     this.elements = elements;
     this.state = state;
@@ -793,6 +864,11 @@ class TranslationManager {
   async performTranslation() {
     const sourceText = this.elements.sourceText?.value?.trim();
     if (!sourceText) {
+      // Aborting closes the stream, which also stops the server-side generation
+      if (this.state.translationAbortController) {
+        this.state.translationAbortController.abort();
+        this.state.translationAbortController = null;
+      }
       this.clearResult();
       return;
     }
@@ -811,26 +887,49 @@ class TranslationManager {
 
     this.showLoading();
 
+    const payload = {
+      source_text: sourceText,
+      source_lang: sourceLang,
+      target_lang: targetLang,
+      tone: tone,
+      think: think,
+      model: model
+    };
+
+    // Long documents are translated per sentence so edits only re-translate what changed
+    const incremental = sourceText.length >= TranslationManager.INCREMENTAL_MIN_CHARS;
+    if (incremental) {
+      payload.incremental = true;
+    }
+
     try {
-      const response = await fetch('/api/translate', {
+      // Streamed responses let the server notice an abort and stop generating
+      const response = await fetch('/api/translate/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          source_text: sourceText,
-          source_lang: sourceLang,
-          target_lang: targetLang,
-          tone: tone,
-          think: think,
-          model: model
-        }),
+        body: JSON.stringify(payload),
         signal: this.state.translationAbortController.signal
       });
 
-      const data = await response.json();
+      const contentType = response.headers.get('Content-Type') || '';
+      let data;
+      if (response.body && contentType.includes('application/x-ndjson')) {
+        data = await this.readTranslationStream(response);
+      } else {
+        data = await response.json();
+      }
 
       if (data.error) {
         if (data.error === 'EMPTY') {
           this.clearResult();
+        } else if (data.error === 'BUSY') {
+          // Server queue is full: keep the spinner and retry when it suggests
+          if (this.elements.statusText) {
+            this.elements.statusText.textContent = 'Server busy, retrying...';
+          }
+          this.state.translationTimeout = setTimeout(() => {
+            this.performTranslation();
+          }, (data.retry_after || 1) * 1000);
         } else {
           this.showError(data.error);
         }
@@ -855,6 +954,45 @@ class TranslationManager {
     }
   }
 
+  async readTranslationStream(response) {
+    // Render tokens as they arrive; resolve with the final "done" (or "error") event
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let partial = '';
+    let result = { error: 'Translation failed' };
+
+    const handleLine = (line) => {
+      if (!line.trim()) return;
+      const event = JSON.parse(line);
+      if (event.type === 'delta') {
+        partial += event.text;
+        this.showPartialResult(partial);
+      } else if (event.type === 'done' || event.type === 'error') {
+        result = event;
+      }
+    };
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+
+    return result;
+  }
+
+  showPartialResult(text) {
+    if (this.elements.result) {
+      this.elements.result.style.color = '';
+      this.elements.result.textContent = text;
+    }
+  }
+
   showResult(translation) {
     if (this.elements.result) {
       this.elements.result.classList.remove('translating');
@@ -0,0 +1,32 @@
+"""
+Gunicorn configuration for production deployment.
+
+Translation requests spend almost all their time waiting on Ollama, so the
+default worker class is ``gthread``: every worker process serves many requests
+concurrently on threads, and a slow LLM call occupies one thread instead of a
+whole worker. Set ``GUNICORN_WORKER_CLASS=gevent`` (requires gevent) for
+cooperative I/O, or ``sync`` to fall back to one request per process.
+"""
+import os
+
+bind = f"{os.environ.get('APP_HOST', '0.0.0.0')}:{os.environ.get('APP_PORT', '8080')}"
+
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+# gthread: concurrent requests per worker process
+threads = int(os.environ.get("GUNICORN_THREADS", "32"))
+
+# gevent/eventlet: concurrent greenlets per worker process
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+# Sync workers are killed when a request outlives the timeout, so it must
+# exceed the Ollama read timeout (threaded workers heartbeat independently)
+timeout = int(os.environ.get(
+    "GUNICORN_TIMEOUT", str(int(float(os.environ.get("OLLAMA_READ_TIMEOUT", "120"))) + 30)
+))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
@@ -80,4 +80,135 @@ def test_api_alternatives_empty(client):
     assert response.status_code == 200
     
     data = json.loads(response.data)
-    assert data['alternatives'] == []
\ No newline at end of file
+    assert data['alternatives'] == []
+
+
+def test_api_translate_stream(client, monkeypatch):
+    """Test that the streaming endpoint emits NDJSON events."""
+    from app.routes import api
+
+    def fake_stream(*args, **kwargs):
+        yield {"type": "start", "source_lang": "en", "target_lang": "de"}
+        yield {"type": "delta", "text": "Hallo"}
+        yield {"type": "done", "translated_text": "Hallo", "truncated": False}
+
+    monkeypatch.setattr(api.translation_service, 'translate_stream', fake_stream)
+    response = client.post('/api/translate/stream', json={'source_text': 'Hello'})
+    assert response.mimetype == 'application/x-ndjson'
+
+    events = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [e['type'] for e in events] == ['start', 'delta', 'done']
+    assert events[-1]['translated_text'] == 'Hallo'
+
+
+def test_api_stats(client):
+    """Test runtime statistics endpoint."""
+    response = client.get('/api/stats')
+    assert response.status_code == 200
+
+    data = json.loads(response.data)
+    assert data['translation_cache']['hits'] == 0
+
+
+def test_api_translate_batch_deduplicates(client, monkeypatch):
+    """Test batch translation keeps order and translates duplicates once."""
+    from app.routes import api
+    calls = []
+
+    def fake_translate(source_text, source_lang, target_lang, tone, **kwargs):
+        calls.append((source_text, target_lang))
+        return f"{target_lang}:{source_text}", "en"
+
+    monkeypatch.setattr(api.translation_service, 'translate', fake_translate)
+    response = client.post('/api/translate/batch', json={
+        'target_lang': 'de',
+        'items': ['one', {'source_text': 'two', 'target_lang': 'pl'}, 'one']
+    })
+    assert response.status_code == 200
+
+    results = json.loads(response.data)['results']
+    assert [r['translated_text'] for r in results] == ['de:one', 'pl:two', 'de:one']
+    assert [r['index'] for r in results] == [0, 1, 2]
+    assert len(calls) == 2
+
+
+def test_api_translate_batch_validates_items(client, monkeypatch):
+    """Test batch translation reports malformed items and parses think flags."""
+    from app.routes import api
+    calls = []
+
+    def fake_translate(source_text, source_lang, target_lang, tone, **kwargs):
+        calls.append(kwargs["think"])
+        return source_text, "en"
+
+    monkeypatch.setattr(api.translation_service, 'translate', fake_translate)
+    response = client.post('/api/translate/batch', json={
+        'think': 'false',
+        'items': [{'source_text': 5}, 'ok', {'source_text': 'yes', 'think': 'true'}]
+    })
+    assert response.status_code == 200
+
+    results = json.loads(response.data)['results']
+    assert results[0]['error'] == 'Invalid source_text: expected a string'
+    assert [r['translated_text'] for r in results[1:]] == ['ok', 'yes']
+    assert sorted(calls) == [False, True]
+
+    response = client.post('/api/translate/batch', json={'target_lang': 5, 'items': ['ok']})
+    assert response.status_code == 400
+
+
+def test_api_translate_batch_empty(client):
+    """Test batch translation rejects an empty item list."""
+    response = client.post('/api/translate/batch', json={'items': []})
+    assert response.status_code == 400
+
+
+def test_api_translate_busy_returns_429(client, monkeypatch):
+    """Test that admission rejections surface as 429 with Retry-After."""
+    from app.routes import api
+    from app.services.admission import OllamaBusyError
+
+    def busy(*args, **kwargs):
+        raise OllamaBusyError("busy", retry_after=7)
+
+    monkeypatch.setattr(api.translation_service, 'translate', busy)
+    response = client.post('/api/translate', json={'source_text': 'Hello'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '7'
+    assert json.loads(response.data)['error'] == 'BUSY'
+
+
+def test_api_models_warmup_requires_model(client):
+    """Test that warming up needs a model name."""
+    response = client.post('/api/models/warmup', json={})
+    assert response.status_code == 400
+
+
+def test_api_models_etag(client, monkeypatch):
+    """Test that an unchanged model list answers 304."""
+    catalog = client.application.extensions["llot_model_catalog"]
+    monkeypatch.setattr(catalog, "models", lambda: [{"name": "m:latest"}])
+    first = client.get('/api/models')
+    assert first.status_code == 200
+    assert first.get_json()["models"] == ["m:latest"]
+
+    second = client.get('/api/models', headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+
+
+def test_api_health_uses_live_backend_probe(client, monkeypatch):
+    """Test that health reflects the backend probe, not the cached model list."""
+    import requests
+    pool = client.application.extensions["llot_backend_pool"]
+    catalog = client.application.extensions["llot_model_catalog"]
+    monkeypatch.setattr(catalog, "names", lambda: ["m:latest"])
+
+    class DownSession:
+        def get(self, url, **kwargs):
+            raise requests.ConnectionError("refused")
+
+    monkeypatch.setattr(pool, "session", lambda host: DownSession())
+    data = client.get('/api/health').get_json()
+    assert data['ollama']['status'] == 'error'
+    assert data['ollama']['error'] == 'refused'
+    assert data['overall'] == 'error'
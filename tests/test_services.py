@@ -0,0 +1,1230 @@
+import json
+import threading
+import time
+import pytest
+import requests
+from app import create_app
+from app.config import Config
+from app.services import ollama_client, translation_cache, translator
+from app.services.admission import AdmissionController, OllamaBusyError, SharedSlots
+from app.services.json_output import ALTERNATIVES_SCHEMA, parse_json_output
+from app.services.ollama_client import OllamaClient, SessionRegistry, get_ollama_client
+from app.services.output_budget import OutputBudget, RunawayGuard
+from app.services.language_detector import LanguageDetector
+from app.services.model_router import ModelRouter
+from app.services.refine_local import is_mechanical_swap, local_refine
+from app.services.runtime_options import RuntimeOptions, load_model_profiles
+from app.services.segmenter import chunk_segments, estimate_tokens, join_segments, split_segments
+from app.services.singleflight import SingleFlight
+from app.services.thinking import ThinkingBudget, ThinkingControl, parse_thinking_budgets
+from app.services.translation_cache import TranslationCache
+
+
+class TestConfig(Config):
+    TESTING = True
+    OLLAMA_HOST = "http://localhost:11434"
+    DEFAULT_MODEL = "test-model"
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    return app
+
+
+def test_session_registry_reuses_session_per_host():
+    """Test that sessions are pooled per host."""
+    registry = SessionRegistry()
+    first = registry.get_session("http://a:11434")
+    assert registry.get_session("http://a:11434") is first
+    assert registry.get_session("http://b:11434") is not first
+
+
+def test_session_registry_recreates_pool_after_fork(monkeypatch):
+    """Test that a forked process does not reuse the parent's pool."""
+    registry = SessionRegistry()
+    first = registry.get_session("http://a:11434")
+    monkeypatch.setattr(ollama_client.os, "getpid", lambda: -1)
+    assert registry.get_session("http://a:11434") is not first
+
+
+def test_get_ollama_client_shares_session(app):
+    """Test that clients built per request share the host session."""
+    with app.app_context():
+        first = get_ollama_client()
+        second = get_ollama_client(model="other")
+    assert first.session is second.session
+    assert second.model == "other"
+    assert first.timeout == TestConfig.OLLAMA_READ_TIMEOUT
+
+
+class FakeResponse:
+    def __init__(self, lines, status_code=200):
+        self._lines = lines
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = ""
+        self.closed = False
+
+    def iter_lines(self):
+        for line in self._lines:
+            yield json.dumps(line).encode()
+
+    def json(self):
+        return self._lines
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.payloads = []
+
+    def post(self, url, json=None, **kwargs):
+        self.payloads.append(json)
+        return self.response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def test_chat_completion_stream_yields_fragments():
+    """Test that streamed chat fragments are yielded in order."""
+    response = FakeResponse([
+        {"message": {"content": "Hallo"}, "done": False},
+        {"message": {"content": " Welt"}, "done": False},
+        {"message": {"content": ""}, "done": True},
+    ])
+    client = OllamaClient("http://a:11434", "m", session=FakeSession(response))
+    assert list(client.chat_completion_stream("hi")) == ["Hallo", " Welt"]
+    assert client.last_stream_status == "done"
+    assert response.closed
+
+
+def test_translation_cache_lru_eviction():
+    """Test that the memory tier evicts least recently used entries."""
+    cache = TranslationCache(max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_translation_cache_key_normalizes_text():
+    """Test that trailing whitespace and line endings map to the same key, indentation does not."""
+    first = TranslationCache.make_key("translate", source_text="Hello world \r\n  indented\t\n", model="m")
+    second = TranslationCache.make_key("translate", source_text="Hello world\n  indented", model="m")
+    unindented = TranslationCache.make_key("translate", source_text="Hello world\nindented", model="m")
+    other = TranslationCache.make_key("translate", source_text="Hello world\n  indented", model="n")
+    assert first == second
+    assert first != unindented
+    assert first != other
+
+
+def test_translation_cache_shared_tier(tmp_path):
+    """Test that workers share results through the SQLite tier."""
+    db_path = str(tmp_path / "cache.db")
+    writer = TranslationCache(max_entries=10, db_path=db_path)
+    reader = TranslationCache(max_entries=10, db_path=db_path)
+    writer.set("k", {"translated_text": "Hallo"}, model="m")
+    assert reader.get("k") == {"translated_text": "Hallo"}
+    assert reader.stats()["disk_hits"] == 1
+
+    writer.invalidate_model("m")
+    assert TranslationCache(db_path=db_path).get("k") is None
+
+
+def test_translation_cache_ttl(monkeypatch):
+    """Test that expired entries are not served."""
+    cache = TranslationCache(max_entries=10, ttl=10)
+    cache.set("k", {"v": 1})
+    now = time.time()
+    monkeypatch.setattr(translation_cache.time, "time", lambda: now + 11)
+    assert cache.get("k") is None
+
+
+class FakeClient:
+    """Ollama client stand-in that echoes the last line of the prompt."""
+
+    last_stream_status = None
+
+    def __init__(self):
+        self.prompts = []
+
+    def chat_completion(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return "T(" + prompt.rsplit("\n", 1)[-1] + ")"
+
+
+class StreamingFakeClient(FakeClient):
+    """FakeClient that streams its answer word by word and records closed streams."""
+
+    host = "http://a"
+    thinking_tokens = answer_tokens = 0
+
+    def __init__(self):
+        super().__init__()
+        self.closed = []
+
+    def chat_completion_stream(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        try:
+            for word in ("T(", prompt.rsplit("\n", 1)[-1], ")"):
+                yield word
+            self.last_stream_status = "done"
+        finally:
+            self.closed.append(prompt.rsplit("\n", 1)[-1])
+
+
+def test_split_segments_roundtrip():
+    """Test that segmentation keeps the original formatting."""
+    text = "Hello there. How are you?\n\nFine!  Thanks\n第一句。第二句"
+    segments = split_segments(text)
+    assert [s.text for s in segments] == [
+        "Hello there.", "How are you?", "Fine!", "Thanks", "第一句。", "第二句"
+    ]
+    assert join_segments(segments, [s.text for s in segments]) == text
+
+
+def test_translate_incremental_only_sends_changed_segments(app, monkeypatch):
+    """Test that unchanged segments are served from the segment cache."""
+    fake = FakeClient()
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: fake)
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        result, _, stats = service.translate_incremental(
+            "One. Two.\nThree.", "en", "de"
+        )
+        assert result == "T(One.) T(Two.)\nT(Three.)"
+        assert stats == {"total": 3, "translated": 3}
+
+        result, _, stats = service.translate_incremental(
+            "One. Two.\nThree changed.", "en", "de"
+        )
+    assert result == "T(One.) T(Two.)\nT(Three changed.)"
+    assert stats["translated"] == 1
+    assert len(fake.prompts) == 4
+
+
+def test_incremental_and_document_translations_record_conversation(app, monkeypatch):
+    """Test that assembled translations can be continued without skewing cache stats."""
+    fake = FakeClient()
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: fake)
+    service = translator.TranslationService()
+    cache = app.extensions["llot_translation_cache"]
+
+    with app.test_request_context():
+        result, _, _ = service.translate_incremental("One. Two.", "en", "de")
+        list(service.translate_document("Three. Four.", "en", "de"))
+        before = cache.stats()
+        incremental = service._find_conversation("One. Two.", "de", "neutral", "test-model")
+        document = service._find_conversation("Three. Four.", "de", "neutral", "test-model")
+        assert service._find_conversation("Five.", "de", "neutral", "test-model") is None
+
+    assert incremental["messages"][-1] == {"role": "assistant", "content": result}
+    assert document["messages"][-1]["content"] == "T(Three. Four.)"
+    after = cache.stats()
+    assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+
+
+def test_chunk_segments_respects_budget():
+    """Test that chunks stay within budget and keep formatting."""
+    text = "One two three. Four five six.\n\nSeven eight. สวัสดีครับ วันนี้อากาศดี"
+    segments = split_segments(text)
+    chunks = chunk_segments(segments, max_tokens=8)
+    assert len(chunks) > 1
+    # Only a single oversized segment may exceed the budget
+    assert all(estimate_tokens(c.text) <= 8 or len(split_segments(c.text)) == 1 for c in chunks)
+    assert join_segments(chunks, [c.text for c in chunks]) == text
+
+
+def test_translate_document_reassembles_in_order(app, monkeypatch):
+    """Test that parallel chunk translations are stitched in order."""
+    fake = FakeClient()
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: fake)
+    app.config["DOCUMENT_CHUNK_TOKENS"] = 4
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        events = list(service.translate_document("Aaaa bbbb. Cccc dddd.\n\nEeee ffff.", "en", "de"))
+
+    assert events[0] == {"type": "start", "chunks": 3, "source_lang": "en", "target_lang": "de"}
+    assert [e["done"] for e in events if e["type"] == "progress"] == [1, 2, 3]
+    assert events[-1]["translated_text"] == "T(Aaaa bbbb.) T(Cccc dddd.)\n\nT(Eeee ffff.)"
+
+
+def test_single_flight_shares_result_between_concurrent_callers():
+    """Test that concurrent identical calls run once."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    follower.start()
+    while flight.stats()["coalesced"] == 0:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == ["result", "result"]
+    assert len(calls) == 1
+
+
+def test_single_flight_propagates_errors():
+    """Test that the leader's error is raised."""
+    flight = SingleFlight()
+
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", failing)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_admission_rejects_when_queue_full():
+    """Test fast rejection once the queue is full."""
+    admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1)
+    admission.acquire("b", "translate")
+    with pytest.raises(OllamaBusyError) as excinfo:
+        admission.acquire("b", "translate")
+    assert excinfo.value.retry_after >= 1
+    assert admission.stats()["classes"]["translate"]["rejected"] == 1
+
+
+def test_admission_serves_higher_priority_first():
+    """Test that queued alternatives overtake queued batch work."""
+    admission = AdmissionController(max_in_flight=1, max_queue=10, queue_timeout=5)
+    admission.acquire("b", "translate")
+    order = []
+
+    def worker(request_class):
+        admission.acquire("b", request_class)
+        order.append(request_class)
+        admission.release("b")
+
+    threads = [threading.Thread(target=worker, args=("batch",))]
+    threads[0].start()
+    while admission.stats()["backends"]["b"]["queued"] < 1:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=worker, args=("alternatives",)))
+    threads[1].start()
+    while admission.stats()["backends"]["b"]["queued"] < 2:
+        time.sleep(0.001)
+
+    admission.release("b")
+    for thread in threads:
+        thread.join(5)
+    assert order == ["alternatives", "batch"]
+
+
+def test_shared_slots_limit_all_processes(tmp_path):
+    """Test that controllers sharing lock files share the in-flight limit and priorities."""
+    # Separate SharedSlots instances open their own descriptors, like worker processes
+    first = AdmissionController(max_in_flight=1, queue_timeout=0.2, shared=SharedSlots(str(tmp_path), 1))
+    second = AdmissionController(max_in_flight=1, queue_timeout=0.2, shared=SharedSlots(str(tmp_path), 1))
+
+    first.acquire("b", "translate")
+    with pytest.raises(OllamaBusyError):
+        second.acquire("b", "translate")
+    first.release("b")
+    second.acquire("b", "translate")
+    second.release("b")
+
+    waiting = SharedSlots(str(tmp_path), 1)
+    waiting.set_waiting("b", 0, True)
+    assert second.shared.outranked("b", 3)
+    assert not second.shared.outranked("b", 0)
+    waiting.set_waiting("b", 0, False)
+    assert not second.shared.outranked("b", 3)
+
+
+def test_translate_incremental_stream_stops_on_close(app, monkeypatch):
+    """Test that incremental streaming reuses cached segments and stops when closed."""
+    fake = StreamingFakeClient()
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: fake)
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        events = list(service.translate_incremental_stream("One. Two.", "en", "de"))
+        assert "".join(e["text"] for e in events if e["type"] == "delta") == "T(One.) T(Two.)"
+        assert events[-1]["translated_text"] == "T(One.) T(Two.)"
+        assert events[-1]["segments"] == {"total": 2, "translated": 2}
+
+        # The client goes away while the changed second segment is generated
+        stream = service.translate_incremental_stream("One. Three.", "en", "de")
+        deltas = [next(stream) for _ in range(4)]
+        stream.close()
+    assert [e.get("text") for e in deltas] == [None, "T(One.)", " ", "T("]
+    assert fake.closed[-1] == "Three."
+    assert len(fake.prompts) == 3
+
+
+def test_concurrent_identical_streams_share_one_generation(app, monkeypatch):
+    """Test that a second stream for the same text follows the first one's generation."""
+    release = threading.Event()
+
+    class SlowClient(StreamingFakeClient):
+        def chat_completion_stream(self, prompt, **kwargs):
+            release.wait(5)
+            yield from super().chat_completion_stream(prompt, **kwargs)
+
+    fake = SlowClient()
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: fake)
+    service = translator.TranslationService()
+    results = []
+
+    def consume():
+        with app.test_request_context():
+            results.append(list(service.translate_stream("Hello", "en", "de")))
+
+    threads = [threading.Thread(target=consume) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while service.inflight.stats()["coalesced"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(fake.prompts) == 1
+    assert len(results) == 2 and results[0] == results[1]
+    assert results[0][-1]["translated_text"] == "T(Hello)"
+
+
+def test_chat_completion_stream_cancel_closes_upstream():
+    """Test that a cancel event stops reading and closes the connection."""
+    response = FakeResponse([
+        {"message": {"content": "Hallo"}, "done": False},
+        {"message": {"content": " Welt"}, "done": False},
+        {"message": {"content": "!"}, "done": True},
+    ])
+    client = OllamaClient("http://a:11434", "m", session=FakeSession(response))
+    cancel = threading.Event()
+    fragments = []
+    for fragment in client.chat_completion_stream("hi", cancel_event=cancel):
+        fragments.append(fragment)
+        cancel.set()
+
+    assert fragments == ["Hallo"]
+    assert client.last_stream_status == "cancelled"
+    assert response.closed
+
+
+def test_chat_completion_stream_close_closes_upstream():
+    """Test that closing the generator (client disconnect) closes the connection."""
+    response = FakeResponse([
+        {"message": {"content": "Hallo"}, "done": False},
+        {"message": {"content": " Welt"}, "done": True},
+    ])
+    client = OllamaClient("http://a:11434", "m", session=FakeSession(response))
+    stream = client.chat_completion_stream("hi")
+    assert next(stream) == "Hallo"
+    stream.close()
+    assert client.last_stream_status == "cancelled"
+    assert response.closed
+
+
+def test_chat_payload_sends_keep_alive():
+    """Test that keep_alive is sent with every chat request."""
+    session = FakeSession(FakeResponse({"message": {"content": "ok"}}))
+    client = OllamaClient("http://a:11434", "m", session=session, keep_alive="1h")
+    client.chat_completion("hi")
+    assert session.payloads[0]["keep_alive"] == "1h"
+
+
+def test_chat_payload_sends_json_schema():
+    session = FakeSession(FakeResponse({"message": {"content": "{}"}}))
+    client = OllamaClient("http://a:11434", "m", session=session)
+    client.chat_completion("hi", response_format=ALTERNATIVES_SCHEMA)
+    assert session.payloads[0]["format"] == ALTERNATIVES_SCHEMA
+
+
+def test_model_residency_reports_states(app, monkeypatch):
+    """Test that resident, loading and cold models are told apart."""
+    from app.services import model_residency
+
+    class ResidencyClient:
+        host = "http://localhost:11434"
+
+        def get_running_models(self):
+            return [{"name": "resident:latest", "expires_at": "later"}]
+
+        def preload(self):
+            release.wait(5)
+            return True
+
+    release = threading.Event()
+    monkeypatch.setattr(model_residency, "get_backend_clients", lambda model=None: [ResidencyClient()])
+    residency = model_residency.ModelResidency(app, status_ttl=60)
+
+    residency.status()
+    assert residency.warm_up(["resident", "other"]) == ["other:latest"]
+    assert residency.state_of("resident") == "loaded"
+    assert residency.state_of("other") == "loading"
+    assert residency.state_of("unknown") == "cold"
+    release.set()
+
+
+class CatalogClient:
+    def __init__(self, tags, host="http://localhost:11434"):
+        self.tags = tags
+        self.host = host
+        self.shown = []
+
+    def list_models(self):
+        return self.tags
+
+    def show_model(self, name):
+        self.shown.append(name)
+        return {"model_info": {"general.architecture": "llama", "llama.context_length": 8192}}
+
+
+def test_model_catalog_reads_metadata_once_per_digest(app, monkeypatch):
+    """Test that /api/show is only called for new digests."""
+    from app.services import model_catalog
+
+    fake = CatalogClient([{"name": "m:latest", "digest": "a", "size": 10,
+                           "details": {"parameter_size": "3B", "quantization_level": "Q4_K_M"}}])
+    monkeypatch.setattr(model_catalog, "get_backend_clients", lambda model=None: [fake])
+    catalog = model_catalog.ModelCatalog(app)
+
+    model = catalog.get("m:latest")
+    assert model["context_length"] == 8192
+    assert model["parameter_size"] == "3B"
+    catalog.refresh()
+    assert fake.shown == ["m:latest"]
+    assert not catalog.has("missing")
+
+
+def test_model_catalog_digest_change_invalidates_cache(app, monkeypatch):
+    """Test that a re-pulled model drops its cached translations."""
+    from app.services import model_catalog
+
+    fake = CatalogClient([{"name": "m:latest", "digest": "a"}])
+    monkeypatch.setattr(model_catalog, "get_backend_clients", lambda model=None: [fake])
+    catalog = model_catalog.ModelCatalog(app)
+    cache = app.extensions["llot_translation_cache"]
+    cache.set("k", {"translated_text": "x"}, model="m:latest")
+
+    catalog.refresh()
+    assert cache.get("k") is not None
+    fake.tags = [{"name": "m:latest", "digest": "b"}]
+    catalog.refresh()
+    assert cache.get("k") is None
+
+
+def test_model_catalog_merges_backends(app, monkeypatch):
+    """Test that the catalog lists models from every backend that answers."""
+    from app.services import model_catalog
+
+    class DownClient(CatalogClient):
+        def list_models(self):
+            raise requests.ConnectionError("refused")
+
+    clients = [CatalogClient([{"name": "a:latest"}, {"name": "b:latest"}], "http://a"),
+               CatalogClient([{"name": "b:latest"}, {"name": "c:latest"}], "http://b"),
+               DownClient([], "http://c")]
+    monkeypatch.setattr(model_catalog, "get_backend_clients", lambda model=None: clients)
+    catalog = model_catalog.ModelCatalog(app)
+
+    assert catalog.refresh()
+    assert catalog.names() == ["a:latest", "b:latest", "c:latest"]
+    assert catalog.get("b:latest")["backends"] == ["http://a", "http://b"]
+    assert clients[1].shown == ["c:latest"]
+
+
+def test_backend_pool_routes_by_model_and_outstanding():
+    """Test least-outstanding routing that prefers backends with the model loaded."""
+    from app.services.backend_pool import BackendPool
+
+    pool = BackendPool(["http://a", "http://b", "http://c"])
+    a, b, c = pool.backends
+    a.resident, b.resident, c.resident = {"m:latest"}, {"m:latest"}, set()
+    c.installed = {"other:latest"}
+
+    first = pool.acquire("m")
+    second = pool.acquire("m")
+    assert {first.host, second.host} == {"http://a", "http://b"}
+    # Loaded model beats an idle backend that would have to load it
+    assert pool.acquire("m").host in ("http://a", "http://b")
+    # Without the model loaded anywhere, the idle backend wins
+    assert pool.select("other").host == "http://c"
+    c.installed = set()
+    assert pool.select("other").host in ("http://a", "http://b")
+
+
+def test_backend_pool_ejects_failing_backend():
+    """Test that consecutive failures eject a backend with backoff."""
+    from app.services.backend_pool import BackendPool
+
+    pool = BackendPool(["http://a", "http://b"], max_failures=2, eject_base=60)
+    a = pool.backends[0]
+    for _ in range(2):
+        pool.release(pool.acquire(exclude=["http://b"]), ok=False)
+    assert a.ejected
+    assert all(pool.select().host == "http://b" for _ in range(4))
+    assert not pool.stats()["http://a"]["healthy"]
+
+
+def test_backend_pool_readmits_ejected_backend_after_probe(monkeypatch):
+    """Test that an ejected backend stays out until a probe after its backoff succeeds."""
+    from app.services.backend_pool import BackendPool
+
+    class ProbeSession:
+        up = False
+
+        def get(self, url, **kwargs):
+            if not self.up:
+                raise requests.ConnectionError("refused")
+            return FakeResponse({"models": [{"name": "m:latest"}]})
+
+    session = ProbeSession()
+    pool = BackendPool(["http://a", "http://b"], max_failures=1, eject_base=0.05)
+    monkeypatch.setattr(pool, "session", lambda host: session if host == "http://a" else
+                        FakeSession(FakeResponse({"models": []})))
+    a = pool.backends[0]
+    pool.release(pool.acquire(exclude=["http://b"]), ok=False)
+    assert a.ejected
+
+    # The backoff passing is not enough, and a failed probe doubles it
+    time.sleep(0.06)
+    assert a.ejected and pool.select().host == "http://b"
+    pool.probe()
+    assert a.ejected and a.ejections == 2
+    pool.probe()
+    assert a.ejections == 2
+
+    session.up = True
+    time.sleep(0.11)
+    pool.probe()
+    assert not a.ejected
+    assert a.resident == {"m:latest"}
+    assert pool.stats()["http://a"]["healthy"]
+
+
+def test_chat_completion_fails_over_to_next_backend(monkeypatch):
+    """Test that a connection error is retried on another backend."""
+    import requests
+    from app.services.backend_pool import BackendPool
+
+    class DownSession:
+        def post(self, url, **kwargs):
+            raise requests.ConnectionError("refused")
+
+    up = FakeSession(FakeResponse({"message": {"content": "ok"}, "eval_count": 10, "eval_duration": 10**9}))
+    pool = BackendPool(["http://down", "http://up"])
+    monkeypatch.setattr(pool, "session", lambda host: DownSession() if host == "http://down" else up)
+    pool.backends[0].resident = {"m:latest"}
+
+    client = OllamaClient("http://down", "m", session=DownSession(), pool=pool)
+    assert client.chat_completion("hi") == "ok"
+    stats = pool.stats()
+    assert stats["http://down"]["failures"] == 1
+    assert stats["http://up"]["tokens_per_second"] == 10.0
+    assert all(s["outstanding"] == 0 for s in stats.values())
+
+
+def test_hedged_completion_takes_fast_backend_and_cancels_slow(monkeypatch):
+    """Test that a slow request is hedged on another backend and the loser aborted."""
+    import requests
+    from app.services.backend_pool import BackendPool
+    from app.services.hedging import HedgingPolicy
+
+    class StuckResponse(FakeResponse):
+        def __init__(self):
+            super().__init__([])
+            self.aborted = threading.Event()
+
+        def iter_lines(self):
+            if not self.aborted.wait(5):
+                raise AssertionError("slow request was not aborted")
+            raise requests.ConnectionError("connection closed")
+
+        def close(self):
+            super().close()
+            self.aborted.set()
+
+    stuck = StuckResponse()
+    sessions = {
+        "http://slow": FakeSession(stuck),
+        "http://fast": FakeSession(FakeResponse([{"message": {"content": "ok"}, "done": True}])),
+    }
+    pool = BackendPool(["http://slow", "http://fast"])
+    monkeypatch.setattr(pool, "session", lambda host: sessions[host])
+    pool.backends[0].resident = {"m:latest"}
+    policy = HedgingPolicy(delay=0.05, max_rate=0.0)
+
+    client = OllamaClient("http://slow", "m", pool=pool, hedging=policy,
+                          session=sessions["http://slow"])
+    assert client.chat_completion("hi") == "ok"
+    assert client.host == "http://fast"
+    assert client.answer_tokens == 1
+    assert stuck.aborted.wait(1)
+    stats = policy.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    # The budget only allowed one hedge
+    assert not policy.try_hedge()
+
+
+def test_failed_hedged_completion_fails_over(monkeypatch):
+    """Test that a hedged request whose attempts all failed is retried on another backend."""
+    import requests
+    from app.services.backend_pool import BackendPool
+    from app.services.hedging import HedgingPolicy
+
+    class DownSession:
+        def post(self, url, **kwargs):
+            raise requests.ConnectionError("refused")
+
+    up = FakeSession(FakeResponse({"message": {"content": "ok"}}))
+    pool = BackendPool(["http://down", "http://up"])
+    monkeypatch.setattr(pool, "session", lambda host: DownSession() if host == "http://down" else up)
+    pool.backends[0].resident = {"m:latest"}
+
+    client = OllamaClient("http://down", "m", pool=pool, hedging=HedgingPolicy(delay=5.0))
+    assert client.chat_completion("hi") == "ok"
+    assert client.host == "http://up"
+
+
+def test_chat_payload_puts_system_prompt_first():
+    """Test that the system prompt is sent as its own leading message."""
+    session = FakeSession(FakeResponse({"message": {"content": "ok"}}))
+    client = OllamaClient("http://a:11434", "m", session=session)
+    client.chat_completion("text", system="rules")
+    assert session.payloads[0]["messages"] == [
+        {"role": "system", "content": "rules"},
+        {"role": "user", "content": "text"},
+    ]
+
+
+def test_alternatives_prompts_share_prefix_across_clicked_words():
+    """Test that only the tail of the alternatives prompt depends on the clicked word."""
+    service = translator.TranslationService()
+    first = service._build_alternatives_prompt("Guten Tag", "Good day", "Good", "en", "neutral")
+    second = service._build_alternatives_prompt("Guten Tag", "Good day", "day", "en", "neutral")
+    prefix = first[:first.index("CLICKED_TOKEN")]
+    assert second.startswith(prefix)
+
+
+def test_alternatives_continue_translation_conversation(app, monkeypatch):
+    """Test that alternatives reuse the translation conversation and its backend."""
+    calls = []
+
+    class RecordingClient:
+        host = "http://b"
+        last_stream_status = None
+
+        def chat_completion(self, prompt, **kwargs):
+            calls.append((prompt, kwargs))
+            if kwargs.get("history"):
+                return '{"alternatives": ["Hi"]}'
+            return "Hello"
+
+    def fake_get_client(model=None, request_class="translate", backend=None):
+        calls.append(("client", {"backend": backend}))
+        return RecordingClient()
+
+    monkeypatch.setattr(translator, "get_ollama_client", fake_get_client)
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        assert service.translate("Hallo", "de", "en")[0] == "Hello"
+        calls.clear()
+        assert service.get_alternatives("Hallo", "Hello", "Hello", "en", "neutral") == ["Hi"]
+
+    assert calls[0] == ("client", {"backend": "http://b"})
+    prompt, kwargs = calls[1]
+    assert kwargs["history"][-1] == {"role": "assistant", "content": "Hello"}
+    assert prompt.endswith('CLICKED_TOKEN: "Hello"')
+    assert "Source:" not in prompt
+
+
+def test_follow_up_models(app, monkeypatch):
+    """Test that refine follows the translating model while alternatives stay on the small one."""
+    models = []
+
+    class ModelClient:
+        host = "http://a"
+        last_stream_status = None
+
+        def __init__(self, model):
+            self.model = model
+
+        def chat_completion(self, prompt, **kwargs):
+            models.append((self.model, bool(kwargs.get("history"))))
+            if kwargs.get("response_format") == ALTERNATIVES_SCHEMA:
+                return '{"alternatives": ["Hi"]}'
+            if kwargs.get("history") is not None or "Replacements" in prompt:
+                return '{"translated": "Hi", "faithful": true}'
+            return "Hello"
+
+    monkeypatch.setattr(translator, "get_ollama_client",
+                        lambda model=None, **kwargs: ModelClient(model))
+    app.extensions["llot_model_router"] = ModelRouter("small")
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        service.translate("Hallo", "de", "en", model="big")
+        # The conversation was held with another model, so it is not continued
+        assert service.get_alternatives("Hallo", "Hello", "Hello", "en", "neutral") == ["Hi"]
+        service.refine_translation("Hallo", "Hello", "en", "neutral", ["Hey"], [], mode="llm")
+        service.translate("Tschüss", "de", "en")
+        service.get_alternatives("Tschüss", "Hello", "Hello", "en", "neutral")
+
+    assert models == [("big", False), ("small", False), ("big", True), ("small", False), ("small", True)]
+
+
+def test_backend_pool_prefers_affinity_host_unless_busy():
+    """Test that follow-ups stick to their backend within the affinity slack."""
+    from app.services.backend_pool import BackendPool
+
+    pool = BackendPool(["http://a", "http://b"])
+    b = pool.backends[1]
+    assert pool.select(prefer="http://b") is b
+    b.outstanding = pool.AFFINITY_SLACK + 1
+    assert pool.select(prefer="http://b").host == "http://a"
+
+
+def test_precomputed_alternatives_are_served_from_cache(app, monkeypatch):
+    """Test that one precompute call answers later word clicks."""
+    calls = []
+
+    class AlternativesClient:
+        host = "http://a"
+
+        def chat_completion(self, prompt, **kwargs):
+            calls.append(prompt)
+            return '{"alternatives": {"Good": ["Nice", "Fine"], "day": ["afternoon"]}}'
+
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: AlternativesClient())
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        assert service.precompute_alternatives("Guten Tag", "Good day, 2024!", "en", "neutral") == 2
+        assert 'TOKENS: ["Good", "day"]' in calls[0]
+        assert service.get_alternatives("Guten Tag", "Good day, 2024!", "day", "en", "neutral") == ["afternoon"]
+        # Nothing left to compute
+        assert service.precompute_alternatives("Guten Tag", "Good day, 2024!", "en", "neutral") == 0
+    assert len(calls) == 1
+
+
+def test_local_refine_applies_mechanical_replacements():
+    """Test that word swaps needing no agreement changes stay local."""
+    text, needs_model = local_refine("I ate a pear.", "en", [], [{"from": "pear", "to": "apple"}])
+    assert text == "I ate an apple." and not needs_model
+
+    # Already swapped by the UI; the enforced phrase is present
+    text, needs_model = local_refine("Ein hübsches Haus.", "de", ["Haus"],
+                                     [{"from": "schönes", "to": "hübsches"}])
+    assert text == "Ein hübsches Haus." and not needs_model
+
+    _, needs_model = local_refine("Der Hund schläft.", "de", [], [{"from": "Hund", "to": "Katze"}])
+    assert needs_model
+    _, needs_model = local_refine("Der Hund schläft.", "de", ["müde"], [])
+    assert needs_model
+
+
+def test_local_refine_english_articles():
+    """Test that a/an follows the sound of the replaced word and only changes in front of it."""
+    text, needs_model = local_refine("I waited a minute. A minute is long.", "en", [],
+                                     [{"from": "minute", "to": "hour"}])
+    assert text == "I waited an hour. A minute is long." and not needs_model
+
+    text, _ = local_refine("She went to a college.", "en", [], [{"from": "college", "to": "university"}])
+    assert text == "She went to a university."
+    text, _ = local_refine("It is an idea.", "en", [], [{"from": "idea", "to": "one-off"}])
+    assert text == "It is a one-off."
+
+    # Acronyms may be read letter by letter or as a word
+    text, needs_model = local_refine("He is a spy.", "en", [], [{"from": "spy", "to": "FBI agent"}])
+    assert text == "He is a FBI agent." and needs_model
+
+
+def test_is_mechanical_swap():
+    assert is_mechanical_swap("big", "large", "en")
+    assert is_mechanical_swap("schönen", "hübschen", "de")
+    assert not is_mechanical_swap("schönen", "hübsche", "de")
+    assert not is_mechanical_swap("Hund", "kleine Katze", "de")
+
+
+def test_refine_uses_model_only_when_needed(app, monkeypatch):
+    """Test that refine reports the path taken and skips the model for local edits."""
+    calls = []
+
+    class RefineClient:
+        host = "http://a"
+
+        def chat_completion(self, prompt, **kwargs):
+            calls.append(prompt)
+            return '{"translated": "Die Katze schläft.", "faithful": true}'
+
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: RefineClient())
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        assert service.refine_translation("A nice house.", "Ein schönes Haus.", "de", "neutral",
+                                          [], [{"from": "schönes", "to": "hübsches"}]) == \
+            ("Ein hübsches Haus.", True, "local")
+        assert calls == []
+
+        assert service.refine_translation("The cat sleeps.", "Der Hund schläft.", "de", "neutral",
+                                          [], [{"from": "Hund", "to": "Katze"}]) == \
+            ("Die Katze schläft.", True, "llm")
+        # The model starts from the locally edited draft
+        assert "Der Katze schläft." in calls[0]
+
+        assert service.refine_translation("A nice house.", "Ein schönes Haus.", "de", "neutral",
+                                          [], [{"from": "schönes", "to": "hübsches"}], mode="llm")[2] == "llm"
+    assert len(calls) == 2
+
+
+def test_refine_sends_only_edited_sentences(app, monkeypatch):
+    """Test that refining a long text only regenerates the edited sentence."""
+    calls = []
+
+    class RefineClient:
+        host = "http://a"
+
+        def chat_completion(self, prompt, **kwargs):
+            calls.append(prompt)
+            return '{"translated": "Die Katze schläft.", "faithful": true}'
+
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: RefineClient())
+    service = translator.TranslationService()
+    source = "It rains. The dog sleeps. The sun is gone.\n\nWe stay home."
+    translation = "Es regnet. Der Hund schläft. Die Sonne ist weg.\n\nWir bleiben zu Hause."
+
+    with app.test_request_context():
+        translated, faithful, path = service.refine_translation(
+            source, translation, "de", "neutral", [], [{"from": "Hund", "to": "Katze"}]
+        )
+    assert translated == "Es regnet. Die Katze schläft. Die Sonne ist weg.\n\nWir bleiben zu Hause."
+    assert faithful and path == "llm"
+    assert "Source text:\nThe dog sleeps.\n" in calls[0]
+    assert "Preceding translation:\nEs regnet." in calls[0]
+    assert "Wir bleiben" not in calls[0]
+
+
+def test_truncated_refine_reply_is_not_faithful(app, monkeypatch):
+    """Test that a refinement cut off before its verdict is not reported as faithful."""
+    replies = ['{"translated": "Hallo, Welt", "faithful": tr', '{"translated": "Hallo, Welt"}']
+
+    class RefineClient:
+        host = "http://a"
+
+        def chat_completion(self, prompt, **kwargs):
+            return replies.pop(0)
+
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: RefineClient())
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        for _ in range(2):
+            assert service.refine_translation("Hello, world", "Hallo Welt", "de", "neutral", [], [],
+                                              mode="llm") == ("Hallo, Welt", False, "llm")
+
+
+def test_parse_json_output_salvages_truncated_replies():
+    assert parse_json_output('Sure: ```json\n{"alternatives": ["a", "b"]}\n``` {"x": 1}') == \
+        ({"alternatives": ["a", "b"]}, "ok")
+    assert parse_json_output('{"alternatives": ["a", "b", "c') == ({"alternatives": ["a", "b"]}, "salvaged")
+    assert parse_json_output('{"alternatives": {"Good": ["Nice"], "day": ["after') == \
+        ({"alternatives": {"Good": ["Nice"]}}, "salvaged")
+    assert parse_json_output('{"translated": "Hallo, Welt", "faithful": tr') == \
+        ({"translated": "Hallo, Welt"}, "salvaged")
+    # Half a translation is not returned
+    assert parse_json_output('{"translated": "Hallo, We') == (None, "failed")
+    assert parse_json_output("no json") == (None, "failed")
+
+
+def test_alternatives_parse_outcomes_are_counted(app, monkeypatch):
+    class AlternativesClient:
+        host = "http://a"
+
+        def chat_completion(self, prompt, **kwargs):
+            assert kwargs["response_format"] == ALTERNATIVES_SCHEMA
+            return '{"alternatives": ["Nice", "Fine", "Gre'
+
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: AlternativesClient())
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        assert service.get_alternatives("Guten Tag", "Good day", "Good", "en", "neutral",
+                                        model="m") == ["Nice", "Fine"]
+        assert app.extensions["llot_json_output"].stats() == {"m": {"ok": 0, "salvaged": 1, "failed": 0}}
+
+
+def test_runaway_guard_stops_repetition_and_overruns():
+    guard = RunawayGuard(limit=100, source_text="Hello there.")
+    assert not guard("Hallo ")
+    assert not any(guard("zusammen, ") for _ in range(3))
+    assert guard("zusammen, ")
+    assert guard.trim("Hallo zusammen, zusammen, zusammen, zusammen, zusammen, ") == "Hallo zusammen,"
+
+    guard = RunawayGuard(limit=10)
+    assert not guard("Hallo Welt, ")
+    assert guard("und hier folgt noch eine lange Erklärung.")
+
+    # Repetition that is in the source is kept
+    guard = RunawayGuard(limit=100, source_text="na na na na na na na na na na na na na na na na na na na na")
+    assert not guard("na " * 20)
+
+
+def test_runaway_guard_is_cheap_per_fragment():
+    """Test that checking each streamed fragment stays far below a millisecond."""
+    prose = " ".join(f"Sentence number {i} talks about something else entirely." for i in range(200))
+    guard = RunawayGuard(limit=10 ** 6)
+    fragments = [prose[i:i + 4] for i in range(0, len(prose), 4)]
+    started = time.perf_counter()
+    assert not any(guard(fragment) for fragment in fragments)
+    assert (time.perf_counter() - started) / len(fragments) < 0.0002
+
+
+def test_output_budget_learns_expansion_ratio():
+    budget = OutputBudget()
+    source = "This is a sentence of a reasonable length."
+    default = budget.max_tokens(source, "en", "de")
+    for _ in range(30):
+        budget.record(source, source + source, "en", "de")
+    assert budget.ratio("en", "de") > 1.9
+    assert budget.max_tokens(source, "en", "de") > default
+    assert budget.max_tokens(source, "en", "pl") == default
+    assert budget.max_tokens("Hi", "en", "de", think=True) == \
+        budget.max_tokens("Hi", "en", "de") + OutputBudget.THINKING_MAX_TOKENS
+
+
+def test_chat_completion_stops_runaway_generation():
+    """Test that a looping generation is cut off and the upstream closed."""
+    fragments = ["Guten Tag. "] + ["Danke. "] * 200
+    response = FakeResponse([{"message": {"content": f}, "done": False} for f in fragments] + [{"done": True}])
+    session = FakeSession(response)
+    client = OllamaClient("http://a:11434", "m", session=session)
+
+    guard = RunawayGuard(limit=100, source_text="Good day. Thanks.")
+    content = client.chat_completion("hi", guard=guard)
+    assert client.last_stream_status == "runaway"
+    assert response.closed
+    assert guard.trim(content) == "Guten Tag. Danke."
+
+
+def test_runtime_options_pick_num_ctx_bucket():
+    class Catalog:
+        def get(self, name):
+            return {"small:latest": {"context_length": 8192}}.get(name)
+
+    runtime = RuntimeOptions([4096, 16384, 32768], catalog=Catalog())
+    assert runtime.num_ctx("big", 100, 512) == 4096
+    assert runtime.num_ctx("big", 4000, 2048) == 16384
+    # Capped at the model's context length
+    assert runtime.num_ctx("small", 4000, 2048) == 4096
+    assert runtime.num_ctx("small", 100000, 2048) == 4096
+    assert RuntimeOptions([]).num_ctx("big", 100, 512) is None
+
+
+def test_num_ctx_is_sized_on_expected_output():
+    """Test that the num_predict backstop does not move translations into a larger bucket."""
+    budget = OutputBudget()
+    runtime = RuntimeOptions([1024, 8192])
+    source = "A sentence that is long enough to matter. " * 12
+    session = FakeSession(FakeResponse({"message": {"content": "ok"}}))
+    client = OllamaClient("http://a:11434", "m", session=session, runtime=runtime)
+
+    client.chat_completion(source, max_tokens=budget.max_tokens(source, "en", "de"),
+                           output_tokens=budget.context_tokens(source, "en", "de"))
+    client.chat_completion(source, max_tokens=budget.max_tokens(source, "en", "de"))
+    assert [p["options"]["num_ctx"] for p in session.payloads] == [1024, 8192]
+
+    # A profile can pin num_ctx for a model
+    runtime.profiles = {"m": {"num_ctx": 4096}}
+    assert runtime.options("m", 100000, 2048)["num_ctx"] == 4096
+
+
+def test_model_profiles_are_merged_into_chat_options(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"*": {"num_thread": 8}, "m": {"num_batch": 256, "temperature": 1.0}}))
+    runtime = RuntimeOptions([4096], profiles=load_model_profiles(str(path)))
+
+    session = FakeSession(FakeResponse({"message": {"content": "ok"}}))
+    client = OllamaClient("http://a:11434", "m:7b", session=session, runtime=runtime)
+    client.chat_completion("hi", max_tokens=100)
+    assert session.payloads[0]["options"] == {"num_thread": 8, "num_batch": 256, "temperature": 0.0,
+                                              "num_predict": 100, "num_ctx": 4096}
+    assert load_model_profiles(str(tmp_path / "missing.json")) == {}
+
+
+def test_thinking_budget_cuts_off_and_answers_without_thinking():
+    """Test that a request thinking past its budget is re-sent with think=False."""
+    thinking = FakeResponse([{"message": {"thinking": "hmm"}, "done": False}] * 10)
+    answer = FakeResponse([{"message": {"content": "Hallo"}, "done": False}, {"done": True}])
+
+    class Session(FakeSession):
+        def post(self, url, json=None, **kwargs):
+            self.payloads.append(json)
+            return thinking if json["think"] else answer
+
+    session = Session(None)
+    control = ThinkingControl({"translate": ThinkingBudget(tokens=5)})
+    client = OllamaClient("http://a:11434", "m", session=session, thinking=control)
+
+    assert client.chat_completion("hi", think=True) == "Hallo"
+    assert [p["think"] for p in session.payloads] == [True, False]
+    assert thinking.closed
+    assert client.thinking_cut_off
+    assert control.stats() == {"translate": {"requests": 1, "cut_off": 1,
+                                             "thinking_tokens": 6, "answer_tokens": 1}}
+
+
+def test_thinking_fallback_is_cached_as_answer_without_thinking(app, monkeypatch):
+    """Test that a translation cut off while thinking is not served to thinking requests."""
+    fake = StreamingFakeClient()
+    fake.thinking_cut_off = True
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: fake)
+    service = translator.TranslationService()
+    cache = app.extensions["llot_translation_cache"]
+
+    with app.test_request_context():
+        service.translate("Hello", "en", "de", think=True)
+        list(service.translate_stream("Good day", "en", "de", think=True))
+        for text in ("Hello", "Good day"):
+            assert cache.get(service._translation_cache_key(text, "en", "de", "neutral", "test-model", True)) is None
+            assert cache.get(service._translation_cache_key(text, "en", "de", "neutral", "test-model", False))
+
+
+def test_parse_thinking_budgets():
+    assert parse_thinking_budgets("translate=1024/30, alternatives=256,bad=x,") == {
+        "translate": ThinkingBudget(1024, 30.0), "alternatives": ThinkingBudget(256, 0.0)
+    }
+
+
+def test_translate_stream_escalates_before_first_delta(app, monkeypatch):
+    """Test that a small model failing before any output hands the stream to the large one."""
+    class FailingClient(StreamingFakeClient):
+        def chat_completion_stream(self, prompt, **kwargs):
+            raise Exception("model crashed")
+            yield
+
+    def get_client(model=None, **kwargs):
+        return FailingClient() if model == "small" else StreamingFakeClient()
+
+    monkeypatch.setattr(translator, "get_ollama_client", get_client)
+    app.extensions["llot_model_router"] = ModelRouter("small")
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        events = list(service.translate_stream("Hello", "en", "de"))
+
+    assert [e["type"] for e in events] == ["start", "delta", "delta", "delta", "done"]
+    assert events[-1]["translated_text"] == "T(Hello)"
+    stats = app.extensions["llot_model_router"].stats()
+    assert stats["small/short_input"]["failures"] == 1
+    assert stats["selected"]["failures"] == 0
+
+
+def test_model_router_rules():
+    router = ModelRouter("small", max_small_tokens=10, large_pairs=["*>ja"])
+    assert router.route("translate", "Hello", "en", "de", False, "large").model == "small"
+    assert router.route("translate", "Hello", "en", "de", True, "large").name == "large/think"
+    assert router.route("translate", "Hello", "en", "ja", False, "large").name == "large/language_pair"
+    assert router.route("translate", "A much longer text. " * 5, "en", "de", False, "large").name == \
+        "large/long_input"
+    assert router.route("alternatives", "A much longer text. " * 5, "auto", "de", False, "large").model == "small"
+    assert ModelRouter("").route("translate", "Hello", "en", "de", False, "large").name == "default"
+
+
+def test_translate_escalates_from_small_model(app, monkeypatch):
+    """Test that auto requests use the small model and fall back to the large one."""
+    app.extensions["llot_model_router"] = ModelRouter("small")
+    used = []
+
+    class Client(FakeClient):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+            self.host = "http://a"
+
+        def chat_completion(self, prompt, **kwargs):
+            used.append(self.model)
+            if self.model == "small":
+                raise Exception("model failed")
+            return "Hallo"
+
+    monkeypatch.setattr(translator, "get_ollama_client", lambda model=None, **kwargs: Client(model))
+    service = translator.TranslationService()
+
+    with app.test_request_context():
+        assert service.translate("Hello", "en", "de", model="auto") == ("Hallo", None)
+        stats = app.extensions["llot_model_router"].stats()
+    assert used == ["small", app.config["DEFAULT_MODEL"]]
+    assert stats["small/short_input"]["failures"] == 1
+    assert stats["selected"] == {"model": app.config["DEFAULT_MODEL"], "requests": 1, "failures": 0,
+                                 "avg_latency_ms": stats["selected"]["avg_latency_ms"]}
+
+
+def test_language_detector_uses_script_and_allowed_languages():
+    """Test script shortcuts, candidate restriction and the bounded prefix."""
+    detector = LanguageDetector(["en", "de", "ru", "bg", "ja", "zh", "ko"], max_chars=60)
+
+    assert detector.detect_language("이것은 한국어 문장입니다.") == "ko"
+    assert detector.detect_language("これは日本語の文章です。") == "ja"
+    assert detector.detect_language("这是一个中文句子。") == "zh"
+    assert detector.detect_language("Это русское предложение, которое нужно перевести.") == "ru"
+    assert detector.detect_language("สวัสดีครับ") is None
+    assert detector.detect_language("Dies ist ein ganz normaler deutscher Satz.") == "de"
+    # Only the prefix is analysed, so a long text is looked up by it
+    long_text = "Dies ist ein ganz normaler deutscher Satz. " + "English words only. " * 500
+    assert detector._prefix(long_text) == "Dies ist ein ganz normaler deutscher Satz. English words"
+    assert detector.detect_language(long_text) == "de"
+    assert detector.detect_language("   ") is None
+
+
+def test_language_detector_is_deterministic():
+    """Test that detection of an ambiguous text does not vary between detectors."""
+    text = "Ok, bra."
+    results = {LanguageDetector(["sv", "no", "da"], cache_size=0).detect_language(text) for _ in range(5)}
+    assert len(results) == 1
+
+
+def test_language_detector_is_fast_on_uncached_text():
+    """Test that detecting uncached Latin and Cyrillic text stays below a millisecond."""
+    detector = LanguageDetector(["en", "de", "fr", "es", "it", "pt", "nl", "pl", "ru", "uk", "bg"], cache_size=0)
+    texts = {
+        "de": "Der schnelle braune Fuchs springt über den faulen Hund und läuft in den Wald hinein.",
+        "en": "The quick brown fox jumps over the lazy dog and runs off into the forest beyond the hill.",
+        "fr": "Le renard brun rapide saute par-dessus le chien paresseux et s'enfuit dans la forêt.",
+        "ru": "Быстрая коричневая лиса прыгает через ленивую собаку и убегает в лес за холмом.",
+        "uk": "Швидка коричнева лисиця стрибає через ледачого пса і тікає в ліс за пагорбом.",
+    }
+    timings = []
+    for _ in range(5):
+        for language, text in texts.items():
+            started = time.perf_counter()
+            assert detector._detect(text) == language
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+    assert timings[len(timings) // 2] < 0.001